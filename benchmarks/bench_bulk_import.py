@@ -0,0 +1,81 @@
+"""批量导入性能基准：逐条 add_transaction vs add_transactions_bulk 流式导入CSV
+
+用法:
+    python -m benchmarks.bench_bulk_import --rows 1000000
+"""
+import argparse
+import csv
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+# 将项目根目录添加到Python路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from cashlog.cli.transaction_cli import iter_csv_records
+from cashlog.data.models import Base
+from cashlog.service.transaction_service import TransactionService
+
+CATEGORIES = ['工资', '餐饮', '交通', '购物', '住房', '娱乐']
+TAGS = ['', 'food', 'food,午餐', 'metro', 'online', 'rent']
+
+def write_csv(path, rows, seed=42):
+    """生成rows行模拟银行流水的CSV文件"""
+    rng = random.Random(seed)
+    start = datetime(2020, 1, 1)
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['amount', 'category', 'tags', 'remark', 'time'])
+        for i in range(rows):
+            writer.writerow([
+                round(rng.uniform(-500, 500), 2),
+                rng.choice(CATEGORIES),
+                rng.choice(TAGS),
+                f'流水{i}',
+                (start + timedelta(minutes=i)).strftime('%Y-%m-%d %H:%M:%S'),
+            ])
+
+def new_session(tmp_dir, name):
+    """在临时目录中创建空数据库并返回会话"""
+    engine = create_engine(f"sqlite:///{os.path.join(tmp_dir, name)}")
+    Base.metadata.create_all(bind=engine)
+    return sessionmaker(bind=engine)()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1_000_000, help='导入的记录条数')
+    parser.add_argument('--single-rows', type=int, default=2000, help='逐条新增方式的采样条数')
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        csv_path = os.path.join(tmp_dir, 'import.csv')
+        write_csv(csv_path, max(args.rows, args.single_rows))
+
+        session = new_session(tmp_dir, 'single.db')
+        service = TransactionService(session)
+        start = time.perf_counter()
+        with open(csv_path, encoding='utf-8', newline='') as f:
+            for i, record in enumerate(iter_csv_records(f)):
+                if i >= args.single_rows:
+                    break
+                service.add_transaction(**record)
+        single = (time.perf_counter() - start) / args.single_rows
+        session.close()
+
+        session = new_session(tmp_dir, 'bulk.db')
+        start = time.perf_counter()
+        with open(csv_path, encoding='utf-8', newline='') as f:
+            count = TransactionService(session).add_transactions_bulk(iter_csv_records(f))
+        bulk = time.perf_counter() - start
+        session.close()
+
+        print(f'逐条新增:  {single * 1000:8.3f} ms/条，估算 {args.rows} 条需 {single * args.rows:10.1f} s')
+        print(f'批量导入:  {bulk / count * 1000:8.3f} ms/条，{count} 条共 {bulk:10.1f} s')
+
+if __name__ == '__main__':
+    main()
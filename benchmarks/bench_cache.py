@@ -0,0 +1,103 @@
+"""查询结果缓存基准：常用读操作在不开启缓存、缓存命中时的耗时，以及读写混合时的命中率
+
+每次读操作都在独立的工作单元中执行，与 API 服务和交互模式处理一次请求相同，
+命中时的耗时主要是创建会话、取出和归还连接；另列出同一工作单元内重复查询的命中耗时。
+
+用法:
+    python -m benchmarks.bench_cache --rows 100000
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+# 将项目根目录添加到Python路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from benchmarks.ledger import END_TIME, category_names, populate
+from cashlog.data.database import Database
+from cashlog.service.todo_service import TodoService
+from cashlog.service.transaction_service import TransactionService
+
+def build_scenarios():
+    """读操作场景：名称 -> 接收会话并执行查询的函数"""
+    year = END_TIME.year - 1
+    category = category_names(1)[0]
+    return {
+        '月度汇总': lambda session: TransactionService(session).get_monthly_summary(6, year),
+        '区间报表(年/月)': lambda session: TransactionService(session).get_range_summary(
+            datetime(year, 1, 1), datetime(year + 1, 1, 1), 'month'),
+        '收支列表(分类,50条)': lambda session: TransactionService(session).get_transactions(
+            category=category, limit=50),
+        '待办列表(50条)': lambda session: TodoService(session).get_todos(limit=50),
+    }
+
+def timed(db, func, repeat):
+    """每次在新的工作单元中执行func，返回中位耗时（微秒）"""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        with db.session_scope() as session:
+            func(session)
+        samples.append((time.perf_counter() - start) * 1e6)
+    return statistics.median(samples)
+
+def timed_in_session(db, func, repeat):
+    """在同一个工作单元中重复执行func，返回平均耗时（微秒）"""
+    with db.session_scope() as session:
+        func(session)
+        start = time.perf_counter()
+        for _ in range(repeat):
+            func(session)
+        return (time.perf_counter() - start) * 1e6 / repeat
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=100000, help='收支记录条数')
+    parser.add_argument('--repeat', type=int, default=200, help='每个场景的执行次数')
+    parser.add_argument('--write-every', type=int, default=20, help='读写混合时每多少次读操作写入一条收支记录')
+    args = parser.parse_args(argv)
+
+    scenarios = build_scenarios()
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, 'cashlog.db')
+        db = Database(path, profile='fast')
+        with db.session_scope() as session:
+            populate(session, args.rows)
+        db.close()
+
+        plain = Database(path, profile='fast', cache_size=0)
+        cached = Database(path, profile='fast', cache_size=256)
+        try:
+            print(f'{"场景":<20}{"不缓存 us":>12}{"命中 us":>12}{"加速比":>10}{"工作单元内命中 us":>20}')
+            for name, func in scenarios.items():
+                plain_us = timed(plain, func, args.repeat)
+                timed(cached, func, 1)
+                cached_us = timed(cached, func, args.repeat)
+                session_us = timed_in_session(cached, func, args.repeat)
+                print(f'{name:<20}{plain_us:>12.1f}{cached_us:>12.1f}{plain_us / cached_us:>9.1f}x{session_us:>20.1f}')
+
+            # 读写混合：轮流执行各场景，每 write_every 次读操作写入一条记录
+            cached.query_cache.clear()
+            funcs = list(scenarios.values())
+            start = time.perf_counter()
+            for i in range(args.repeat * len(funcs)):
+                if i % args.write_every == args.write_every - 1:
+                    with cached.session_scope() as session:
+                        TransactionService(session).add_transaction(-10, category_names(1)[0],
+                                                                    transaction_time=datetime(END_TIME.year - 1, 6, 1))
+                with cached.session_scope() as session:
+                    funcs[i % len(funcs)](session)
+            elapsed = time.perf_counter() - start
+            stats = cached.query_cache.stats()
+            print(f'读写混合（每 {args.write_every} 次读写入1条）：命中率 {stats["hit_rate"]:.0%}，'
+                  f'平均 {elapsed * 1e6 / (args.repeat * len(funcs)):.1f} us/次')
+        finally:
+            plain.close()
+            cached.close()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+"""采集模式基准：逐条 add_transaction 提交 vs 追加到采集日志，以及日志压缩入库的吞吐量
+
+用法:
+    python -m benchmarks.bench_capture --entries 5000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+# 将项目根目录添加到Python路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from cashlog.data.database import Database
+from cashlog.journal import JournalWriter
+from cashlog.service.journal_service import JournalService
+from cashlog.service.transaction_service import TransactionService
+
+CATEGORIES = ['餐饮', '交通', '购物', '娱乐']
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--entries', type=int, default=5000, help='采集的收支记录条数')
+    parser.add_argument('--direct-samples', type=int, default=500, help='逐条提交方式的采样条数')
+    parser.add_argument('--profile', choices=['durable', 'fast'], default='durable', help='SQLite性能配置')
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db = Database(os.path.join(tmp_dir, 'cashlog.db'), profile=args.profile)
+        journal = os.path.join(tmp_dir, 'cashlog.journal')
+        try:
+            with db.session_scope() as session:
+                service = TransactionService(session)
+                start = time.perf_counter()
+                for i in range(args.direct_samples):
+                    service.add_transaction(-(i % 97 + 1.5), CATEGORIES[i % len(CATEGORIES)], remark=f'第{i}笔')
+                direct = (time.perf_counter() - start) * 1e6 / args.direct_samples
+
+            writer = JournalWriter(journal)
+            start = time.perf_counter()
+            for i in range(args.entries):
+                writer.append(-(i % 97 + 1.5), CATEGORIES[i % len(CATEGORIES)], remark=f'第{i}笔')
+            writer.close()
+            captured = (time.perf_counter() - start) * 1e6 / args.entries
+
+            start = time.perf_counter()
+            with db.session_scope() as session:
+                result = JournalService(session).compact(journal)
+            compact = time.perf_counter() - start
+        finally:
+            db.close()
+
+    print(f'逐条提交      {direct:10.1f} us/条（采样 {args.direct_samples} 条，{args.profile}）')
+    print(f'追加采集日志  {captured:10.1f} us/条（{args.entries} 条）')
+    print(f'加速比        {direct / captured:10.1f}x')
+    print(f'压缩入库      {compact * 1000:10.1f} ms（{result["applied"]} 条，{result["applied"] / compact:,.0f} 条/秒）')
+
+if __name__ == '__main__':
+    main()
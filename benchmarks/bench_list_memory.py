@@ -0,0 +1,68 @@
+"""列表查询内存基准：get_transactions 一次性加载 vs iter_transactions 流式读取
+
+用法:
+    python -m benchmarks.bench_list_memory --rows 200000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+# 将项目根目录添加到Python路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from cashlog.data.models import Base
+from cashlog.service.transaction_service import TransactionService
+
+def measure(func):
+    """返回函数执行的耗时（秒）和Python堆内存峰值（MB）"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak / 1024 / 1024
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=200_000, help='记录条数')
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp_dir, 'bench.db')}")
+        Base.metadata.create_all(bind=engine)
+        SessionLocal = sessionmaker(bind=engine)
+        session = SessionLocal()
+        start = datetime(2020, 1, 1)
+        TransactionService(session).add_transactions_bulk(
+            {'amount': -1.0, 'category': '餐饮', 'remark': f'备注{i}',
+             'transaction_time': start + timedelta(minutes=i)}
+            for i in range(args.rows)
+        )
+        session.close()
+
+        def run_get():
+            session = SessionLocal()
+            rows = [[t.id, t.amount, t.category, t.remark] for t in TransactionService(session).get_transactions()]
+            session.close()
+            return rows
+
+        def run_iter():
+            session = SessionLocal()
+            count = sum(1 for t in TransactionService(session).iter_transactions())
+            session.close()
+            return count
+
+        for name, func in (('get_transactions', run_get), ('iter_transactions', run_iter)):
+            elapsed, peak = measure(func)
+            print(f'{name:18s} {elapsed * 1000:10.1f} ms  峰值内存 {peak:8.1f} MB')
+        engine.dispose()
+
+if __name__ == '__main__':
+    main()
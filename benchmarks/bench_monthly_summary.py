@@ -0,0 +1,116 @@
+"""月度汇总性能基准：加载ORM对象计算 vs SQL GROUP BY 聚合 vs 读取月度汇总表
+
+用法:
+    python -m benchmarks.bench_monthly_summary --rows 1000000
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+# 将项目根目录添加到Python路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sqlalchemy import create_engine, insert, func, case
+from sqlalchemy.orm import sessionmaker
+from cashlog.data.models import Base, Transaction
+from cashlog.service.transaction_service import TransactionService, _month_bounds
+
+CATEGORIES = ['工资', '奖金', '餐饮', '交通', '购物', '住房', '娱乐', '医疗', '教育', '旅行']
+
+def populate(engine, rows, year, seed=42):
+    """向数据库写入rows条集中在同一个月的收支记录"""
+    rng = random.Random(seed)
+    start = datetime(year, 1, 1)
+    batch = []
+    with engine.begin() as conn:
+        for i in range(rows):
+            amount_cents = rng.randrange(100, 500000) * (1 if rng.random() < 0.2 else -1)
+            batch.append({
+                'amount_cents': amount_cents,
+                'category': rng.choice(CATEGORIES),
+                'transaction_time': start + timedelta(seconds=rng.randrange(31 * 86400)),
+                'created_at': start,
+                'updated_at': start,
+            })
+            if len(batch) >= 10000:
+                conn.execute(insert(Transaction), batch)
+                batch = []
+        if batch:
+            conn.execute(insert(Transaction), batch)
+
+def legacy_monthly_summary(session, month, year):
+    """旧实现：加载当月全部ORM对象并在Python中三次遍历"""
+    start_date, end_date = _month_bounds(month, year)
+    transactions = session.query(Transaction).filter(
+        Transaction.transaction_time >= start_date,
+        Transaction.transaction_time < end_date
+    ).all()
+    total_income = sum(t.amount_cents for t in transactions if t.amount_cents > 0)
+    total_expense = abs(sum(t.amount_cents for t in transactions if t.amount_cents < 0))
+    category_stats = {}
+    for t in transactions:
+        category_stats[t.category] = category_stats.get(t.category, 0) + abs(t.amount_cents)
+    return total_income, total_expense, len(transactions), category_stats
+
+def group_by_monthly_summary(session, month, year):
+    """在SQL中按分类聚合当月原始记录"""
+    start_date, end_date = _month_bounds(month, year)
+    income_expr = case((Transaction.amount_cents > 0, Transaction.amount_cents), else_=0)
+    expense_expr = case((Transaction.amount_cents < 0, -Transaction.amount_cents), else_=0)
+    return session.query(
+        Transaction.category, func.sum(income_expr), func.sum(expense_expr), func.count(Transaction.id)
+    ).filter(
+        Transaction.transaction_time >= start_date,
+        Transaction.transaction_time < end_date
+    ).group_by(Transaction.category).all()
+
+def timed(func, repeat):
+    """返回多次执行中的最短耗时（秒）"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1_000_000, help='记录条数')
+    parser.add_argument('--repeat', type=int, default=3, help='每种实现的重复次数')
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp_dir, 'bench.db')}")
+        Base.metadata.create_all(bind=engine)
+        print(f'写入 {args.rows} 条记录...')
+        populate(engine, args.rows, year=2024)
+        SessionLocal = sessionmaker(bind=engine)
+        # 直接写入的数据需要重建月度汇总表
+        session = SessionLocal()
+        TransactionService(session).rebuild_rollups()
+        session.close()
+
+        def run(func):
+            session = SessionLocal()
+            try:
+                func(session)
+            finally:
+                session.close()
+
+        strategies = (
+            ('ORM加载+Python计算', lambda session: legacy_monthly_summary(session, 1, 2024)),
+            ('SQL GROUP BY聚合', lambda session: group_by_monthly_summary(session, 1, 2024)),
+            ('月度汇总表', lambda session: TransactionService(session).get_monthly_summary(1, 2024)),
+        )
+        timings = [(name, timed(lambda: run(func), args.repeat)) for name, func in strategies]
+        baseline = timings[0][1]
+        for name, elapsed in timings:
+            print(f'{name:16s} {elapsed * 1000:10.1f} ms  加速比 {baseline / elapsed:8.1f}x')
+        engine.dispose()
+
+if __name__ == '__main__':
+    main()
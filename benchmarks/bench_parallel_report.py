@@ -0,0 +1,63 @@
+"""区间报表并行汇总基准：按工作进程数计时 get_range_summary，并检查结果与串行汇总完全相同
+
+加速比受限于CPU核数和磁盘读取；进程池的创建和各分片的连接开销是固定成本，数据量小时并行反而更慢。
+
+用法:
+    python -m benchmarks.bench_parallel_report --rows 1000000 --years 10 --workers 1,2,4,8
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+# 将项目根目录添加到Python路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from benchmarks.ledger import END_TIME, populate
+from cashlog.data.database import Database
+from cashlog.service.transaction_service import TransactionService
+
+def parse_workers(value):
+    """解析逗号分隔的工作进程数列表"""
+    return [int(item) for item in value.split(',') if item.strip()]
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1000000, help='收支记录条数')
+    parser.add_argument('--years', type=int, default=10, help='历史年数')
+    parser.add_argument('--workers', type=parse_workers, default=[1, 2, 4, 8], help='工作进程数，逗号分隔')
+    parser.add_argument('--by', choices=['month', 'quarter', 'year'], default='month', help='汇总粒度')
+    parser.add_argument('--repeat', type=int, default=5, help='每种进程数的执行次数')
+    args = parser.parse_args(argv)
+
+    start, end = datetime(END_TIME.year - args.years, END_TIME.month, 1), END_TIME
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db = Database(os.path.join(tmp_dir, 'cashlog.db'), profile='fast', cache_size=0)
+        try:
+            with db.session_scope() as session:
+                populate(session, args.rows, todos=0, years=args.years)
+
+            print(f'{args.rows:,} 条记录，{args.years} 年，按 {args.by} 汇总，CPU核数 {os.cpu_count()}')
+            print(f'{"进程数":<8}{"中位耗时 ms":>14}{"加速比":>10}{"结果一致":>10}')
+            with db.session_scope() as session:
+                service = TransactionService(session)
+                expected = service.get_range_summary(start, end, args.by)
+                baseline = None
+                for workers in args.workers:
+                    samples = []
+                    for _ in range(args.repeat):
+                        begin = time.perf_counter()
+                        summary = service.get_range_summary(start, end, args.by, parallel=workers)
+                        samples.append((time.perf_counter() - begin) * 1000)
+                    elapsed = statistics.median(samples)
+                    baseline = baseline or elapsed
+                    same = '是' if summary == expected else '否'
+                    print(f'{workers:<8}{elapsed:>14.1f}{baseline / elapsed:>9.2f}x{same:>10}')
+        finally:
+            db.close()
+
+if __name__ == '__main__':
+    main()
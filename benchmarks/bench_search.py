@@ -0,0 +1,101 @@
+"""全文搜索基准：FTS5 trigram 索引 vs 对备注做 LIKE 扫描
+
+备注由商户、物品和地点词表按Zipf分布组合而成，既有命中少量记录的关键词，也有命中大量记录的常见词。
+
+用法:
+    python -m benchmarks.bench_search --rows 1000000
+"""
+import argparse
+import itertools
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+# 将项目根目录添加到Python路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sqlalchemy import func, select
+from benchmarks.ledger import END_TIME, category_names, generate_transactions, zipf_weights
+from cashlog.data.database import Database
+from cashlog.data.models import Transaction
+from cashlog.service.transaction_service import TransactionService, _month_bounds
+
+MERCHANTS = ['星巴克', '全家便利店', '美团外卖', '盒马鲜生', '滴滴出行', '中国移动', '京东商城', 'Costco',
+             'Apple Store', '万达影城', '宜家家居', '肯德基'] + [f'商户{i:04d}' for i in range(2000)]
+ITEMS = ['咖啡', '午餐', '晚餐', '打车', '话费充值', '日用品', '电影票', 'lunch', 'groceries', 'taxi',
+         '会员续费', '水电燃气'] + [f'商品{i:04d}' for i in range(5000)]
+PLACES = ['公司楼下', '家附近', '机场', '出差上海', '周末聚会', '']
+
+def generate_records(rows, seed):
+    """生成带有真实风格备注的收支记录"""
+    rng = random.Random(seed)
+    # 预先累加权重，避免每次抽样都重新计算上千个词的累积分布
+    merchant_weights = list(itertools.accumulate(zipf_weights(len(MERCHANTS))))
+    item_weights = list(itertools.accumulate(zipf_weights(len(ITEMS))))
+    for record in generate_transactions(rows, seed=seed):
+        merchant = rng.choices(MERCHANTS, cum_weights=merchant_weights)[0]
+        item = rng.choices(ITEMS, cum_weights=item_weights)[0]
+        record['remark'] = f'{merchant} {item} {rng.choice(PLACES)}'.strip()
+        yield record
+
+def timed(func, repeat):
+    """执行repeat次，返回中位耗时（毫秒）和最后一次的结果"""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples), result
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1000000, help='收支记录条数')
+    parser.add_argument('--repeat', type=int, default=20, help='每个查询的执行次数')
+    parser.add_argument('--seed', type=int, default=42, help='随机种子')
+    args = parser.parse_args(argv)
+
+    category = category_names(1)[0]
+    month = {'month': 6, 'year': END_TIME.year - 1}
+    scenarios = [
+        ('少见关键词', '商户1234', {}),
+        ('常见关键词', '星巴克', {}),
+        ('多关键词', '美团外卖 lunch', {}),
+        ('常见关键词+分类', '星巴克', {'category': category}),
+        ('常见关键词+月份', '星巴克', month),
+        ('英文前缀', 'groc', {}),
+        ('短关键词(LIKE)', '午餐', {}),
+    ]
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db = Database(os.path.join(tmp_dir, 'cashlog.db'), profile='fast')
+        try:
+            start = time.perf_counter()
+            with db.session_scope() as session:
+                TransactionService(session).add_transactions_bulk(generate_records(args.rows, args.seed))
+            print(f'写入 {args.rows:,} 条记录（含全文索引）耗时 {time.perf_counter() - start:.1f} s')
+
+            print(f'{"场景":<16}{"FTS5 ms":>10}{"LIKE ms":>10}{"命中":>10}')
+            with db.session_scope() as session:
+                service = TransactionService(session)
+                for name, query, filters in scenarios:
+                    fts_ms, _ = timed(lambda: service.search_transactions(query, **filters), args.repeat)
+                    # 对照：不使用全文索引，按交易时间倒序逐行匹配备注
+                    like = select(Transaction).where(*[Transaction.remark.contains(term) for term in query.split()])
+                    if 'category' in filters:
+                        like = like.where(Transaction.category == filters['category'])
+                    if 'month' in filters:
+                        start_date, end_date = _month_bounds(filters['month'], filters['year'])
+                        like = like.where(Transaction.transaction_time >= start_date,
+                                          Transaction.transaction_time < end_date)
+                    like = like.order_by(Transaction.transaction_time.desc())
+                    like_ms, _ = timed(lambda: session.scalars(like.limit(20)).all(), max(args.repeat // 5, 1))
+                    hits = session.scalar(select(func.count()).select_from(like.subquery()))
+                    print(f'{name:<16}{fts_ms:>10.2f}{like_ms:>10.2f}{hits:>10,}')
+        finally:
+            db.close()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,172 @@
+"""API服务压测：多个客户端通过保持连接并发请求 cashlog serve，统计吞吐量和延迟分位数
+
+用法:
+    python -m benchmarks.bench_server --rows 100000 --clients 8 --duration 10 --write-ratio 0.1
+    python -m benchmarks.bench_server --url http://127.0.0.1:8765 --clients 16
+
+未指定 --url 时，在临时目录中用 benchmarks.ledger 生成账本，启动 `cashlog serve` 子进程后压测；
+指定 --url 时直接压测已运行的服务（写请求会写入该服务的数据库）。
+"""
+import argparse
+import http.client
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from urllib.parse import quote, urlsplit
+
+# 将项目根目录添加到Python路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from benchmarks.ledger import END_TIME, category_names, populate
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+def build_requests(years):
+    """构造读请求列表，与 bench_suite 的查询场景对应"""
+    category = quote(category_names(1)[0])
+    last_month = END_TIME.month - 1 or 12
+    last_year = END_TIME.year if END_TIME.month > 1 else END_TIME.year - 1
+    start = f'{END_TIME.year - years}-{END_TIME.month:02d}-01'
+    return [
+        ('GET', '/transactions?limit=50'),
+        ('GET', f'/transactions?category={category}&limit=50'),
+        ('GET', f'/transactions?month={last_month}&year={last_year}&limit=100'),
+        ('GET', f'/transactions/summary?month={last_month}&year={last_year}'),
+        ('GET', f'/transactions/report?from={start}&to={END_TIME.date()}'),
+        ('GET', '/todos?status=todo&limit=50'),
+    ]
+
+def free_port():
+    """获取一个空闲的本地端口"""
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+def wait_ready(host, port, timeout=30):
+    """等待服务可以响应 /health"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            conn = http.client.HTTPConnection(host, port, timeout=1)
+            conn.request('GET', '/health')
+            if conn.getresponse().status == 200:
+                conn.close()
+                return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f'服务在 {timeout} 秒内未就绪')
+
+def run_client(host, port, reads, args, deadline, seed, latencies, errors):
+    """单个客户端：在一个保持连接上不断发送请求直到deadline"""
+    rng = random.Random(seed)
+    conn = http.client.HTTPConnection(host, port, timeout=30)
+    category = category_names(1)[0]
+    while time.perf_counter() < deadline:
+        if rng.random() < args.write_ratio:
+            method, path = 'POST', '/transactions'
+            body = json.dumps({'amount': f'-{rng.randint(1, 9999) / 100}', 'category': category,
+                               'transaction_time': str(END_TIME)})
+        else:
+            (method, path), body = rng.choice(reads), None
+        start = time.perf_counter()
+        try:
+            conn.request(method, path, body=body, headers={'Content-Type': 'application/json'})
+            response = conn.getresponse()
+            response.read()
+            if response.status >= 400:
+                errors.append(response.status)
+        except (OSError, http.client.HTTPException) as e:
+            errors.append(type(e).__name__)
+            conn.close()
+            conn = http.client.HTTPConnection(host, port, timeout=30)
+            continue
+        latencies.append((method, time.perf_counter() - start))
+    conn.close()
+
+def percentile(sorted_values, q):
+    """已排序数据的分位数（最近秩法）"""
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, max(0, int(round(q * len(sorted_values))) - 1))]
+
+def load_test(host, port, args):
+    """执行压测并输出结果"""
+    reads = build_requests(args.years)
+    # 预热：建立连接并让各查询的页面进入缓存
+    warm = http.client.HTTPConnection(host, port, timeout=30)
+    for method, path in reads:
+        warm.request(method, path)
+        warm.getresponse().read()
+    warm.close()
+
+    latencies, errors = [], []
+    deadline = time.perf_counter() + args.duration
+    threads = [threading.Thread(target=run_client, args=(host, port, reads, args, deadline, args.seed + i,
+                                                         latencies, errors))
+               for i in range(args.clients)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    print(f'{args.clients} 个客户端，{elapsed:.1f} s，写请求占比 {args.write_ratio:.0%}')
+    print(f'  请求数 {len(latencies)}，错误 {len(errors)}，吞吐量 {len(latencies) / elapsed:,.0f} req/s')
+    for label, method in (('全部', None), ('读', 'GET'), ('写', 'POST')):
+        values = sorted(seconds for m, seconds in latencies if method is None or m == method)
+        if values:
+            print(f'  {label:4s} p50 {percentile(values, 0.5) * 1000:8.2f} ms  '
+                  f'p99 {percentile(values, 0.99) * 1000:8.2f} ms  最大 {values[-1] * 1000:8.2f} ms  ({len(values)} 个)')
+    if errors:
+        print(f'  错误示例：{errors[:5]}')
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--url', help='压测已运行的服务，例如 http://127.0.0.1:8765')
+    parser.add_argument('--rows', type=int, default=100000, help='生成的收支记录条数')
+    parser.add_argument('--years', type=int, default=3, help='历史年数')
+    parser.add_argument('--seed', type=int, default=42, help='随机种子')
+    parser.add_argument('--clients', type=int, default=8, help='并发客户端数')
+    parser.add_argument('--workers', type=int, default=8, help='服务端工作线程数（启动子进程时有效）')
+    parser.add_argument('--duration', type=float, default=10, help='压测时长（秒）')
+    parser.add_argument('--write-ratio', type=float, default=0.1, help='写请求占比')
+    parser.add_argument('--profile', choices=['durable', 'fast'], default='fast', help='SQLite性能配置（启动子进程时有效）')
+    args = parser.parse_args(argv)
+
+    if args.url:
+        url = urlsplit(args.url)
+        load_test(url.hostname, url.port or 80, args)
+        return
+
+    from cashlog.data.database import Database
+    with tempfile.TemporaryDirectory() as home:
+        db_dir = os.path.join(home, '.cashlog')
+        os.makedirs(db_dir)
+        db = Database(os.path.join(db_dir, 'cashlog.db'), profile=args.profile)
+        session = db.get_session()
+        populate(session, args.rows, years=args.years, seed=args.seed)
+        session.close()
+        db.close()
+        print(f'已生成 {args.rows} 条收支记录')
+
+        port = free_port()
+        server = subprocess.Popen(
+            [sys.executable, os.path.join(PROJECT_ROOT, 'main.py'), 'serve', '--port', str(port),
+             '--workers', str(args.workers), '--db-profile', args.profile],
+            env=dict(os.environ, HOME=home), stdout=subprocess.DEVNULL)
+        try:
+            wait_ready('127.0.0.1', port)
+            load_test('127.0.0.1', port, args)
+        finally:
+            server.terminate()
+            server.wait()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,50 @@
+"""交互模式基准：逐条启动 cashlog 进程 vs 在 cashlog shell 中连续执行同样的命令
+
+用法:
+    python -m benchmarks.bench_shell --commands 200
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+def make_commands(count):
+    """生成count条新增收支记录的命令"""
+    categories = ['餐饮', '交通', '购物', '娱乐']
+    return [f'transaction add -a -{i % 97 + 1}.5 -c {categories[i % len(categories)]} -r 第{i}笔'
+            for i in range(count)]
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--commands', type=int, default=200, help='shell 中执行的命令条数')
+    parser.add_argument('--process-samples', type=int, default=20, help='逐条启动进程方式的采样条数')
+    parser.add_argument('--profile', choices=['durable', 'fast'], default='durable', help='SQLite性能配置')
+    args = parser.parse_args(argv)
+
+    cashlog = [sys.executable, os.path.join(PROJECT_ROOT, 'main.py')]
+    commands = make_commands(args.commands)
+    with tempfile.TemporaryDirectory() as home:
+        env = dict(os.environ, HOME=home, CASHLOG_DB_PROFILE=args.profile)
+        # 先建好数据库，两种方式都不计入建库耗时
+        subprocess.run(cashlog + ['transaction', 'summary'], env=env, stdout=subprocess.DEVNULL, check=True)
+
+        start = time.perf_counter()
+        for command in commands[:args.process_samples]:
+            subprocess.run(cashlog + command.split(), env=env, stdout=subprocess.DEVNULL, check=True)
+        per_process = (time.perf_counter() - start) * 1000 / args.process_samples
+
+        start = time.perf_counter()
+        subprocess.run(cashlog + ['shell'], input='\n'.join(commands) + '\n', text=True, env=env,
+                       stdout=subprocess.DEVNULL, check=True)
+        per_shell = (time.perf_counter() - start) * 1000 / len(commands)
+
+    print(f'逐条启动进程  {per_process:8.1f} ms/条（采样 {args.process_samples} 条）')
+    print(f'cashlog shell {per_shell:8.1f} ms/条（{len(commands)} 条，含一次启动）')
+    print(f'加速比        {per_process / per_shell:8.1f}x')
+
+if __name__ == '__main__':
+    main()
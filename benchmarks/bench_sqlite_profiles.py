@@ -0,0 +1,76 @@
+"""SQLite性能配置基准：比较 durable / fast 预设下的写入与汇总吞吐量
+
+用法:
+    python -m benchmarks.bench_sqlite_profiles --single-rows 1000 --bulk-rows 200000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+# 将项目根目录添加到Python路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from cashlog.data.database import Database, SQLITE_PROFILES
+from cashlog.service.transaction_service import TransactionService
+
+CATEGORIES = ['工资', '餐饮', '交通', '购物', '住房', '娱乐']
+
+def records(rows, start):
+    """生成rows条按分钟递增的收支记录"""
+    for i in range(rows):
+        yield {
+            'amount': -float(i % 500) if i % 7 else 3000.0,
+            'category': CATEGORIES[i % len(CATEGORIES)],
+            'transaction_time': start + timedelta(minutes=i),
+        }
+
+def bench_profile(profile, tmp_dir, args):
+    """返回某个配置下 逐条新增/批量导入/月度汇总 的吞吐量（次/秒）"""
+    db = Database(db_path=os.path.join(tmp_dir, f'{profile}.db'), profile=profile)
+    start = datetime(2024, 1, 1)
+
+    # 逐条新增：每条记录单独提交，对应每次执行 transaction add
+    session = db.get_session()
+    service = TransactionService(session)
+    begin = time.perf_counter()
+    for record in records(args.single_rows, start):
+        service.add_transaction(**record)
+    single = args.single_rows / (time.perf_counter() - begin)
+    session.close()
+
+    # 批量导入
+    session = db.get_session()
+    begin = time.perf_counter()
+    TransactionService(session).add_transactions_bulk(records(args.bulk_rows, start))
+    bulk = args.bulk_rows / (time.perf_counter() - begin)
+    session.close()
+
+    # 月度汇总：每次使用新会话，模拟重复执行 transaction summary
+    begin = time.perf_counter()
+    for i in range(args.summaries):
+        session = db.get_session()
+        TransactionService(session).get_monthly_summary(i % 12 + 1, 2024)
+        session.close()
+    summary = args.summaries / (time.perf_counter() - begin)
+
+    db.engine.dispose()
+    return single, bulk, summary
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--single-rows', type=int, default=1000, help='逐条新增的记录数')
+    parser.add_argument('--bulk-rows', type=int, default=200_000, help='批量导入的记录数')
+    parser.add_argument('--summaries', type=int, default=50, help='月度汇总的执行次数')
+    args = parser.parse_args(argv)
+
+    print(f'{"配置":10s} {"逐条新增(条/秒)":>16s} {"批量导入(条/秒)":>16s} {"月度汇总(次/秒)":>16s}')
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for profile in SQLITE_PROFILES:
+            single, bulk, summary = bench_profile(profile, tmp_dir, args)
+            print(f'{profile:10s} {single:16.1f} {bulk:16.1f} {summary:16.1f}')
+
+if __name__ == '__main__':
+    main()
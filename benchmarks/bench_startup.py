@@ -0,0 +1,61 @@
+"""CLI启动耗时基准：多次执行 `cashlog --help` 并与耗时预算比较
+
+用法:
+    python -m benchmarks.bench_startup --runs 20 --budget-ms 150
+
+超出预算时以非零状态退出，可直接用于CI检查。
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+def run_once(command, env):
+    """执行一次命令并返回耗时（毫秒）"""
+    start = time.perf_counter()
+    subprocess.run(command, env=env, stdout=subprocess.DEVNULL, check=True)
+    return (time.perf_counter() - start) * 1000
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=20, help='每条命令的执行次数')
+    parser.add_argument('--budget-ms', type=float, default=150.0, help='cashlog --help 中位耗时预算（毫秒）')
+    args = parser.parse_args(argv)
+
+    cashlog = [sys.executable, os.path.join(PROJECT_ROOT, 'main.py')]
+    commands = {
+        'python -c pass': [sys.executable, '-c', 'pass'],
+        'cashlog --version': cashlog + ['--version'],
+        'cashlog --help': cashlog + ['--help'],
+        'cashlog transaction --help': cashlog + ['transaction', '--help'],
+        'cashlog todo --help': cashlog + ['todo', '--help'],
+    }
+
+    # 使用临时HOME，确保 --help 不会触碰真实的数据库
+    with tempfile.TemporaryDirectory() as home:
+        env = dict(os.environ, HOME=home)
+        results = {name: [run_once(command, env) for _ in range(args.runs)]
+                   for name, command in commands.items()}
+        created = os.listdir(home)
+
+    print(f'{"命令":28s} {"中位数(ms)":>10s} {"最小值(ms)":>10s}')
+    for name, timings in results.items():
+        print(f'{name:28s} {statistics.median(timings):10.1f} {min(timings):10.1f}')
+
+    help_median = statistics.median(results['cashlog --help'])
+    if created:
+        print(f'失败：--help 在HOME下创建了文件 {created}')
+        return 1
+    if help_median > args.budget_ms:
+        print(f'失败：cashlog --help 中位耗时 {help_median:.1f} ms 超出预算 {args.budget_ms:.1f} ms')
+        return 1
+    print(f'通过：cashlog --help 中位耗时 {help_median:.1f} ms，预算 {args.budget_ms:.1f} ms')
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,184 @@
+"""业务逻辑层性能基准套件：在不同数据规模下计时 TransactionService / TodoService 的常用操作
+
+用法:
+    python -m benchmarks.bench_suite --sizes 10000,100000,1000000 --output results.json
+    python -m benchmarks.bench_suite --sizes 10000 --compare results.json --threshold 1.25
+
+数据由 benchmarks.ledger 按随机种子生成，相同参数下每次运行的数据完全一致。
+结果以JSON保存，--compare 与之前保存的结果比较，任一场景中位耗时超过基线的
+threshold 倍时以非零状态退出，可直接用于CI检查。
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+# 将项目根目录添加到Python路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import sqlalchemy
+from benchmarks.ledger import END_TIME, category_names, populate, tag_names
+from cashlog.data.database import Database
+from cashlog.data.models import TodoStatus, TransactionType
+from cashlog.service.todo_service import TodoService
+from cashlog.service.transaction_service import TransactionService
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+def build_scenarios(years):
+    """构造基准场景：名称 -> 接收会话并返回结果条数的函数
+
+    查询条件取生成数据中最常见的分类和标签，各规模下的查询条件相同。
+    """
+    category = category_names(1)[0]
+    first_tag, second_tag = tag_names(2)
+    last_month = END_TIME.month - 1 or 12
+    last_year = END_TIME.year if END_TIME.month > 1 else END_TIME.year - 1
+    range_start = datetime(END_TIME.year - years, END_TIME.month, 1)
+
+    def count(items):
+        return sum(1 for _ in items)
+
+    return {
+        'list_first_page': lambda s: len(TransactionService(s).get_transactions(limit=50)),
+        'list_month': lambda s: count(TransactionService(s).iter_transactions(month=last_month, year=last_year)),
+        'list_category_page': lambda s: len(TransactionService(s).get_transactions(category=category, limit=50)),
+        'list_income_page': lambda s: len(TransactionService(s).get_transactions(
+            transaction_type=TransactionType.INCOME, limit=50)),
+        'list_tag_page': lambda s: len(TransactionService(s).get_transactions(tags=first_tag, limit=50)),
+        'list_tags_all_page': lambda s: len(TransactionService(s).get_transactions(
+            tags=f'{first_tag},{second_tag}', limit=50)),
+        'list_tags_any_page': lambda s: len(TransactionService(s).get_transactions(
+            tags=f'{first_tag},{second_tag}', tag_match='any', limit=50)),
+        'list_category_month': lambda s: count(TransactionService(s).iter_transactions(
+            month=last_month, year=last_year, category=category)),
+        'monthly_summary': lambda s: len(TransactionService(s).get_monthly_summary(last_month, last_year)['category_stats']),
+        'range_report': lambda s: len(TransactionService(s).get_range_summary(range_start, END_TIME)['periods']),
+        'todo_list_first_page': lambda s: len(TodoService(s).get_todos(limit=50)),
+        'todo_list_open': lambda s: count(TodoService(s).iter_todos(status=TodoStatus.TODO)),
+        'todo_list_category_page': lambda s: len(TodoService(s).get_todos(category='工作', limit=50)),
+        'todo_list_deadline_page': lambda s: len(TodoService(s).get_todos(deadline_before=END_TIME, limit=50)),
+        'todo_list_tag_page': lambda s: len(TodoService(s).get_todos(tags=first_tag, limit=50)),
+        'todo_due_24h': lambda s: len(TodoService(s).get_due_todos(END_TIME, END_TIME + timedelta(days=1))),
+        'todo_overdue_page': lambda s: len(TodoService(s).get_due_todos(end=END_TIME, limit=50)),
+        # 写入场景放在最后，避免新增的记录影响查询场景
+        'add_transaction': lambda s: TransactionService(s).add_transaction(
+            -12.5, category, tags=f'{first_tag},{second_tag}', transaction_time=END_TIME) and 1,
+        'add_todo': lambda s: TodoService(s).add_todo('基准待办', '工作', tags=first_tag) and 1,
+    }
+
+def time_scenario(db, func, repeat):
+    """执行场景repeat次，每次使用新的会话，返回耗时统计（毫秒）"""
+    timings = []
+    rows = 0
+    for _ in range(repeat):
+        session = db.get_session()
+        start = time.perf_counter()
+        rows = func(session)
+        timings.append((time.perf_counter() - start) * 1000)
+        session.close()
+    return {
+        'median_ms': round(statistics.median(timings), 3),
+        'min_ms': round(min(timings), 3),
+        'max_ms': round(max(timings), 3),
+        'repeat': repeat,
+        'rows': rows,
+    }
+
+def git_revision():
+    """当前代码的git提交，无法获取时返回None"""
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=PROJECT_ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def run_size(rows, args, tmp_dir):
+    """生成指定规模的账本并执行全部场景"""
+    db = Database(os.path.join(tmp_dir, f'bench_{rows}.db'), profile=args.profile)
+    db.init_db()
+    session = db.get_session()
+    start = time.perf_counter()
+    _, todo_count = populate(session, rows, categories=args.categories, tags=args.tags,
+                             years=args.years, seed=args.seed)
+    populate_seconds = time.perf_counter() - start
+    session.close()
+    print(f'\n{rows} 条收支记录 / {todo_count} 条待办，生成耗时 {populate_seconds:.1f} s')
+
+    scenarios = build_scenarios(args.years)
+    selected = [name for name in scenarios if not args.only or name in args.only]
+    results = {}
+    for name in selected:
+        results[name] = time_scenario(db, scenarios[name], args.repeat)
+        r = results[name]
+        print(f'  {name:26s} 中位 {r["median_ms"]:10.2f} ms  最快 {r["min_ms"]:10.2f} ms  结果 {r["rows"]} 条')
+    db.engine.dispose()
+    return {'todos': todo_count, 'populate_seconds': round(populate_seconds, 3), 'scenarios': results}
+
+def compare(current, baseline, threshold):
+    """比较两次结果，返回超过阈值的回归列表"""
+    regressions = []
+    print(f'\n与基线 {baseline.get("revision")}（{baseline.get("created_at")}）比较：')
+    for size, result in current['sizes'].items():
+        base_scenarios = baseline.get('sizes', {}).get(size, {}).get('scenarios', {})
+        for name, r in result['scenarios'].items():
+            if name not in base_scenarios or not base_scenarios[name]['median_ms']:
+                continue
+            ratio = r['median_ms'] / base_scenarios[name]['median_ms']
+            flag = '  <-- 回归' if ratio > threshold else ''
+            print(f'  {size:>8s} {name:26s} {base_scenarios[name]["median_ms"]:10.2f} -> {r["median_ms"]:10.2f} ms'
+                  f'  x{ratio:.2f}{flag}')
+            if ratio > threshold:
+                regressions.append((size, name, ratio))
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', default='10000,100000,1000000', help='逗号分隔的收支记录规模')
+    parser.add_argument('--categories', type=int, default=12, help='支出分类数量')
+    parser.add_argument('--tags', type=int, default=40, help='标签基数')
+    parser.add_argument('--years', type=int, default=3, help='历史年数')
+    parser.add_argument('--seed', type=int, default=42, help='随机种子')
+    parser.add_argument('--repeat', type=int, default=5, help='每个场景的执行次数')
+    parser.add_argument('--profile', choices=['durable', 'fast'], default='durable', help='SQLite性能配置')
+    parser.add_argument('--only', type=lambda v: v.split(','), help='只执行指定场景，逗号分隔')
+    parser.add_argument('--output', '-o', help='结果JSON文件路径')
+    parser.add_argument('--compare', help='用于比较的基线结果JSON文件')
+    parser.add_argument('--threshold', type=float, default=1.25, help='判定为回归的耗时倍数')
+    args = parser.parse_args(argv)
+
+    report = {
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'revision': git_revision(),
+        'python': platform.python_version(),
+        'sqlalchemy': sqlalchemy.__version__,
+        'platform': platform.platform(),
+        'params': {key: getattr(args, key) for key in ('categories', 'tags', 'years', 'seed', 'repeat', 'profile')},
+        'sizes': {},
+    }
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for size in (int(s) for s in args.sizes.split(',') if s.strip()):
+            report['sizes'][str(size)] = run_size(size, args, tmp_dir)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f'\n结果已保存到 {args.output}')
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)
+        if baseline.get('params') != report['params']:
+            print('警告：基线的生成参数与本次不同，比较结果可能没有意义')
+        regressions = compare(report, baseline, args.threshold)
+        if regressions:
+            print(f'\n{len(regressions)} 个场景超过基线的 {args.threshold} 倍')
+            sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,188 @@
+"""可复现的模拟账本生成器
+
+相同的参数和随机种子总是生成完全相同的收支记录和待办事项，供性能基准使用：
+
+    from benchmarks.ledger import generate_transactions, populate
+
+    populate(session, rows=100_000, categories=12, tags=40, years=3, seed=42)
+"""
+import math
+import os
+import random
+import sys
+from datetime import datetime, timedelta
+
+# 将项目根目录添加到Python路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sqlalchemy import insert
+from cashlog.data.models import Todo, TodoStatus, format_tags, todo_tags
+from cashlog.service.transaction_service import TransactionService
+
+# 生成的数据截止到该时间，保证与运行日期无关
+END_TIME = datetime(2025, 1, 1)
+
+CATEGORY_NAMES = ['餐饮', '交通', '购物', '住房', '娱乐', '医疗', '教育', '通讯', '旅行', '人情', '宠物', '运动']
+INCOME_CATEGORIES = ['工资', '奖金', '理财', '退款']
+TODO_CATEGORIES = ['工作', '生活', '学习', '健康', '财务']
+
+# 收入记录占比
+INCOME_RATIO = 0.08
+
+def category_names(count):
+    """返回count个支出分类名称，超出预置名称的部分自动编号"""
+    return [CATEGORY_NAMES[i] if i < len(CATEGORY_NAMES) else f'分类{i + 1}' for i in range(count)]
+
+def tag_names(count):
+    """返回count个标签名称"""
+    return [f'tag{i:03d}' for i in range(count)]
+
+def zipf_weights(count, exponent=1.1):
+    """Zipf分布权重：少数分类和标签占大多数记录"""
+    return [1 / math.pow(i + 1, exponent) for i in range(count)]
+
+def pick_tags(rng, names, weights):
+    """为一条记录抽取0~3个不重复的标签"""
+    count = rng.choices((0, 1, 2, 3), weights=(35, 40, 18, 7))[0]
+    picked = set(rng.choices(names, weights=weights, k=count)) if names else set()
+    return ','.join(sorted(picked))
+
+def generate_transactions(rows, categories=12, tags=40, years=3, seed=42):
+    """生成按时间升序排列的收支记录，格式与 add_transactions_bulk 的输入一致
+
+    支出金额服从对数正态分布（大多为几十元，偶有大额），收入约占8%。
+
+    Args:
+        rows (int): 记录条数
+        categories (int, optional): 支出分类数量. Defaults to 12.
+        tags (int, optional): 标签基数. Defaults to 40.
+        years (int, optional): 历史年数. Defaults to 3.
+        seed (int, optional): 随机种子. Defaults to 42.
+
+    Yields:
+        dict: 收支记录
+    """
+    rng = random.Random(seed)
+    expense_categories = category_names(categories)
+    expense_weights = zipf_weights(categories)
+    names = tag_names(tags)
+    weights = zipf_weights(tags)
+    start = END_TIME - timedelta(days=365 * years)
+    step = (END_TIME - start) / max(rows, 1)
+    for i in range(rows):
+        moment = start + step * (i + rng.random())
+        if rng.random() < INCOME_RATIO:
+            category = rng.choice(INCOME_CATEGORIES)
+            amount = round(rng.uniform(100, 20000), 2)
+        else:
+            category = rng.choices(expense_categories, weights=expense_weights)[0]
+            amount = -min(round(rng.lognormvariate(3.5, 1.0), 2), 50000.0) or -0.01
+        yield {
+            'amount': amount,
+            'category': category,
+            'tags': pick_tags(rng, names, weights),
+            'remark': f'流水{i}' if rng.random() < 0.5 else None,
+            'transaction_time': moment.replace(microsecond=0),
+        }
+
+def generate_todos(rows, tags=40, years=3, seed=42):
+    """生成按创建时间升序排列的待办事项
+
+    越早创建的待办越可能已完成；约七成待办设置了截止时间。
+
+    Args:
+        rows (int): 待办条数
+        tags (int, optional): 标签基数. Defaults to 40.
+        years (int, optional): 历史年数. Defaults to 3.
+        seed (int, optional): 随机种子. Defaults to 42.
+
+    Yields:
+        dict: 待办事项
+    """
+    rng = random.Random(seed + 1)
+    names = tag_names(tags)
+    weights = zipf_weights(tags)
+    start = END_TIME - timedelta(days=365 * years)
+    step = (END_TIME - start) / max(rows, 1)
+    for i in range(rows):
+        created_at = (start + step * (i + rng.random())).replace(microsecond=0)
+        age = i / max(rows, 1)
+        roll = rng.random()
+        if roll < 0.9 - 0.6 * age:
+            status = TodoStatus.DONE
+        elif roll < 0.95 - 0.5 * age:
+            status = TodoStatus.DOING
+        else:
+            status = TodoStatus.TODO
+        deadline = created_at + timedelta(hours=rng.randint(1, 24 * 30)) if rng.random() < 0.7 else None
+        yield {
+            'content': f'待办事项{i}',
+            'category': rng.choice(TODO_CATEGORIES),
+            'tags': pick_tags(rng, names, weights),
+            'deadline': deadline,
+            'status': status,
+            'created_at': created_at,
+            'updated_at': created_at,
+        }
+
+def insert_todos(session, records, batch_size=5000):
+    """批量写入待办事项及其标签关联
+
+    Args:
+        session (Session): 数据库会话
+        records (Iterable[dict]): generate_todos 生成的待办事项
+        batch_size (int, optional): 每批写入的条数. Defaults to 5000.
+
+    Returns:
+        int: 写入的条数
+    """
+    connection = session.connection()
+    # 主键由SQLite在插入时分配，多行 INSERT ... RETURNING 按参数顺序取回ID
+    statement = insert(Todo.__table__).returning(Todo.__table__.c.id, sort_by_parameter_order=True)
+    tag_ids = {}
+    count = 0
+    batch = []
+
+    def flush():
+        names = sorted({name for record in batch for name in record['tag_names']})
+        TransactionService._resolve_tag_ids(connection, names, tag_ids)
+        rows = [{key: value for key, value in record.items() if key != 'tag_names'} for record in batch]
+        ids = connection.execute(statement, rows).scalars().all()
+        links = [{'todo_id': todo_id, 'tag_id': tag_ids[name]}
+                 for todo_id, record in zip(ids, batch) for name in record['tag_names']]
+        if links:
+            connection.execute(insert(todo_tags), links)
+        batch.clear()
+
+    for record in records:
+        names = [name for name in record['tags'].split(',') if name]
+        batch.append(record | {'tags': format_tags(names), 'tag_names': names})
+        count += 1
+        if len(batch) >= batch_size:
+            flush()
+    if batch:
+        flush()
+    session.commit()
+    return count
+
+def populate(session, rows, todos=None, categories=12, tags=40, years=3, seed=42):
+    """向空数据库写入模拟账本
+
+    Args:
+        session (Session): 数据库会话
+        rows (int): 收支记录条数
+        todos (int, optional): 待办条数. Defaults to None，取收支记录条数的十分之一.
+        categories (int, optional): 支出分类数量. Defaults to 12.
+        tags (int, optional): 标签基数. Defaults to 40.
+        years (int, optional): 历史年数. Defaults to 3.
+        seed (int, optional): 随机种子. Defaults to 42.
+
+    Returns:
+        tuple: (收支记录条数, 待办条数)
+    """
+    todos = rows // 10 if todos is None else todos
+    transaction_count = TransactionService(session).add_transactions_bulk(
+        generate_transactions(rows, categories, tags, years, seed)
+    )
+    todo_count = insert_todos(session, generate_todos(todos, tags, years, seed))
+    return transaction_count, todo_count
@@ -0,0 +1,394 @@
+"""本地 HTTP/JSON API 服务
+
+在业务逻辑层之上提供收支记录和待办事项的 JSON 接口，供仪表盘等本地工具并发读写：
+
+    GET    /health
+    GET    /transactions            ?month&year&category&tags&tag_mode&type&limit&after
+    POST   /transactions            {"amount", "category", "tags", "remark", "transaction_time"}
+    GET    /transactions/summary    ?month&year
+    GET    /transactions/report     ?from&to&by    （from/to 为 YYYY-MM-DD，to 不包含）
+    GET    /todos                   ?status&category&deadline_before&tags&tag_mode&limit&after
+    POST   /todos                   {"content", "category", "tags", "deadline"}
+    PATCH  /todos/<id>              {"status"}
+    DELETE /todos/<id>
+
+请求由固定大小的线程池处理，每个请求在独立的工作单元中执行。读请求并发执行
+（WAL 模式下读写互不阻塞），写请求通过进程内的锁串行执行，避免 SQLite 写锁冲突。
+金额以字符串表示（如 "-12.50"），时间为 ISO 8601 格式。
+"""
+import json
+import re
+import socket
+import sys
+import threading
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from datetime import datetime
+from decimal import Decimal
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlsplit
+from ..data.database import Database
+from ..data.models import Todo, TodoStatus, Transaction, TransactionType
+from ..data.query_cache import SESSION_INFO_KEY
+from ..journal import JOURNAL_SUFFIX, has_entries
+from ..service.journal_service import JournalService
+from ..service.tag_service import TAG_MATCH_ALL, TAG_MATCH_ANY
+from ..service.todo_service import TodoService
+from ..service.transaction_service import GRANULARITIES, TransactionService
+from typing import Callable, List, Optional, Tuple
+
+# 列表接口的默认和最大分页大小
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+# 请求体大小上限（字节）
+MAX_BODY_SIZE = 1024 * 1024
+
+class ApiError(Exception):
+    """带HTTP状态码的接口错误"""
+
+    def __init__(self, status: int, message: str):
+        """初始化错误
+
+        Args:
+            status (int): HTTP状态码
+            message (str): 错误信息
+        """
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+def _json_default(value):
+    """JSON序列化无法直接处理的类型"""
+    if isinstance(value, Decimal):
+        return f"{value:.2f}"
+    if isinstance(value, datetime):
+        return value.isoformat(sep=" ")
+    raise TypeError(f"无法序列化的类型：{type(value).__name__}")
+
+def transaction_to_dict(transaction: Transaction) -> dict:
+    """将收支记录转换为接口返回的字典"""
+    return {
+        "id": transaction.id,
+        "amount": transaction.amount,
+        "category": transaction.category,
+        "tags": transaction.tags,
+        "remark": transaction.remark,
+        "transaction_time": transaction.transaction_time,
+        "type": transaction.type.value,
+    }
+
+def todo_to_dict(todo: Todo) -> dict:
+    """将待办事项转换为接口返回的字典"""
+    return {
+        "id": todo.id,
+        "content": todo.content,
+        "category": todo.category,
+        "tags": todo.tags,
+        "deadline": todo.deadline,
+        "status": todo.status.value,
+        "created_at": todo.created_at,
+    }
+
+def _int(params: dict, name: str, minimum: int = 1, maximum: Optional[int] = None) -> Optional[int]:
+    """读取整数参数，未提供时返回None"""
+    if params.get(name) in (None, ""):
+        return None
+    try:
+        value = int(params[name])
+    except (TypeError, ValueError):
+        raise ApiError(400, f"参数 {name} 需为整数")
+    if value < minimum or (maximum is not None and value > maximum):
+        limit = f"{minimum}~{maximum}" if maximum is not None else f"不小于{minimum}"
+        raise ApiError(400, f"参数 {name} 需{limit}")
+    return value
+
+def _datetime(params: dict, name: str) -> Optional[datetime]:
+    """读取 ISO 8601 时间参数，未提供时返回None"""
+    if params.get(name) in (None, ""):
+        return None
+    try:
+        return datetime.fromisoformat(str(params[name]))
+    except ValueError:
+        raise ApiError(400, f"参数 {name} 需为 ISO 8601 时间，例如 2024-01-31 或 2024-01-31 12:00:00")
+
+def _choice(params: dict, name: str, choices, default=None):
+    """读取枚举参数"""
+    value = params.get(name) or default
+    if value is not None and value not in choices:
+        raise ApiError(400, f"参数 {name} 可选值：{', '.join(choices)}")
+    return value
+
+def _required(body: dict, name: str):
+    """读取必填字段"""
+    if body.get(name) in (None, ""):
+        raise ApiError(400, f"缺少字段 {name}")
+    return body[name]
+
+def _page(items: List[dict], limit: int) -> dict:
+    """生成分页结果，本页已满时给出下一页游标"""
+    return {"items": items, "next_after": items[-1]["id"] if len(items) == limit else None}
+
+def health(session, params, body):
+    cache = session.info.get(SESSION_INFO_KEY)
+    if cache is None:
+        return 200, {"status": "ok"}
+    return 200, {"status": "ok", "cache": cache.stats()}
+
+def list_transactions(session, params, body):
+    limit = _int(params, "limit", maximum=MAX_PAGE_SIZE) or DEFAULT_PAGE_SIZE
+    transaction_type = _choice(params, "type", [t.value for t in TransactionType])
+    transactions = TransactionService(session).get_transactions(
+        month=_int(params, "month", maximum=12),
+        year=_int(params, "year", maximum=9999),
+        category=params.get("category"),
+        tags=params.get("tags"),
+        transaction_type=TransactionType(transaction_type) if transaction_type else None,
+        tag_match=_choice(params, "tag_mode", [TAG_MATCH_ALL, TAG_MATCH_ANY], TAG_MATCH_ALL),
+        limit=limit,
+        after=_int(params, "after")
+    )
+    return 200, _page([transaction_to_dict(t) for t in transactions], limit)
+
+def add_transaction(session, params, body):
+    transaction = TransactionService(session).add_transaction(
+        str(_required(body, "amount")),
+        _required(body, "category"),
+        body.get("tags"),
+        body.get("remark"),
+        _datetime(body, "transaction_time")
+    )
+    return 201, transaction_to_dict(transaction)
+
+def monthly_summary(session, params, body):
+    now = datetime.now()
+    month = _int(params, "month", maximum=12) or now.month
+    year = _int(params, "year", maximum=9999) or now.year
+    summary = TransactionService(session).get_monthly_summary(month, year)
+    return 200, dict(summary, month=month, year=year)
+
+def range_report(session, params, body):
+    start = _datetime(params, "from")
+    end = _datetime(params, "to")
+    if start is None or end is None:
+        raise ApiError(400, "需要参数 from 和 to")
+    granularity = _choice(params, "by", GRANULARITIES, "month")
+    return 200, TransactionService(session).get_range_summary(start, end, granularity)
+
+def list_todos(session, params, body):
+    limit = _int(params, "limit", maximum=MAX_PAGE_SIZE) or DEFAULT_PAGE_SIZE
+    status = _choice(params, "status", [s.value for s in TodoStatus])
+    todos = TodoService(session).get_todos(
+        status=TodoStatus(status) if status else None,
+        category=params.get("category"),
+        deadline_before=_datetime(params, "deadline_before"),
+        tags=params.get("tags"),
+        tag_match=_choice(params, "tag_mode", [TAG_MATCH_ALL, TAG_MATCH_ANY], TAG_MATCH_ALL),
+        limit=limit,
+        after=_int(params, "after")
+    )
+    return 200, _page([todo_to_dict(t) for t in todos], limit)
+
+def add_todo(session, params, body):
+    todo = TodoService(session).add_todo(
+        _required(body, "content"),
+        body.get("category"),
+        body.get("tags"),
+        _datetime(body, "deadline")
+    )
+    return 201, todo_to_dict(todo)
+
+def update_todo(session, params, body, todo_id):
+    status = _choice(body, "status", [s.value for s in TodoStatus])
+    if status is None:
+        raise ApiError(400, "缺少字段 status")
+    todo = TodoService(session).update_todo_status(int(todo_id), TodoStatus(status))
+    if todo is None:
+        raise ApiError(404, f"待办事项不存在：ID {todo_id}")
+    return 200, todo_to_dict(todo)
+
+def delete_todo(session, params, body, todo_id):
+    if not TodoService(session).delete_todo(int(todo_id)):
+        raise ApiError(404, f"待办事项不存在：ID {todo_id}")
+    return 200, {"id": int(todo_id), "deleted": True}
+
+# (方法, 路径, 处理函数, 是否写操作)
+ROUTES: List[Tuple[str, "re.Pattern", Callable, bool]] = [
+    ("GET", re.compile(r"/health"), health, False),
+    ("GET", re.compile(r"/transactions"), list_transactions, False),
+    ("POST", re.compile(r"/transactions"), add_transaction, True),
+    ("GET", re.compile(r"/transactions/summary"), monthly_summary, False),
+    ("GET", re.compile(r"/transactions/report"), range_report, False),
+    ("GET", re.compile(r"/todos"), list_todos, False),
+    ("POST", re.compile(r"/todos"), add_todo, True),
+    ("PATCH", re.compile(r"/todos/(\d+)"), update_todo, True),
+    ("DELETE", re.compile(r"/todos/(\d+)"), delete_todo, True),
+]
+
+# 执行前需要先将采集日志入库的查询
+JOURNAL_READS = {list_transactions, monthly_summary, range_report}
+
+class ApiRequestHandler(BaseHTTPRequestHandler):
+    """将HTTP请求分派到业务逻辑层"""
+
+    protocol_version = "HTTP/1.1"
+    server_version = "cashlog/0.1.0"
+    # 保持连接的空闲超时（秒），超时后释放工作线程
+    timeout = 30
+    # 响应头和响应体分两次写出，关闭Nagle算法避免与客户端延迟确认叠加产生约40ms的等待
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        self._dispatch("GET")
+
+    def do_POST(self):
+        self._dispatch("POST")
+
+    def do_PUT(self):
+        self._dispatch("PUT")
+
+    def do_PATCH(self):
+        self._dispatch("PATCH")
+
+    def do_DELETE(self):
+        self._dispatch("DELETE")
+
+    def _dispatch(self, method: str):
+        """匹配路由并执行，结果以JSON返回"""
+        url = urlsplit(self.path)
+        body = None
+        try:
+            handler, args, writes = self._route(method, url.path)
+            params = {key: values[-1] for key, values in parse_qs(url.query).items()}
+            body = self._read_body()
+            if handler in JOURNAL_READS:
+                self.server.compact_journal()
+            # 写请求串行执行，读请求并发执行
+            with self.server.write_lock if writes else nullcontext():
+                with self.server.db.session_scope() as session:
+                    status, payload = handler(session, params, body, *args)
+        except ApiError as e:
+            status, payload = e.status, {"error": e.message}
+        except ValueError as e:
+            status, payload = 400, {"error": str(e)}
+        except Exception as e:
+            traceback.print_exc(file=sys.stderr)
+            status, payload = 500, {"error": f"服务器内部错误：{str(e)}"}
+        if body is None and self.headers.get("Content-Length", "0") != "0":
+            # 请求体未读取（接口不存在、请求体过大等），保持连接时剩余字节会被当作下一个请求解析
+            self.close_connection = True
+        self._send_json(status, payload)
+
+    @staticmethod
+    def _route(method: str, path: str) -> Tuple[Callable, tuple, bool]:
+        """查找处理函数
+
+        Raises:
+            ApiError: 路径不存在时返回404，方法不支持时返回405
+        """
+        path = path.rstrip("/") or "/"
+        allowed = False
+        for route_method, pattern, handler, writes in ROUTES:
+            match = pattern.fullmatch(path)
+            if match:
+                if route_method == method:
+                    return handler, match.groups(), writes
+                allowed = True
+        if allowed:
+            raise ApiError(405, f"不支持的请求方法：{method} {path}")
+        raise ApiError(404, f"接口不存在：{path}")
+
+    def _read_body(self) -> dict:
+        """读取JSON请求体"""
+        length = int(self.headers.get("Content-Length") or 0)
+        if length == 0:
+            return {}
+        if length > MAX_BODY_SIZE:
+            raise ApiError(413, "请求体过大")
+        try:
+            body = json.loads(self.rfile.read(length))
+        except ValueError:
+            raise ApiError(400, "请求体需为JSON")
+        if not isinstance(body, dict):
+            raise ApiError(400, "请求体需为JSON对象")
+        return body
+
+    def _send_json(self, status: int, payload):
+        """发送JSON响应"""
+        data = json.dumps(payload, ensure_ascii=False, default=_json_default).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        if self.close_connection:
+            self.send_header("Connection", "close")
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        """仅在 verbose 模式下输出访问日志"""
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+class ApiServer(HTTPServer):
+    """使用固定大小线程池处理连接的HTTP服务器
+
+    每个连接（含HTTP/1.1保持连接期间的全部请求）占用一个工作线程，
+    并发连接数超过线程数时，其余连接排队等待。
+    """
+
+    def __init__(self, address: Tuple[str, int], db: Database, workers: int = 8, verbose: bool = False):
+        """创建服务器并监听端口
+
+        Args:
+            address (Tuple[str, int]): 监听地址和端口，端口为0时自动分配
+            db (Database): 数据库实例，连接池大小应不小于工作线程数
+            workers (int, optional): 工作线程数. Defaults to 8.
+            verbose (bool, optional): 是否输出访问日志. Defaults to False.
+        """
+        super().__init__(address, ApiRequestHandler)
+        self.db = db
+        self.verbose = verbose
+        self.write_lock = threading.Lock()
+        self.journal_path = Path(db.engine.url.database).with_suffix(JOURNAL_SUFFIX)
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="cashlog-api")
+        # 处理中的连接，停止服务时用于结束空闲的保持连接
+        self._connections = set()
+        self._connections_lock = threading.Lock()
+
+    def compact_journal(self):
+        """采集日志中有未入库的记录时将其写入数据库，与写请求串行执行"""
+        if not has_entries(self.journal_path):
+            return
+        with self.write_lock:
+            with self.db.session_scope() as session:
+                JournalService(session).compact(self.journal_path)
+
+    def process_request(self, request, client_address):
+        """将连接交给线程池处理"""
+        self.executor.submit(self._process_request, request, client_address)
+
+    def _process_request(self, request, client_address):
+        with self._connections_lock:
+            self._connections.add(request)
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            with self._connections_lock:
+                self._connections.discard(request)
+            self.shutdown_request(request)
+
+    def server_close(self):
+        """停止监听，结束空闲连接并等待进行中的请求完成"""
+        super().server_close()
+        with self._connections_lock:
+            for request in self._connections:
+                # 关闭读方向：等待下一个请求的连接立即结束，已读入的请求仍可写回响应
+                try:
+                    request.shutdown(socket.SHUT_RD)
+                except OSError:
+                    pass
+        self.executor.shutdown(wait=True)
@@ -0,0 +1,127 @@
+import click
+import shlex
+
+def _add_transaction(services, params):
+    transaction = services['transaction'].add_transaction(
+        params['amount'], params['category'], params['tags'], params['remark'], params['time'])
+    return f'收支记录新增成功！ID: {transaction.id}'
+
+def _add_todo(services, params):
+    todo = services['todo'].add_todo(params['content'], params['category'], params['tags'], params['deadline'])
+    return f'待办事项新增成功！ID: {todo.id}'
+
+def _update_todo(services, params):
+    from cashlog.data.models import TodoStatus
+    todo = services['todo'].update_todo_status(params['id'], TodoStatus(params['status']))
+    if todo is None:
+        raise ValueError(f'待办事项不存在：ID {params["id"]}')
+    return f'待办事项状态更新成功！ID: {todo.id}，新状态: {todo.status.value}'
+
+def _delete_todo(services, params):
+    if not services['todo'].delete_todo(params['id']):
+        raise ValueError(f'待办事项不存在：ID {params["id"]}')
+    return f'待办事项删除成功！ID: {params["id"]}'
+
+# 批处理支持的命令：(命令组, 子命令) -> 在共享会话上执行该命令的函数
+BATCH_OPERATIONS = {
+    ('transaction', 'add'): _add_transaction,
+    ('todo', 'add'): _add_todo,
+    ('todo', 'update'): _update_todo,
+    ('todo', 'delete'): _delete_todo,
+}
+
+def parse_line(ctx, line):
+    """按对应CLI命令的选项和校验规则解析一行批处理命令
+    
+    Args:
+        ctx (click.Context): 批处理命令的上下文
+        line (str): 一行命令，如 transaction add -a -25 -c 餐饮，可带 cashlog 前缀
+    
+    Returns:
+        tuple: ((命令组, 子命令), 解析后的参数字典)
+    
+    Raises:
+        click.ClickException: 命令不支持或参数无效时抛出
+    """
+    try:
+        args = shlex.split(line)
+    except ValueError as e:
+        raise click.ClickException(f'命令解析失败：{str(e)}')
+    if args and args[0] == 'cashlog':
+        args = args[1:]
+    key = tuple(args[:2])
+    if key not in BATCH_OPERATIONS:
+        supported = '、'.join(' '.join(k) for k in BATCH_OPERATIONS)
+        raise click.ClickException(f'批处理不支持该命令：{" ".join(args[:2])}，支持：{supported}')
+    
+    root = ctx.find_root()
+    command = root.command.get_command(root, key[0]).get_command(root, key[1])
+    try:
+        with command.make_context(' '.join(key), args[2:], parent=ctx) as command_ctx:
+            return key, command_ctx.params
+    except click.exceptions.Exit:
+        raise click.ClickException('批处理中不支持 --help')
+
+@click.command(name='batch', help='在一个数据库事务中批量执行命令：全部成功才提交，任一行出错则全部不写入')
+@click.argument('file', type=click.File('r', encoding='utf-8'), default='-')
+@click.option('--dry-run', is_flag=True, help='执行并检查全部命令后回滚，不写入数据库')
+@click.option('--verbose', '-v', is_flag=True, help='输出每一行的执行结果')
+@click.pass_context
+def batch_cli(ctx, file, dry_run, verbose):
+    """批处理命令
+    
+    FILE 每行一条命令，格式与命令行相同（transaction add、todo add、todo update、todo delete），
+    空行和 # 开头的行被忽略；FILE 为 - 或省略时从标准输入读取。
+    """
+    from sqlalchemy.exc import SQLAlchemyError
+    from cashlog.data.database import get_db
+    from cashlog.service.todo_service import TodoService
+    from cashlog.service.transaction_service import TransactionService
+    
+    errors = []
+    counts = {}
+    # 数据库报错后会话需要回滚，其余行只做解析校验
+    session_usable = True
+    try:
+        with get_db().session_scope() as session:
+            # 各命令的写操作只刷新到数据库，最后统一提交
+            services = {
+                'transaction': TransactionService(session, autocommit=False),
+                'todo': TodoService(session, autocommit=False),
+            }
+            for line_no, line in enumerate(file, 1):
+                line = line.strip()
+                if not line or line.startswith('#'):
+                    continue
+                try:
+                    key, params = parse_line(ctx, line)
+                    if session_usable:
+                        message = BATCH_OPERATIONS[key](services, params)
+                        if verbose:
+                            click.echo(f'第{line_no}行：{message}')
+                    counts[key] = counts.get(key, 0) + 1
+                except click.ClickException as e:
+                    errors.append((line_no, e.format_message()))
+                except SQLAlchemyError as e:
+                    errors.append((line_no, str(getattr(e, 'orig', None) or e)))
+                    session_usable = False
+                except Exception as e:
+                    errors.append((line_no, str(e)))
+            
+            if errors or dry_run:
+                session.rollback()
+    except Exception as e:
+        click.echo(f'批处理失败：{str(e)}', err=True)
+        ctx.exit(1)
+    
+    total = sum(counts.values()) + len(errors)
+    detail = '，'.join(f'{" ".join(key)} {count}' for key, count in counts.items())
+    if errors:
+        for line_no, message in errors:
+            click.echo(f'第{line_no}行：{message}', err=True)
+        click.echo(f'批处理失败：{len(errors)} 行出错，全部 {total} 条命令均未写入', err=True)
+        ctx.exit(1)
+    if dry_run:
+        click.echo(f'检查通过：共 {total} 条命令（{detail}），已回滚，未写入数据库')
+    else:
+        click.echo(f'批处理完成！共 {total} 条命令在一个事务中提交（{detail}）')
@@ -0,0 +1,21 @@
+import click
+
+@click.command(name='export', help='导出收支记录，columnar 为可内存映射的列式快照（需要 numpy）')
+@click.option('--format', '-f', type=click.Choice(['columnar']), default='columnar', help='导出格式')
+@click.option('--output', '-o', type=click.Path(file_okay=False), help='快照目录，默认与数据库文件同目录的 cashlog.columnar')
+def export_cli(format, output):
+    """导出收支记录命令"""
+    try:
+        from cashlog.data.database import get_db
+        from cashlog.cli.transaction_cli import compact_journal
+        from cashlog.service.snapshot_service import SnapshotService
+        compact_journal()
+        with get_db().session_scope() as session:
+            service = SnapshotService(session)
+            header = service.export(output)
+            path = output or service.default_path()
+        click.echo(f'列式快照导出完成！共 {header["rows"]} 条记录，目录：{path}')
+    except ImportError as e:
+        click.echo(str(e), err=True)
+    except Exception as e:
+        click.echo(f'导出失败：{str(e)}', err=True)
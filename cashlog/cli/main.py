@@ -1,16 +1,105 @@
+import time
+
+# 进程开始执行CLI入口的时间，--profile 的总耗时从这里算起
+_STARTED = time.perf_counter()
+
 import click
-from .transaction_cli import transaction_cli
-from .todo_cli import todo_cli
+import sys
+from importlib import import_module
+
+# --profile 时预先导入的模块，使其导入耗时单独计入 "启动与模块导入" 阶段
+PROFILE_PRELOAD = [
+    'sqlalchemy.orm',
+    'cashlog.data.database',
+    'cashlog.service.transaction_service',
+    'cashlog.service.todo_service',
+    'tabulate',
+]
+
+class LazyGroup(click.Group):
+    """按需导入子命令的命令组
+
+    子命令以 "模块路径:对象名" 的形式注册，只有在执行或展示该子命令时才导入对应模块，
+    使 --version 等命令无需加载任何子命令模块。
+    """
+
+    def __init__(self, *args, lazy_commands=None, **kwargs):
+        """初始化命令组
+
+        Args:
+            lazy_commands (dict, optional): 子命令名称到 "模块路径:对象名" 的映射. Defaults to None.
+        """
+        super().__init__(*args, **kwargs)
+        self.lazy_commands = dict(lazy_commands or {})
+
+    def list_commands(self, ctx):
+        """列出全部子命令名称"""
+        return sorted(set(super().list_commands(ctx)) | set(self.lazy_commands))
+
+    def get_command(self, ctx, cmd_name):
+        """获取子命令，延迟注册的子命令在此时导入"""
+        if cmd_name in self.lazy_commands:
+            module_path, attr_name = self.lazy_commands.pop(cmd_name).split(':')
+            self.add_command(getattr(import_module(module_path), attr_name), cmd_name)
+        return super().get_command(ctx, cmd_name)
 
-@click.group(name='cashlog', help='轻量化本地记账/待办CLI工具')
+@click.group(name='cashlog', help='轻量化本地记账/待办CLI工具', cls=LazyGroup, lazy_commands={
+    # 添加子命令组
+    'transaction': 'cashlog.cli.transaction_cli:transaction_cli',
+    'todo': 'cashlog.cli.todo_cli:todo_cli',
+    'export': 'cashlog.cli.export_cli:export_cli',
+    'shell': 'cashlog.cli.shell_cli:shell_cli',
+    'serve': 'cashlog.cli.serve_cli:serve_cli',
+    'batch': 'cashlog.cli.batch_cli:batch_cli',
+})
 @click.version_option(version='0.1.0', prog_name='cashlog')
-def main_cli():
+@click.option('--profile', is_flag=True, help='命令结束后输出各阶段耗时和最慢的SQL语句')
+@click.option('--profile-dump', type=click.Path(dir_okay=False), help='同时将cProfile统计写入该文件，隐含 --profile')
+@click.pass_context
+def main_cli(ctx, profile, profile_dump):
     """主CLI入口"""
-    pass
+    if profile or profile_dump:
+        start_profiling(ctx, profile_dump)
 
-# 添加子命令组
-main_cli.add_command(transaction_cli)
-main_cli.add_command(todo_cli)
+def start_profiling(ctx, dump_path=None):
+    """开启耗时分析，命令结束时向标准错误输出报告
+    
+    Args:
+        ctx (click.Context): 根命令上下文
+        dump_path (str, optional): cProfile统计文件路径. Defaults to None.
+    """
+    from cashlog import profiling
+    profiler = profiling.start(_STARTED)
+    # 交互模式中数据库实例已经创建，需要另外开始记录SQL语句；否则由 get_db 创建实例时开始
+    database = sys.modules.get('cashlog.data.database')
+    if database is not None and database._db is not None:
+        database._db.record_queries()
+    # 到这里为止的耗时主要是导入click和子命令模块
+    profiler.add('import', time.perf_counter() - _STARTED)
+    with profiler.phase('import'):
+        for module in PROFILE_PRELOAD:
+            import_module(module)
+    
+    cprofile = None
+    if dump_path:
+        import cProfile
+        cprofile = cProfile.Profile()
+        cprofile.enable()
+    
+    def finish():
+        if cprofile is not None:
+            cprofile.disable()
+            cprofile.dump_stats(dump_path)
+        profiling.stop()
+        database = sys.modules.get('cashlog.data.database')
+        stats = database._db.query_stats if database is not None and database._db is not None else None
+        click.echo(profiler.report(stats), err=True)
+        if stats is not None:
+            database._db.record_queries(False)
+        if dump_path:
+            click.echo(f'cProfile统计已写入 {dump_path}，可用 python -m pstats {dump_path} 查看', err=True)
+    
+    ctx.call_on_close(finish)
 
 if __name__ == '__main__':
     main_cli()
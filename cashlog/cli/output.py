@@ -0,0 +1,37 @@
+import click
+import csv
+from typing import Iterable, List
+from cashlog import profiling
+
+def echo_rows(rows: Iterable[list], headers: List[str], output_format: str = 'table') -> int:
+    """输出查询结果
+    
+    table 格式需要先收集全部行以计算列宽；tsv 格式逐行写出，
+    内存占用与结果行数无关，适合大结果集或管道处理。
+    
+    Args:
+        rows (Iterable[list]): 表格行，可为生成器
+        headers (List[str]): 表头
+        output_format (str, optional): 输出格式，table 或 tsv. Defaults to 'table'.
+    
+    Returns:
+        int: 输出的行数，为0时不输出任何内容
+    """
+    if output_format == 'tsv':
+        stream = click.get_text_stream('stdout')
+        writer = csv.writer(stream, delimiter='\t', lineterminator='\n')
+        count = 0
+        for row in rows:
+            if count == 0:
+                writer.writerow(headers)
+            writer.writerow(row)
+            count += 1
+        stream.flush()
+        return count
+    
+    table_data = list(rows)
+    with profiling.phase('render'):
+        from tabulate import tabulate
+        if table_data:
+            click.echo(tabulate(table_data, headers=headers, tablefmt='grid', floatfmt='.2f'))
+    return len(table_data)
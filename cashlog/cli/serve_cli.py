@@ -0,0 +1,32 @@
+import click
+
+@click.command(name='serve', help='启动本地 HTTP/JSON API 服务，供其他工具读写收支记录和待办事项')
+@click.option('--host', default='127.0.0.1', show_default=True, help='监听地址')
+@click.option('--port', '-p', type=click.IntRange(0, 65535), default=8765, show_default=True, help='监听端口，0 为自动分配')
+@click.option('--workers', '-w', type=click.IntRange(min=1), default=8, show_default=True,
+              help='工作线程数，同时也是数据库连接池大小')
+@click.option('--db-profile', type=click.Choice(['durable', 'fast']), default='fast', show_default=True,
+              help='SQLite性能配置，fast 使用WAL模式，读请求不会被写请求阻塞')
+@click.option('--cache-size', type=click.IntRange(min=0),
+              help='查询结果缓存的条目数，0 为不缓存；默认读取配置文件 [cache] size')
+@click.option('--verbose', '-v', is_flag=True, help='输出每个请求的访问日志')
+def serve_cli(host, port, workers, db_profile, cache_size, verbose):
+    """API服务命令"""
+    try:
+        from cashlog.api.server import ApiServer
+        from cashlog.data.database import Database
+        # 每个工作线程最多占用一个连接，连接池不需要额外连接
+        db = Database(profile=db_profile, pool_size=workers, max_overflow=0, cache_size=cache_size)
+        server = ApiServer((host, port), db, workers=workers, verbose=verbose)
+    except Exception as e:
+        click.echo(f'启动服务失败：{str(e)}', err=True)
+        return
+    
+    click.echo(f'cashlog API 已启动：http://{host}:{server.server_port}（{workers} 个工作线程，Ctrl-C 停止）')
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        click.echo('正在停止服务...')
+    finally:
+        server.server_close()
+        db.close()
@@ -0,0 +1,197 @@
+import click
+import os
+import shlex
+import sys
+import time
+
+# 交互模式自身的命令
+SHELL_COMMANDS = ['help', 'exit', 'quit']
+
+def load_categories():
+    """读取全部收支和待办分类，用于补全
+
+    收支分类取自月度汇总表，无需扫描收支记录表。
+    """
+    from sqlalchemy import select, union
+    from cashlog.data.database import get_db
+    from cashlog.data.models import MonthlyRollup, Todo
+    with get_db().session_scope() as session:
+        return sorted(session.execute(union(
+            select(MonthlyRollup.category).where(MonthlyRollup.transaction_count > 0),
+            select(Todo.category)
+        )).scalars())
+
+class ShellCompleter:
+    """readline 补全：命令、子命令、选项名，以及 --category 等分类选项的取值"""
+
+    def __init__(self, root, categories_loader=load_categories):
+        """初始化补全器
+
+        Args:
+            root (click.Group): 根命令组
+            categories_loader (callable, optional): 返回分类列表的函数. Defaults to load_categories.
+        """
+        self.root = root
+        self.categories_loader = categories_loader
+        self._categories = None
+        self._matches = []
+
+    def invalidate(self):
+        """执行命令后分类可能变化，下次补全时重新读取"""
+        self._categories = None
+
+    def categories(self):
+        """获取分类列表，读取失败时返回空列表"""
+        if self._categories is None:
+            try:
+                self._categories = self.categories_loader()
+            except Exception:
+                return []
+        return self._categories
+
+    def complete(self, text, state):
+        """readline 补全回调"""
+        if state == 0:
+            import readline
+            line = readline.get_line_buffer()[:readline.get_begidx()]
+            self._matches = self.matches(line, text)
+        return self._matches[state] if state < len(self._matches) else None
+
+    def matches(self, line, text):
+        """计算补全候选
+
+        Args:
+            line (str): 光标所在单词之前的输入
+            text (str): 光标所在的单词
+
+        Returns:
+            List[str]: 以text开头的候选项
+        """
+        try:
+            words = shlex.split(line)
+        except ValueError:
+            return []
+        ctx = click.Context(self.root)
+        command = self.root
+        for word in words:
+            if isinstance(command, click.Group) and word in command.list_commands(ctx):
+                command = command.get_command(ctx, word)
+
+        if words and self._is_category_option(command, words[-1]):
+            candidates = [shlex.quote(c) if ' ' in c else c for c in self.categories()]
+        elif text.startswith('-'):
+            candidates = [opt for param in command.params for opt in param.opts + param.secondary_opts] + ['--help']
+        elif isinstance(command, click.Group):
+            candidates = command.list_commands(ctx) + (SHELL_COMMANDS if command is self.root and not words else [])
+        else:
+            candidates = []
+        return sorted(c for c in set(candidates) if c.startswith(text))
+
+    @staticmethod
+    def _is_category_option(command, word):
+        """判断word是否为当前命令的分类选项"""
+        return any(param.name == 'category' and word in param.opts for param in command.params)
+
+def setup_readline(completer, history_path):
+    """启用命令历史和补全，平台不支持readline时跳过
+
+    Returns:
+        bool: 是否启用了readline
+    """
+    try:
+        import readline
+    except ImportError:
+        return False
+    readline.set_completer(completer.complete)
+    readline.set_completer_delims(' \t\n')
+    if 'libedit' in (readline.__doc__ or ''):
+        readline.parse_and_bind('bind ^I rl_complete')
+    else:
+        readline.parse_and_bind('tab: complete')
+    try:
+        readline.read_history_file(history_path)
+    except (FileNotFoundError, OSError):
+        pass
+    readline.set_history_length(1000)
+    return True
+
+def run_command(root, args):
+    """在当前进程中执行一条命令
+
+    Args:
+        root (click.Group): 根命令组
+        args (List[str]): 命令参数，不含程序名
+
+    Returns:
+        int: 退出码
+    """
+    from cashlog.cli import main as main_module
+    # --profile 的总耗时从本条命令开始计算
+    main_module._STARTED = time.perf_counter()
+    try:
+        result = root.main(args=args, prog_name='cashlog', standalone_mode=False)
+        return result if isinstance(result, int) else 0
+    except click.exceptions.Abort:
+        click.echo('已取消', err=True)
+        return 1
+    except click.ClickException as e:
+        e.show()
+        return e.exit_code
+    except SystemExit as e:
+        return e.code if isinstance(e.code, int) else 1
+    except Exception as e:
+        click.echo(f'命令执行失败：{str(e)}', err=True)
+        return 1
+
+@click.command(name='shell', help='交互模式：在同一个进程中连续执行 transaction/todo 命令，支持历史记录和分类补全')
+@click.option('--timing', is_flag=True, help='每条命令执行后显示耗时')
+@click.pass_context
+def shell_cli(ctx, timing):
+    """交互模式命令"""
+    from cashlog.config import get_cashlog_dir
+    from cashlog.data.database import get_db
+    root = ctx.find_root().command
+    # 预先创建数据库引擎并执行建表和迁移，之后的命令都复用它
+    get_db()
+
+    interactive = sys.stdin.isatty()
+    completer = ShellCompleter(root)
+    history_path = os.path.join(get_cashlog_dir(), 'shell_history')
+    has_readline = interactive and setup_readline(completer, history_path)
+    if interactive:
+        click.echo('cashlog 交互模式，输入 help 查看命令，exit 或 Ctrl-D 退出')
+
+    try:
+        while True:
+            try:
+                line = input('cashlog> ' if interactive else '').strip()
+            except EOFError:
+                break
+            except KeyboardInterrupt:
+                click.echo()
+                continue
+            if not line or line.startswith('#'):
+                continue
+            if line in ('exit', 'quit'):
+                break
+            try:
+                args = ['--help'] if line == 'help' else shlex.split(line)
+            except ValueError as e:
+                click.echo(f'命令解析失败：{str(e)}', err=True)
+                continue
+            if args[0] == 'shell':
+                click.echo('已在交互模式中', err=True)
+                continue
+
+            started = time.perf_counter()
+            run_command(root, args)
+            completer.invalidate()
+            if timing:
+                click.echo(f'（{(time.perf_counter() - started) * 1000:.1f} ms）', err=True)
+    finally:
+        if has_readline:
+            import readline
+            try:
+                readline.write_history_file(history_path)
+            except OSError:
+                pass
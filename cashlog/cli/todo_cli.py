@@ -1,9 +1,21 @@
 import click
-from tabulate import tabulate
-from datetime import datetime
-from cashlog.data.database import db
-from cashlog.service.todo_service import TodoService
-from cashlog.data.models import TodoStatus
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from cashlog.cli.output import echo_rows
+
+# 时长单位：--within 24h、30m、7d 等
+DURATION_UNITS = {'s': 'seconds', 'm': 'minutes', 'h': 'hours', 'd': 'days', 'w': 'weeks'}
+
+@contextmanager
+def service_scope():
+    """在一个工作单元中创建待办事项业务逻辑对象，命令结束时提交并关闭会话
+    
+    数据库与业务逻辑模块在执行命令时才导入，使 --help 等命令无需加载SQLAlchemy。
+    """
+    from cashlog.data.database import get_db
+    from cashlog.service.todo_service import TodoService
+    with get_db().session_scope() as session:
+        yield TodoService(session)
 
 def validate_date(ctx, param, value):
     """验证日期格式是否正确"""
@@ -14,6 +26,48 @@ def validate_date(ctx, param, value):
     except ValueError:
         raise click.BadParameter('日期格式需为 YYYY-MM-DD HH:MM:SS')
 
+def validate_duration(ctx, param, value):
+    """验证时长格式（数字加单位 s/m/h/d/w，如 24h）并转换为 timedelta"""
+    if value is None:
+        return None
+    unit = DURATION_UNITS.get(value[-1:].lower())
+    try:
+        amount = int(value[:-1])
+        if unit is None or amount <= 0:
+            raise ValueError
+    except ValueError:
+        raise click.BadParameter('时长格式需为正整数加单位 s/m/h/d/w，如 30m、24h、7d')
+    return timedelta(**{unit: amount})
+
+def format_timedelta(delta: timedelta) -> str:
+    """将时长格式化为“1天3小时”“25分钟”等"""
+    minutes = int(delta.total_seconds()) // 60
+    days, minutes = divmod(minutes, 24 * 60)
+    hours, minutes = divmod(minutes, 60)
+    parts = [f'{days}天' if days else '', f'{hours}小时' if hours else '', f'{minutes}分钟' if minutes and not days else '']
+    return ''.join(parts) or '不到1分钟'
+
+def echo_due_todos(todos, now: datetime, output: str, overdue: bool = False) -> int:
+    """输出按截止时间排序的待办事项，附带剩余或逾期时长
+    
+    Returns:
+        int: 输出的行数
+    """
+    rows = (
+        [
+            t.id,
+            t.content,
+            t.category,
+            t.tags or '',
+            t.deadline.strftime('%Y-%m-%d %H:%M:%S'),
+            t.status.value,
+            format_timedelta(now - t.deadline if overdue else t.deadline - now)
+        ]
+        for t in todos
+    )
+    headers = ['ID', '内容', '分类', '标签', '截止时间', '状态', '已逾期' if overdue else '剩余时间']
+    return echo_rows(rows, headers, output)
+
 def validate_todo_id(ctx, param, value):
     """验证待办事项ID是否为正整数"""
     try:
@@ -37,10 +91,9 @@ def todo_cli():
 def add_todo(content, category, tags, deadline):
     """新增待办事项命令"""
     try:
-        session = db.get_session()
-        service = TodoService(session)
-        todo = service.add_todo(content, category, tags, deadline)
-        click.echo(f'待办事项新增成功！ID: {todo.id}')
+        with service_scope() as service:
+            todo = service.add_todo(content, category, tags, deadline)
+            click.echo(f'待办事项新增成功！ID: {todo.id}')
     except Exception as e:
         click.echo(f'待办事项新增失败：{str(e)}', err=True)
 
@@ -50,14 +103,14 @@ def add_todo(content, category, tags, deadline):
 def update_todo(id, status):
     """更新待办事项状态命令"""
     try:
-        session = db.get_session()
-        service = TodoService(session)
-        todo_status = TodoStatus(status)
-        todo = service.update_todo_status(id, todo_status)
-        if todo:
-            click.echo(f'待办事项状态更新成功！ID: {todo.id}，新状态: {todo.status.value}')
-        else:
-            click.echo(f'待办事项不存在：ID {id}', err=True)
+        from cashlog.data.models import TodoStatus
+        with service_scope() as service:
+            todo_status = TodoStatus(status)
+            todo = service.update_todo_status(id, todo_status)
+            if todo:
+                click.echo(f'待办事项状态更新成功！ID: {todo.id}，新状态: {todo.status.value}')
+            else:
+                click.echo(f'待办事项不存在：ID {id}', err=True)
     except Exception as e:
         click.echo(f'更新待办事项状态失败：{str(e)}', err=True)
 
@@ -65,54 +118,148 @@ def update_todo(id, status):
 @click.option('--status', '-s', type=click.Choice(['todo', 'doing', 'done']), help='状态')
 @click.option('--category', '-ca', help='分类')
 @click.option('--deadline-before', '-db', callback=validate_date, help='截止时间之前，格式：YYYY-MM-DD HH:MM:SS')
-def list_todos(status, category, deadline_before):
+@click.option('--tags', '-t', help='标签，多个标签用逗号分隔')
+@click.option('--tag-mode', '-tm', type=click.Choice(['all', 'any']), default='all', help='多个标签的匹配方式：all 同时包含，any 包含任一')
+@click.option('--output', '-o', type=click.Choice(['table', 'tsv']), default='table', help='输出格式，tsv 逐行流式输出')
+@click.option('--limit', '-l', type=click.IntRange(min=1), help='每页最多显示的记录数')
+@click.option('--after', type=click.IntRange(min=1), help='分页游标：上一页最后一条待办事项的ID')
+def list_todos(status, category, deadline_before, tags, tag_mode, output, limit, after):
     """查询待办事项命令"""
     try:
-        session = db.get_session()
-        service = TodoService(session)
-        
-        # 处理状态
-        todo_status = None
-        if status is not None:
-            todo_status = TodoStatus(status)
-        
-        todos = service.get_todos(todo_status, category, deadline_before)
-        
-        if not todos:
-            click.echo('没有找到匹配的待办事项')
-            return
-        
-        # 准备表格数据
-        table_data = []
-        for t in todos:
-            deadline_str = t.deadline.strftime('%Y-%m-%d %H:%M:%S') if t.deadline else ''
-            table_data.append([
-                t.id,
-                t.content,
-                t.category,
-                t.tags or '',
-                deadline_str,
-                t.status.value,
-                t.created_at.strftime('%Y-%m-%d %H:%M:%S')
-            ])
-        
-        # 打印表格
-        headers = ['ID', '内容', '分类', '标签', '截止时间', '状态', '创建时间']
-        click.echo(tabulate(table_data, headers=headers, tablefmt='grid'))
+        from cashlog.data.models import TodoStatus
+        with service_scope() as service:
+            # 处理状态
+            todo_status = None
+            if status is not None:
+                todo_status = TodoStatus(status)
+            
+            todos = service.iter_todos(todo_status, category, deadline_before, tags, tag_mode, limit, after)
+            if limit is not None:
+                # 单页记录数有限，保留本页结果以便给出下一页游标
+                todos = list(todos)
+            
+            # 逐条生成表格行，不保留ORM对象
+            rows = (
+                [
+                    t.id,
+                    t.content,
+                    t.category,
+                    t.tags or '',
+                    t.deadline.strftime('%Y-%m-%d %H:%M:%S') if t.deadline else '',
+                    t.status.value,
+                    t.created_at.strftime('%Y-%m-%d %H:%M:%S')
+                ]
+                for t in todos
+            )
+            
+            # 打印表格
+            headers = ['ID', '内容', '分类', '标签', '截止时间', '状态', '创建时间']
+            count = echo_rows(rows, headers, output)
+            if count == 0:
+                click.echo('没有找到匹配的待办事项')
+            elif limit is not None and count == limit:
+                click.echo(f'可能还有更多待办事项，使用 --after {todos[-1].id} 查看下一页', err=True)
     except Exception as e:
         click.echo(f'查询待办事项失败：{str(e)}', err=True)
 
+@todo_cli.command(name='search', help='按内容全文搜索待办事项')
+@click.argument('query')
+@click.option('--status', '-s', type=click.Choice(['todo', 'doing', 'done']), help='状态')
+@click.option('--category', '-ca', help='分类')
+@click.option('--deadline-before', '-db', callback=validate_date, help='截止时间之前，格式：YYYY-MM-DD HH:MM:SS')
+@click.option('--tags', '-t', help='标签，多个标签用逗号分隔')
+@click.option('--tag-mode', '-tm', type=click.Choice(['all', 'any']), default='all', help='多个标签的匹配方式：all 同时包含，any 包含任一')
+@click.option('--output', '-o', type=click.Choice(['table', 'tsv']), default='table', help='输出格式')
+@click.option('--limit', '-l', type=click.IntRange(min=1), default=20, help='最多显示的记录数')
+def search_todos(query, status, category, deadline_before, tags, tag_mode, output, limit):
+    """按内容全文搜索待办事项命令"""
+    try:
+        from cashlog.data.models import TodoStatus
+        with service_scope() as service:
+            todo_status = TodoStatus(status) if status is not None else None
+            todos = service.search_todos(query, todo_status, category, deadline_before, tags, tag_mode, limit)
+            rows = (
+                [
+                    t.id,
+                    t.content,
+                    t.category,
+                    t.tags or '',
+                    t.deadline.strftime('%Y-%m-%d %H:%M:%S') if t.deadline else '',
+                    t.status.value,
+                    t.created_at.strftime('%Y-%m-%d %H:%M:%S')
+                ]
+                for t in todos
+            )
+            headers = ['ID', '内容', '分类', '标签', '截止时间', '状态', '创建时间']
+            if echo_rows(rows, headers, output) == 0:
+                click.echo('没有找到匹配的待办事项')
+    except Exception as e:
+        click.echo(f'搜索待办事项失败：{str(e)}', err=True)
+
+@todo_cli.command(name='due', help='按截止时间列出即将到期的未完成待办事项')
+@click.option('--within', '-w', callback=validate_duration, default='24h', show_default=True,
+              help='从现在起多长时间内到期，如 30m、24h、7d')
+@click.option('--output', '-o', type=click.Choice(['table', 'tsv']), default='table', help='输出格式')
+@click.option('--limit', '-l', type=click.IntRange(min=1), help='最多显示的记录数')
+def due_todos(within, output, limit):
+    """即将到期的待办事项命令"""
+    try:
+        now = datetime.now()
+        with service_scope() as service:
+            todos = service.get_due_todos(now, now + within, limit)
+            if echo_due_todos(todos, now, output) == 0:
+                click.echo('没有即将到期的待办事项')
+    except Exception as e:
+        click.echo(f'查询到期待办事项失败：{str(e)}', err=True)
+
+@todo_cli.command(name='overdue', help='列出已过截止时间的未完成待办事项')
+@click.option('--output', '-o', type=click.Choice(['table', 'tsv']), default='table', help='输出格式')
+@click.option('--limit', '-l', type=click.IntRange(min=1), help='最多显示的记录数')
+def overdue_todos(output, limit):
+    """逾期待办事项命令"""
+    try:
+        now = datetime.now()
+        with service_scope() as service:
+            todos = service.get_due_todos(end=now, limit=limit)
+            if echo_due_todos(todos, now, output, overdue=True) == 0:
+                click.echo('没有逾期的待办事项')
+    except Exception as e:
+        click.echo(f'查询逾期待办事项失败：{str(e)}', err=True)
+
+@todo_cli.command(name='watch', help='持续运行，在未完成待办事项到期时输出提醒')
+@click.option('--refresh', type=click.FloatRange(min=1), default=60, show_default=True,
+              help='检查是否有新增或修改的待办事项的最长间隔（秒）')
+def watch_todos(refresh):
+    """到期提醒命令"""
+    try:
+        from cashlog.data.database import get_db
+        from cashlog.service.deadline_watcher import DeadlineWatcher
+        watcher = DeadlineWatcher(get_db(), refresh=refresh)
+    except Exception as e:
+        click.echo(f'启动到期提醒失败：{str(e)}', err=True)
+        return
+    
+    def notify(todo):
+        click.echo(f'[{todo.deadline:%Y-%m-%d %H:%M:%S}] 待办到期：ID {todo.id} {todo.content}（{todo.category}）')
+    
+    click.echo('正在等待待办事项到期，Ctrl-C 停止（已逾期的待办事项请使用 todo overdue 查看）')
+    try:
+        watcher.run(notify)
+    except KeyboardInterrupt:
+        click.echo('已停止到期提醒')
+    except Exception as e:
+        click.echo(f'到期提醒失败：{str(e)}', err=True)
+
 @todo_cli.command(name='delete', help='删除待办事项')
 @click.option('--id', '-i', required=True, callback=validate_todo_id, help='待办事项ID')
 def delete_todo(id):
     """删除待办事项命令"""
     try:
-        session = db.get_session()
-        service = TodoService(session)
-        success = service.delete_todo(id)
-        if success:
-            click.echo(f'待办事项删除成功！ID: {id}')
-        else:
-            click.echo(f'待办事项不存在：ID {id}', err=True)
+        with service_scope() as service:
+            success = service.delete_todo(id)
+            if success:
+                click.echo(f'待办事项删除成功！ID: {id}')
+            else:
+                click.echo(f'待办事项不存在：ID {id}', err=True)
     except Exception as e:
         click.echo(f'删除待办事项失败：{str(e)}', err=True)
@@ -1,15 +1,57 @@
 import click
-from tabulate import tabulate
-from datetime import datetime
-from cashlog.data.database import db
-from cashlog.service.transaction_service import TransactionService
-from cashlog.data.models import TransactionType
+from contextlib import contextmanager
+import csv
+import json
+from datetime import datetime, timedelta
+from decimal import Decimal, InvalidOperation
+from cashlog.cli.output import echo_rows
+
+@contextmanager
+def service_scope(compact=False):
+    """在一个工作单元中创建收支记录业务逻辑对象，命令结束时提交并关闭会话
+    
+    数据库与业务逻辑模块在执行命令时才导入，使 --help 等命令无需加载SQLAlchemy。
+    
+    Args:
+        compact (bool, optional): 查询命令传True，先将采集日志中未入库的记录写入数据库. Defaults to False.
+    """
+    from cashlog.data.database import get_db
+    from cashlog.service.transaction_service import TransactionService
+    if compact:
+        compact_journal()
+    with get_db().session_scope() as session:
+        yield TransactionService(session)
+
+def compact_journal(force=False):
+    """将采集日志写入数据库，使之后的查询包含采集模式新增的记录
+    
+    Args:
+        force (bool, optional): 为False时日志为空则直接返回，不打开数据库会话. Defaults to False.
+    
+    Returns:
+        Optional[dict]: 压缩结果，见 JournalService.compact；未执行压缩时返回None
+    """
+    from cashlog.data.database import get_db
+    from cashlog.journal import has_entries
+    from cashlog.service.journal_service import JournalService
+    with get_db().session_scope() as session:
+        service = JournalService(session)
+        if force or has_entries(service.default_path()):
+            return service.compact()
+    return None
+
+def parse_amount(value):
+    """将金额解析为 Decimal，避免经过浮点数产生误差"""
+    amount = Decimal(str(value).strip())
+    if not amount.is_finite():
+        raise InvalidOperation(value)
+    return amount
 
 def validate_amount(ctx, param, value):
     """验证金额是否为数字"""
     try:
-        return float(value)
-    except ValueError:
+        return parse_amount(value)
+    except InvalidOperation:
         raise click.BadParameter('金额需为数字')
 
 def validate_date(ctx, param, value):
@@ -38,6 +80,103 @@ def validate_year(ctx, param, value):
         return value
     raise click.BadParameter(f'年份需在1900-{current_year + 10}之间')
 
+def parse_period_bound(value, inclusive_end=False):
+    """解析区间报表的起止时间
+    
+    Args:
+        value (str): 月份 YYYY-MM 或日期 YYYY-MM-DD
+        inclusive_end (bool, optional): 为True时返回该月份/日期之后的第一个时刻，用作不包含的结束时间. Defaults to False.
+    
+    Returns:
+        datetime: 对应的时间
+    """
+    try:
+        moment = datetime.strptime(value, '%Y-%m')
+        if inclusive_end:
+            moment = datetime(moment.year + 1, 1, 1) if moment.month == 12 else datetime(moment.year, moment.month + 1, 1)
+    except ValueError:
+        moment = datetime.strptime(value, '%Y-%m-%d')
+        if inclusive_end:
+            moment += timedelta(days=1)
+    return moment
+
+def validate_period_start(ctx, param, value):
+    """验证区间报表开始时间格式"""
+    if value is None:
+        return None
+    try:
+        return parse_period_bound(value)
+    except ValueError:
+        raise click.BadParameter('格式需为 YYYY-MM 或 YYYY-MM-DD')
+
+def validate_period_end(ctx, param, value):
+    """验证区间报表结束时间格式，结束月份/日期本身包含在区间内"""
+    if value is None:
+        return None
+    try:
+        return parse_period_bound(value, inclusive_end=True)
+    except ValueError:
+        raise click.BadParameter('格式需为 YYYY-MM 或 YYYY-MM-DD')
+
+def validate_percentiles(ctx, param, value):
+    """验证百分位列表，格式：50,90,99"""
+    try:
+        points = [float(p) for p in value.split(',') if p.strip()]
+    except ValueError:
+        raise click.BadParameter('百分位需为逗号分隔的数字，例如：50,90,99')
+    if any(p < 0 or p > 100 for p in points):
+        raise click.BadParameter('百分位需在0到100之间')
+    return points
+
+def parse_import_record(raw, line_no):
+    """将导入文件中的一行转换为收支记录字段
+    
+    Args:
+        raw (dict): 原始字段，支持 amount、category、tags、remark、time（或 transaction_time）
+        line_no (int): 行号，用于错误提示
+    
+    Returns:
+        dict: 可传给 TransactionService.add_transactions_bulk 的记录
+    """
+    try:
+        amount = parse_amount(raw['amount'])
+    except (KeyError, InvalidOperation):
+        raise click.ClickException(f'第{line_no}行金额无效：{raw.get("amount")}')
+    category = raw.get('category')
+    if not category:
+        raise click.ClickException(f'第{line_no}行缺少分类')
+    time_value = raw.get('time') or raw.get('transaction_time')
+    transaction_time = None
+    if time_value:
+        try:
+            # fromisoformat 比 strptime 快一个数量级，适合大文件导入
+            transaction_time = datetime.fromisoformat(time_value)
+        except ValueError:
+            raise click.ClickException(f'第{line_no}行日期格式需为 YYYY-MM-DD HH:MM:SS')
+    return {
+        'amount': amount,
+        'category': category,
+        'tags': raw.get('tags') or None,
+        'remark': raw.get('remark') or None,
+        'transaction_time': transaction_time,
+    }
+
+def iter_csv_records(file):
+    """逐行读取CSV文件（首行为表头）"""
+    for line_no, raw in enumerate(csv.DictReader(file), start=2):
+        yield parse_import_record(raw, line_no)
+
+def iter_jsonl_records(file):
+    """逐行读取JSON Lines文件，跳过空行"""
+    for line_no, line in enumerate(file, start=1):
+        if not line.strip():
+            continue
+        try:
+            raw = json.loads(line)
+        except json.JSONDecodeError:
+            raise click.ClickException(f'第{line_no}行不是有效的JSON')
+        yield parse_import_record(raw, line_no)
+
 @click.group(name='transaction', help='收支记录管理命令')
 def transaction_cli():
     """收支记录管理命令组"""
@@ -49,64 +188,135 @@ def transaction_cli():
 @click.option('--tags', '-t', help='标签，多个标签用逗号分隔')
 @click.option('--remark', '-r', help='备注')
 @click.option('--time', '-ti', callback=validate_date, help='交易时间，格式：YYYY-MM-DD HH:MM:SS')
-def add_transaction(amount, category, tags, remark, time):
+@click.option('--capture/--no-capture', default=None,
+              help='追加到采集日志后立即返回，下次查询时再入库；默认取配置 [journal] capture')
+def add_transaction(amount, category, tags, remark, time, capture):
     """新增收支记录命令"""
     try:
-        session = db.get_session()
-        service = TransactionService(session)
-        transaction = service.add_transaction(amount, category, tags, remark, time)
-        click.echo(f'收支记录新增成功！ID: {transaction.id}')
+        from cashlog.journal import capture_enabled, get_writer
+        if capture if capture is not None else capture_enabled():
+            # 采集模式不打开数据库，也不导入SQLAlchemy
+            get_writer().append(amount, category, tags, remark, time)
+            click.echo('收支记录已写入采集日志，将在下次查询或执行 transaction compact 时入库')
+            return
+        with service_scope() as service:
+            transaction = service.add_transaction(amount, category, tags, remark, time)
+            click.echo(f'收支记录新增成功！ID: {transaction.id}')
     except Exception as e:
         click.echo(f'收支记录新增失败：{str(e)}', err=True)
 
+@transaction_cli.command(name='import', help='从CSV或JSON Lines文件批量导入收支记录')
+@click.argument('file', type=click.Path(exists=True, dir_okay=False))
+@click.option('--format', '-f', type=click.Choice(['csv', 'jsonl']), default='csv', help='文件格式')
+@click.option('--batch-size', '-b', type=click.IntRange(min=1), default=5000, help='每批插入的记录数')
+def import_transactions(file, format, batch_size):
+    """批量导入收支记录命令，全部成功或全部回滚"""
+    try:
+        with service_scope() as service:
+            with open(file, encoding='utf-8-sig', newline='') as f:
+                records = iter_csv_records(f) if format == 'csv' else iter_jsonl_records(f)
+                count = service.add_transactions_bulk(records, batch_size=batch_size)
+            click.echo(f'收支记录导入成功！共 {count} 条')
+    except click.ClickException as e:
+        click.echo(f'收支记录导入失败：{e.message}', err=True)
+    except Exception as e:
+        click.echo(f'收支记录导入失败：{str(e)}', err=True)
+
 @transaction_cli.command(name='list', help='查询收支记录')
 @click.option('--month', '-m', type=int, callback=validate_month, help='月份')
 @click.option('--year', '-y', type=int, callback=validate_year, help='年份')
 @click.option('--category', '-c', help='分类')
-@click.option('--tags', '-t', help='标签')
+@click.option('--tags', '-t', help='标签，多个标签用逗号分隔')
+@click.option('--tag-mode', '-tm', type=click.Choice(['all', 'any']), default='all', help='多个标签的匹配方式：all 同时包含，any 包含任一')
 @click.option('--type', '-ty', type=click.Choice(['income', 'expense']), help='收支类型')
-def list_transactions(month, year, category, tags, type):
+@click.option('--output', '-o', type=click.Choice(['table', 'tsv']), default='table', help='输出格式，tsv 逐行流式输出')
+@click.option('--limit', '-l', type=click.IntRange(min=1), help='每页最多显示的记录数')
+@click.option('--after', type=click.IntRange(min=1), help='分页游标：上一页最后一条记录的ID')
+def list_transactions(month, year, category, tags, tag_mode, type, output, limit, after):
     """查询收支记录命令"""
     try:
-        session = db.get_session()
-        service = TransactionService(session)
-        
-        # 处理收支类型
-        transaction_type = None
-        if type == 'income':
-            transaction_type = TransactionType.INCOME
-        elif type == 'expense':
-            transaction_type = TransactionType.EXPENSE
-        
-        # 处理年份和月份的默认值
-        if month is not None and year is None:
-            year = datetime.now().year
-        
-        transactions = service.get_transactions(month, year, category, tags, transaction_type)
-        
-        if not transactions:
-            click.echo('没有找到匹配的收支记录')
-            return
-        
-        # 准备表格数据
-        table_data = []
-        for t in transactions:
-            table_data.append([
-                t.id,
-                t.amount,
-                t.category,
-                t.tags or '',
-                t.remark or '',
-                t.transaction_time.strftime('%Y-%m-%d %H:%M:%S'),
-                '收入' if t.type == TransactionType.INCOME else '支出'
-            ])
-        
-        # 打印表格
-        headers = ['ID', '金额', '分类', '标签', '备注', '交易时间', '类型']
-        click.echo(tabulate(table_data, headers=headers, tablefmt='grid'))
+        from cashlog.data.models import TransactionType
+        with service_scope(compact=True) as service:
+            # 处理收支类型
+            transaction_type = None
+            if type == 'income':
+                transaction_type = TransactionType.INCOME
+            elif type == 'expense':
+                transaction_type = TransactionType.EXPENSE
+            
+            # 处理年份和月份的默认值
+            if month is not None and year is None:
+                year = datetime.now().year
+            
+            transactions = service.iter_transactions(month, year, category, tags, transaction_type, tag_mode,
+                                                     limit, after)
+            if limit is not None:
+                # 单页记录数有限，保留本页结果以便给出下一页游标
+                transactions = list(transactions)
+            
+            # 逐条生成表格行，不保留ORM对象
+            rows = (
+                [
+                    t.id,
+                    t.amount,
+                    t.category,
+                    t.tags or '',
+                    t.remark or '',
+                    t.transaction_time.strftime('%Y-%m-%d %H:%M:%S'),
+                    '收入' if t.type == TransactionType.INCOME else '支出'
+                ]
+                for t in transactions
+            )
+            
+            # 打印表格
+            headers = ['ID', '金额', '分类', '标签', '备注', '交易时间', '类型']
+            count = echo_rows(rows, headers, output)
+            if count == 0:
+                click.echo('没有找到匹配的收支记录')
+            elif limit is not None and count == limit:
+                click.echo(f'可能还有更多记录，使用 --after {transactions[-1].id} 查看下一页', err=True)
     except Exception as e:
         click.echo(f'查询收支记录失败：{str(e)}', err=True)
 
+@transaction_cli.command(name='search', help='按备注全文搜索收支记录')
+@click.argument('query')
+@click.option('--month', '-m', type=int, callback=validate_month, help='月份')
+@click.option('--year', '-y', type=int, callback=validate_year, help='年份')
+@click.option('--category', '-c', help='分类')
+@click.option('--tags', '-t', help='标签，多个标签用逗号分隔')
+@click.option('--tag-mode', '-tm', type=click.Choice(['all', 'any']), default='all', help='多个标签的匹配方式：all 同时包含，any 包含任一')
+@click.option('--type', '-ty', type=click.Choice(['income', 'expense']), help='收支类型')
+@click.option('--output', '-o', type=click.Choice(['table', 'tsv']), default='table', help='输出格式')
+@click.option('--limit', '-l', type=click.IntRange(min=1), default=20, help='最多显示的记录数')
+def search_transactions(query, month, year, category, tags, tag_mode, type, output, limit):
+    """按备注全文搜索收支记录命令"""
+    try:
+        from cashlog.data.models import TransactionType
+        with service_scope(compact=True) as service:
+            transaction_type = TransactionType(type) if type is not None else None
+            if month is not None and year is None:
+                year = datetime.now().year
+            
+            transactions = service.search_transactions(query, month, year, category, tags, transaction_type,
+                                                       tag_mode, limit)
+            rows = (
+                [
+                    t.id,
+                    t.amount,
+                    t.category,
+                    t.tags or '',
+                    t.remark or '',
+                    t.transaction_time.strftime('%Y-%m-%d %H:%M:%S'),
+                    '收入' if t.type == TransactionType.INCOME else '支出'
+                ]
+                for t in transactions
+            )
+            headers = ['ID', '金额', '分类', '标签', '备注', '交易时间', '类型']
+            if echo_rows(rows, headers, output) == 0:
+                click.echo('没有找到匹配的收支记录')
+    except Exception as e:
+        click.echo(f'搜索收支记录失败：{str(e)}', err=True)
+
 @transaction_cli.command(name='summary', help='生成月度收支报表')
 @click.option('--month', '-m', type=int, callback=validate_month, help='月份，默认当前月')
 @click.option('--year', '-y', type=int, callback=validate_year, help='年份，默认当前年')
@@ -121,9 +331,8 @@ def monthly_summary(month, year, format):
         if year is None:
             year = current_date.year
         
-        session = db.get_session()
-        service = TransactionService(session)
-        summary = service.get_monthly_summary(month, year)
+        with service_scope(compact=True) as service:
+            summary = service.get_monthly_summary(month, year)
         
         if summary['transaction_count'] == 0:
             click.echo(f'{year}年{month}月没有交易记录')
@@ -155,3 +364,110 @@ def monthly_summary(month, year, format):
                 click.echo(f'| {cat} | {percentage}% | {summary["category_stats"][cat]:.2f} 元 |')
     except Exception as e:
         click.echo(f'生成月度报表失败：{str(e)}', err=True)
+
+@transaction_cli.command(name='report', help='生成区间收支报表，按月/季度/年汇总')
+@click.option('--from', 'start', required=True, callback=validate_period_start, help='开始月份或日期，格式：YYYY-MM 或 YYYY-MM-DD')
+@click.option('--to', 'end', required=True, callback=validate_period_end, help='结束月份或日期（包含），格式：YYYY-MM 或 YYYY-MM-DD')
+@click.option('--by', '-b', 'granularity', type=click.Choice(['month', 'quarter', 'year']), default='month', help='汇总粒度')
+@click.option('--output', '-o', type=click.Choice(['table', 'tsv']), default='table', help='输出格式')
+@click.option('--snapshot/--no-snapshot', default=True, help='存在与数据库一致的列式快照时是否使用快照')
+@click.option('--parallel', type=click.IntRange(min=1), default=1, show_default=True,
+              help='不使用快照时，将时间区间分片后由多少个进程并行汇总')
+def range_report(start, end, granularity, output, snapshot, parallel):
+    """生成区间收支报表命令"""
+    try:
+        with service_scope(compact=True) as service:
+            summary = service.get_range_summary(start, end, granularity, use_snapshot=snapshot,
+                                                parallel=parallel)
+        
+        rows = [
+            [p['period'], p['total_income'], p['total_expense'], p['balance'], p['transaction_count']]
+            for p in summary['periods']
+        ]
+        rows.append(['合计', summary['total_income'], summary['total_expense'], summary['balance'],
+                     summary['transaction_count']])
+        headers = ['周期', '收入', '支出', '结余', '笔数']
+        echo_rows(rows, headers, output)
+        
+        if output == 'table' and summary['category_stats']:
+            click.echo('\n分类合计：')
+            echo_rows(([cat, amount] for cat, amount in summary['category_stats'].items()), ['分类', '金额'])
+    except Exception as e:
+        click.echo(f'生成区间报表失败：{str(e)}', err=True)
+
+@transaction_cli.command(name='stats', help='统计分析：分类金额分位数、月度环比、按天/周直方图（需要 numpy）')
+@click.option('--from', 'start', callback=validate_period_start, help='开始月份或日期，格式：YYYY-MM 或 YYYY-MM-DD')
+@click.option('--to', 'end', callback=validate_period_end, help='结束月份或日期（包含），格式：YYYY-MM 或 YYYY-MM-DD')
+@click.option('--category', '-c', help='分类')
+@click.option('--type', '-ty', type=click.Choice(['income', 'expense']), help='收支类型')
+@click.option('--percentiles', '-p', default='50,90,99', callback=validate_percentiles, help='金额百分位，逗号分隔')
+@click.option('--histogram', '-hg', type=click.Choice(['day', 'week']), help='同时输出按天或按周的直方图')
+@click.option('--output', '-o', type=click.Choice(['table', 'tsv']), default='table', help='输出格式')
+@click.option('--snapshot/--no-snapshot', default=True, help='存在与数据库一致的列式快照时是否使用快照')
+def transaction_stats(start, end, category, type, percentiles, histogram, output, snapshot):
+    """统计分析命令"""
+    try:
+        from cashlog.data.database import get_db
+        from cashlog.data.models import TransactionType
+        from cashlog.service.analytics_service import AnalyticsService
+        transaction_type = TransactionType(type) if type else None
+        compact_journal()
+        with get_db().session_scope() as session:
+            frame = AnalyticsService(session).load_frame(start, end, category, transaction_type,
+                                                         use_snapshot=snapshot)
+        if len(frame) == 0:
+            click.echo('没有找到符合条件的收支记录')
+            return
+        
+        labels = [f'P{p:g}' for p in percentiles]
+        rows = [
+            [s['category'], s['count'], s['total_income'], s['total_expense'], s['mean'],
+             *s['percentiles'].values()]
+            for s in frame.category_stats(percentiles)
+        ]
+        if output == 'table':
+            click.echo('分类统计（分位数按金额绝对值计算）：')
+        echo_rows(rows, ['分类', '笔数', '收入', '支出', '均值', *labels], output)
+        
+        if output == 'table':
+            click.echo('\n月度环比：')
+            rows = [
+                [m['period'], m['count'], m['total_income'], m['total_expense'], m['balance'],
+                 '' if m['delta'] is None else m['delta'],
+                 '' if m['change_percent'] is None else f"{m['change_percent']:+.2f}%"]
+                for m in frame.month_over_month()
+            ]
+            echo_rows(rows, ['月份', '笔数', '收入', '支出', '结余', '结余变化', '支出环比'])
+            
+            if histogram:
+                click.echo(f"\n{'按天' if histogram == 'day' else '按周'}分布：")
+                rows = [
+                    [h['start'].isoformat(), h['count'], h['total_income'], h['total_expense']]
+                    for h in frame.histogram(histogram)
+                ]
+                echo_rows(rows, ['开始日期', '笔数', '收入', '支出'])
+    except ImportError as e:
+        click.echo(str(e), err=True)
+    except Exception as e:
+        click.echo(f'统计分析失败：{str(e)}', err=True)
+
+@transaction_cli.command(name='compact', help='将采集日志中的收支记录写入数据库并清空日志')
+def compact_transactions():
+    """压缩采集日志命令"""
+    try:
+        result = compact_journal(force=True)
+        click.echo(f'采集日志压缩完成！入库 {result["applied"]} 条，跳过已入库 {result["duplicates"]} 条')
+        if result['invalid']:
+            click.echo(f'{result["invalid"]} 行无法解析，已另存到 cashlog.journal.rejected', err=True)
+    except Exception as e:
+        click.echo(f'压缩采集日志失败：{str(e)}', err=True)
+
+@transaction_cli.command(name='rebuild-rollups', help='根据收支记录重新生成月度汇总表')
+def rebuild_rollups():
+    """重新生成月度汇总表命令"""
+    try:
+        with service_scope() as service:
+            count = service.rebuild_rollups()
+        click.echo(f'月度汇总表重建完成！共 {count} 行')
+    except Exception as e:
+        click.echo(f'重建月度汇总表失败：{str(e)}', err=True)
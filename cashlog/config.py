@@ -0,0 +1,44 @@
+"""cashlog 配置读取
+
+配置文件默认位于 ~/.cashlog/config.ini（可用环境变量 CASHLOG_CONFIG 指定其他路径），
+每项配置也可以通过对应的环境变量覆盖，例如：
+
+    [database]
+    profile = fast
+"""
+import configparser
+import os
+from pathlib import Path
+from typing import Optional
+
+def get_cashlog_dir() -> Path:
+    """获取cashlog数据目录 ~/.cashlog"""
+    return Path.home() / ".cashlog"
+
+def get_config_path() -> Path:
+    """获取配置文件路径"""
+    return Path(os.environ.get("CASHLOG_CONFIG") or get_cashlog_dir() / "config.ini")
+
+def get_setting(section: str, key: str, env_var: Optional[str] = None,
+                default: Optional[str] = None) -> Optional[str]:
+    """读取配置项，环境变量优先于配置文件
+    
+    Args:
+        section (str): 配置文件中的节名
+        key (str): 配置项名称
+        env_var (Optional[str], optional): 可覆盖该配置项的环境变量名. Defaults to None.
+        default (Optional[str], optional): 未配置时的默认值. Defaults to None.
+    
+    Returns:
+        Optional[str]: 配置值
+    """
+    if env_var and os.environ.get(env_var):
+        return os.environ[env_var]
+    config_path = get_config_path()
+    if config_path.is_file():
+        parser = configparser.ConfigParser()
+        parser.read(config_path, encoding="utf-8")
+        value = parser.get(section, key, fallback=None)
+        if value:
+            return value
+    return default
@@ -0,0 +1,112 @@
+"""asyncio 数据库连接
+
+供嵌入 cashlog 的 asyncio 应用使用，配合 AsyncTransactionService / AsyncTodoService：
+
+    db = AsyncDatabase()
+    async with db.session_scope() as session:
+        summary = await AsyncTransactionService(session).get_monthly_summary(1, 2024)
+    await db.close()
+
+连接通过 aiosqlite 驱动建立，每个连接的SQLite调用在该连接专属的线程中执行并以协程等待结果，
+线程数只与连接池大小有关，与并发请求数无关。
+
+依赖可选组件 aiosqlite：uv sync --extra async
+"""
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+from .database import (SQLITE_PROFILES, _apply_journal_mode, _apply_pragmas, _record_queries, resolve_pool_config,
+                       resolve_profile)
+from .migrations import upgrade
+from ..config import get_cashlog_dir
+from .. import profiling
+
+try:
+    import aiosqlite
+except ImportError:  # pragma: no cover - 取决于安装环境
+    aiosqlite = None
+
+def require_aiosqlite():
+    """确认已安装aiosqlite
+
+    Raises:
+        ImportError: 未安装aiosqlite时抛出，并提示安装方式
+    """
+    if aiosqlite is None:
+        raise ImportError("异步数据库访问需要安装 aiosqlite：uv sync --extra async 或 pip install aiosqlite")
+
+class AsyncDatabase:
+    """asyncio 数据库连接类，配置项与 Database 相同"""
+    
+    def __init__(self, db_path=None, profile=None, pool_size=None, max_overflow=None, pool_timeout=None):
+        """初始化数据库连接
+        
+        建表和迁移在创建时用一个临时的同步连接执行一次，之后的访问都通过异步引擎完成。
+        
+        Args:
+            db_path (str, optional): 数据库文件路径. 默认None，将使用用户主目录下的cashlog.db
+            profile (str, optional): SQLite性能配置，durable 或 fast. 默认None，从环境变量或配置文件读取
+            pool_size (int, optional): 连接池常驻连接数，即可同时执行的查询数. 默认None，默认5
+            max_overflow (int, optional): 连接池最多额外创建的连接数. 默认None，默认10
+            pool_timeout (int, optional): 等待可用连接的秒数. 默认None，默认30
+        
+        Raises:
+            ImportError: 未安装aiosqlite时抛出
+        """
+        require_aiosqlite()
+        if db_path is None:
+            cashlog_dir = get_cashlog_dir()
+            cashlog_dir.mkdir(exist_ok=True)
+            db_path = str(cashlog_dir / "cashlog.db")
+        
+        self.profile = resolve_profile(profile)
+        self.pool_config = resolve_pool_config(pool_size=pool_size, max_overflow=max_overflow,
+                                               pool_timeout=pool_timeout)
+        # 初始化日志模式和数据库表
+        sync_engine = create_engine(f"sqlite:///{db_path}")
+        try:
+            _apply_journal_mode(sync_engine, SQLITE_PROFILES[self.profile])
+            upgrade(sync_engine)
+        finally:
+            sync_engine.dispose()
+        
+        self.engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}", echo=False,
+                                          poolclass=AsyncAdaptedQueuePool, **self.pool_config)
+        # PRAGMA 和SQL统计注册在异步引擎包装的同步引擎上，与 Database 一致，SQL统计只在开启耗时分析时记录
+        event.listen(self.engine.sync_engine, "connect", _apply_pragmas(SQLITE_PROFILES[self.profile]))
+        self.query_stats = profiling.QueryStats()
+        if profiling.get_profiler() is not None:
+            _record_queries(self.engine.sync_engine, self.query_stats)
+        # 异步会话不能延迟加载属性，提交后不使对象过期，工作单元结束后仍可读取已加载的属性
+        self.SessionLocal = async_sessionmaker(self.engine, autoflush=False, expire_on_commit=False)
+    
+    def get_session(self) -> AsyncSession:
+        """获取异步数据库会话，调用方负责 await session.close()
+        
+        Returns:
+            AsyncSession: 异步数据库会话对象
+        """
+        return self.SessionLocal()
+    
+    @asynccontextmanager
+    async def session_scope(self) -> AsyncIterator[AsyncSession]:
+        """工作单元：正常结束时提交，发生异常时回滚，无论如何都关闭会话，语义同 Database.session_scope
+        
+        Yields:
+            AsyncSession: 异步数据库会话对象
+        """
+        session = self.SessionLocal()
+        try:
+            yield session
+            await session.commit()
+        except BaseException:
+            await session.rollback()
+            raise
+        finally:
+            await session.close()
+    
+    async def close(self):
+        """关闭连接池中的全部连接"""
+        await self.engine.dispose()
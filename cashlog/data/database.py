@@ -1,45 +1,304 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import QueuePool
+from contextlib import contextmanager
 from pathlib import Path
 import os
+import time
 from .models import Base
+from .migrations import upgrade
+from .query_cache import QueryCache, SESSION_INFO_KEY
+from ..config import get_cashlog_dir, get_setting
+from .. import profiling
+
+# SQLite性能配置预设，在每个连接建立时通过PRAGMA应用；journal_mode 保存在数据库文件中，
+# 只在创建数据库实例时设置一次，见 _apply_journal_mode
+SQLITE_PROFILES = {
+    # 回滚日志（新建数据库的默认模式）+ 每次提交完整fsync，断电也不会丢失已提交的数据
+    "durable": {
+        "synchronous": "FULL",
+        "cache_size": -16000,
+        "temp_store": "MEMORY",
+    },
+    # WAL日志 + 仅在检查点fsync，读写互不阻塞，断电时可能丢失最近的少量提交
+    "fast": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "mmap_size": 268435456,
+        "cache_size": -64000,
+        "temp_store": "MEMORY",
+    },
+}
+
+DEFAULT_PROFILE = "durable"
+
+# 连接池配置：配置项名称 -> (环境变量, 默认值)
+POOL_SETTINGS = {
+    # 常驻连接数
+    "pool_size": ("CASHLOG_DB_POOL_SIZE", 5),
+    # 常驻连接用尽时最多额外创建的连接数，归还后立即关闭
+    "max_overflow": ("CASHLOG_DB_MAX_OVERFLOW", 10),
+    # 连接全部被占用时等待归还的秒数，超时抛出异常
+    "pool_timeout": ("CASHLOG_DB_POOL_TIMEOUT", 30),
+}
+
+def resolve_profile(profile=None):
+    """确定要使用的SQLite性能配置
+    
+    优先级：参数 > 环境变量 CASHLOG_DB_PROFILE > 配置文件 [database] profile > 默认值 durable
+    
+    Args:
+        profile (str, optional): 配置名称. Defaults to None.
+    
+    Returns:
+        str: 配置名称
+    
+    Raises:
+        ValueError: 配置名称不存在时抛出
+    """
+    if profile is None:
+        profile = get_setting("database", "profile", env_var="CASHLOG_DB_PROFILE", default=DEFAULT_PROFILE)
+    if profile not in SQLITE_PROFILES:
+        raise ValueError(f"未知的数据库性能配置：{profile}，可选值：{', '.join(SQLITE_PROFILES)}")
+    return profile
+
+def resolve_pool_config(**overrides):
+    """确定连接池配置
+    
+    优先级：参数 > 环境变量 > 配置文件 [database] 节 > 默认值
+    
+    Args:
+        **overrides: pool_size、max_overflow、pool_timeout，值为None时忽略
+    
+    Returns:
+        dict: 可直接传给 create_engine 的连接池参数
+    
+    Raises:
+        ValueError: 配置值不是非负整数时抛出
+    """
+    config = {}
+    for key, (env_var, default) in POOL_SETTINGS.items():
+        value = overrides.get(key)
+        if value is None:
+            value = get_setting("database", key, env_var=env_var, default=default)
+        try:
+            value = int(value)
+        except (TypeError, ValueError):
+            raise ValueError(f"连接池配置 {key} 需为整数：{value}")
+        if value < 0:
+            raise ValueError(f"连接池配置 {key} 不能为负数：{value}")
+        config[key] = value
+    return config
+
+# 查询结果缓存配置：配置项名称 -> (环境变量, 默认值)，size 为0时不开启缓存
+CACHE_SETTINGS = {
+    # 最多缓存的查询结果数
+    "size": ("CASHLOG_QUERY_CACHE_SIZE", 0),
+    # 缓存结果的估算总字节数上限，0表示只按条目数限制
+    "max_bytes": ("CASHLOG_QUERY_CACHE_BYTES", 0),
+}
+
+def resolve_cache_config(**overrides):
+    """确定查询结果缓存配置
+    
+    优先级：参数 > 环境变量 > 配置文件 [cache] 节 > 默认值
+    
+    Args:
+        **overrides: size、max_bytes，值为None时忽略
+    
+    Returns:
+        dict: size 和 max_bytes
+    
+    Raises:
+        ValueError: 配置值不是非负整数时抛出
+    """
+    config = {}
+    for key, (env_var, default) in CACHE_SETTINGS.items():
+        value = overrides.get(key)
+        if value is None:
+            value = get_setting("cache", key, env_var=env_var, default=default)
+        try:
+            value = int(value)
+        except (TypeError, ValueError):
+            raise ValueError(f"查询缓存配置 {key} 需为整数：{value}")
+        if value < 0:
+            raise ValueError(f"查询缓存配置 {key} 不能为负数：{value}")
+        config[key] = value
+    return config
+
+def _apply_pragmas(pragmas):
+    """生成在新连接上执行PRAGMA的事件处理函数，journal_mode 除外"""
+    def on_connect(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            if name != "journal_mode":
+                cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+    return on_connect
+
+def _apply_journal_mode(engine, pragmas):
+    """设置数据库文件的日志模式
+
+    日志模式保存在数据库文件中，对所有连接生效。从WAL切换回回滚日志需要独占数据库，
+    其他进程（如使用 fast 配置的API服务）打开着数据库时会失败，因此 durable 配置不设置日志模式：
+    新建的数据库使用回滚日志，已切换为WAL的数据库保持WAL。
+    """
+    mode = pragmas.get("journal_mode")
+    if mode is None:
+        return
+    with engine.connect() as conn:
+        conn.exec_driver_sql(f"PRAGMA journal_mode={mode}")
+
+def _record_queries(engine, stats):
+    """在引擎上注册SQL执行事件，记录每条语句的耗时和行数
+
+    执行耗时始终记录；开启耗时分析时还会包装游标，把读取结果的耗时和行数一并计入。
+
+    Returns:
+        List[tuple]: 注册的 (事件名称, 处理函数)，用于移除监听
+    """
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        context._cashlog_started = time.perf_counter()
+
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - context._cashlog_started
+        # 查询语句的rowcount为-1，行数在读取结果时统计
+        stats.record(statement, elapsed, max(cursor.rowcount, 0))
+        if profiling.get_profiler() is not None:
+            profiling.add_time("sql", elapsed)
+            if cursor.description is not None:
+                context.cursor = profiling.TimedCursor(cursor, statement, stats)
+
+    listeners = [("before_cursor_execute", before_cursor_execute), ("after_cursor_execute", after_cursor_execute)]
+    for name, listener in listeners:
+        event.listen(engine, name, listener)
+    return listeners
 
 class Database:
     """数据库连接和初始化类"""
     
-    def __init__(self, db_path=None):
+    def __init__(self, db_path=None, profile=None, pool_size=None, max_overflow=None, pool_timeout=None,
+                 cache_size=None, cache_max_bytes=None):
         """初始化数据库连接
         
         Args:
             db_path (str, optional): 数据库文件路径. 默认None，将使用用户主目录下的cashlog.db
+            profile (str, optional): SQLite性能配置，durable 或 fast. 默认None，从环境变量或配置文件读取
+            pool_size (int, optional): 连接池常驻连接数. 默认None，从环境变量或配置文件读取，默认5
+            max_overflow (int, optional): 连接池最多额外创建的连接数. 默认None，默认10
+            pool_timeout (int, optional): 等待可用连接的秒数. 默认None，默认30
+            cache_size (int, optional): 查询结果缓存的条目数. 默认None，从环境变量或配置文件读取，默认0不开启
+            cache_max_bytes (int, optional): 查询结果缓存的估算字节数上限. 默认None，默认0不限制
         """
         if db_path is None:
-            # 获取用户主目录
-            home_dir = Path.home()
             # 创建cashlog目录
-            cashlog_dir = home_dir / ".cashlog"
+            cashlog_dir = get_cashlog_dir()
             cashlog_dir.mkdir(exist_ok=True)
             # 数据库文件路径
             db_path = str(cashlog_dir / "cashlog.db")
         
-        # 创建SQLite引擎
-        self.engine = create_engine(f"sqlite:///{db_path}", echo=False)
-        # 创建会话工厂
-        self.SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
-        # 初始化数据库表
+        # 创建SQLite引擎，并在每个新连接上应用性能配置
+        self.profile = resolve_profile(profile)
+        self.pool_config = resolve_pool_config(pool_size=pool_size, max_overflow=max_overflow,
+                                               pool_timeout=pool_timeout)
+        self.engine = create_engine(f"sqlite:///{db_path}", echo=False, poolclass=QueuePool, **self.pool_config)
+        event.listen(self.engine, "connect", _apply_pragmas(SQLITE_PROFILES[self.profile]))
+        # 每条SQL语句的耗时和行数统计，只在开启耗时分析时记录，平时执行语句没有额外开销
+        self.query_stats = profiling.QueryStats()
+        self._stats_listeners = None
+        if profiling.get_profiler() is not None:
+            self.record_queries()
+        # 查询结果缓存，通过会话的 info 传给业务逻辑层
+        cache_config = resolve_cache_config(size=cache_size, max_bytes=cache_max_bytes)
+        self.query_cache = None
+        session_info = {}
+        if cache_config["size"]:
+            self.query_cache = QueryCache(cache_config["size"], cache_config["max_bytes"])
+            self.query_cache.attach(self.engine)
+            session_info[SESSION_INFO_KEY] = self.query_cache
+        # 创建会话工厂；提交后不使对象过期，工作单元结束、会话关闭后仍可读取已加载的属性
+        self.SessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False,
+                                         bind=self.engine, info=session_info)
+        # 初始化日志模式和数据库表
+        _apply_journal_mode(self.engine, SQLITE_PROFILES[self.profile])
         self.init_db()
     
     def init_db(self):
-        """初始化数据库表"""
-        Base.metadata.create_all(bind=self.engine)
+        """初始化数据库表，并将已有数据库升级到最新结构版本"""
+        upgrade(self.engine)
+    
+    def record_queries(self, enabled: bool = True):
+        """开始或停止记录每条SQL语句的耗时和行数
+        
+        创建实例时已开启耗时分析则自动开始记录；交互模式等先创建实例的场景由 --profile 调用。
+        重新开始记录时清空之前的统计。
+        
+        Args:
+            enabled (bool, optional): 开始（True）或停止（False）记录. Defaults to True.
+        """
+        if enabled and self._stats_listeners is None:
+            self.query_stats.reset()
+            self._stats_listeners = _record_queries(self.engine, self.query_stats)
+        elif not enabled and self._stats_listeners is not None:
+            for name, listener in self._stats_listeners:
+                event.remove(self.engine, name, listener)
+            self._stats_listeners = None
     
     def get_session(self):
         """获取数据库会话
         
+        调用方负责关闭会话；长时间运行的进程应优先使用 session_scope()。
+        
         Returns:
             Session: 数据库会话对象
         """
         return self.SessionLocal()
+    
+    @contextmanager
+    def session_scope(self):
+        """工作单元：在一个会话中完成一组操作
+        
+        正常结束时提交，发生异常时回滚，无论如何都关闭会话并将连接归还连接池，
+        会话的标识映射随之释放，因此长时间运行的进程内存和连接数不会随操作次数增长。
+        业务逻辑层方法自行提交的部分不受最终回滚影响。
+        
+        Yields:
+            Session: 数据库会话对象
+        """
+        session = self.SessionLocal()
+        try:
+            yield session
+            session.commit()
+        except BaseException:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+    
+    def close(self):
+        """关闭连接池中的全部连接"""
+        self.engine.dispose()
+
+# 全局数据库实例，首次使用时才创建
+_db = None
+
+def get_db() -> Database:
+    """获取全局数据库实例
+    
+    首次调用时才创建 ~/.cashlog 目录、数据库引擎并执行建表和迁移，
+    只导入模块或执行 --help 等命令时不会访问数据库。
+    
+    Returns:
+        Database: 全局数据库实例
+    """
+    global _db
+    if _db is None:
+        with profiling.phase("engine"):
+            _db = Database()
+    return _db
 
-# 创建全局数据库实例
-db = Database()
+def __getattr__(name):
+    """兼容旧的 `from cashlog.data.database import db` 用法，访问时才创建实例"""
+    if name == "db":
+        return get_db()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
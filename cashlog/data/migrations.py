@@ -0,0 +1,212 @@
+"""数据库结构版本迁移
+
+每个迁移对应一个递增的版本号，已应用的版本记录在 schema_version 表中。
+全新数据库直接按当前模型建表并标记为最新版本；已有数据库则按顺序执行
+尚未应用的迁移，实现原地升级。
+"""
+from sqlalchemy import inspect, insert, select, text, Table
+from sqlalchemy.engine import Connection, Engine
+from typing import Callable, Dict, List, NamedTuple
+from .models import Base, Tag, MonthlyRollup, MONTHLY_ROLLUP_REBUILD_SQL, transaction_tags, todo_tags, parse_tags
+from .search import create_search_index
+
+SCHEMA_VERSION_TABLE = "schema_version"
+
+class Migration(NamedTuple):
+    """单个迁移步骤"""
+    version: int
+    description: str
+    upgrade: Callable[[Connection], None]
+
+MIGRATIONS: List[Migration] = []
+
+def migration(version: int, description: str):
+    """注册迁移函数的装饰器
+    
+    Args:
+        version (int): 迁移版本号，必须严格递增
+        description (str): 迁移说明
+    """
+    def decorator(func: Callable[[Connection], None]) -> Callable[[Connection], None]:
+        if MIGRATIONS and version <= MIGRATIONS[-1].version:
+            raise ValueError(f"迁移版本号必须递增：{version}")
+        MIGRATIONS.append(Migration(version, description, func))
+        return func
+    return decorator
+
+def latest_version() -> int:
+    """获取最新的结构版本号"""
+    return MIGRATIONS[-1].version if MIGRATIONS else 0
+
+def get_schema_version(conn: Connection) -> int:
+    """读取数据库当前的结构版本号
+    
+    Args:
+        conn (Connection): 数据库连接
+    
+    Returns:
+        int: 结构版本号，未初始化版本表时返回0
+    """
+    if SCHEMA_VERSION_TABLE not in inspect(conn).get_table_names():
+        return 0
+    version = conn.execute(text(f"SELECT version FROM {SCHEMA_VERSION_TABLE}")).scalar()
+    return version or 0
+
+def _set_schema_version(conn: Connection, version: int):
+    """写入结构版本号"""
+    conn.execute(text(f"DELETE FROM {SCHEMA_VERSION_TABLE}"))
+    conn.execute(text(f"INSERT INTO {SCHEMA_VERSION_TABLE} (version) VALUES (:version)"),
+                 {"version": version})
+
+def upgrade(engine: Engine) -> List[int]:
+    """将数据库升级到最新结构版本
+    
+    Args:
+        engine (Engine): 数据库引擎
+    
+    Returns:
+        List[int]: 本次执行的迁移版本号列表
+    """
+    with engine.begin() as conn:
+        tables = inspect(conn).get_table_names()
+        if SCHEMA_VERSION_TABLE not in tables:
+            conn.execute(text(f"CREATE TABLE {SCHEMA_VERSION_TABLE} (version INTEGER NOT NULL)"))
+            if "transactions" not in tables and "todos" not in tables:
+                # 全新数据库：按当前模型建表即为最新结构
+                Base.metadata.create_all(bind=conn)
+                _set_schema_version(conn, latest_version())
+                return []
+            # 引入版本表之前创建的数据库视为版本0
+            _set_schema_version(conn, 0)
+        current = get_schema_version(conn)
+    
+    applied = []
+    for step in MIGRATIONS:
+        if step.version <= current:
+            continue
+        with engine.begin() as conn:
+            step.upgrade(conn)
+            _set_schema_version(conn, step.version)
+        applied.append(step.version)
+    
+    # 补建迁移之外新增的表（已存在的表不受影响）；结构已是最新且表齐全时跳过，避免每次启动逐表检查
+    if applied or not set(Base.metadata.tables) <= set(tables):
+        Base.metadata.create_all(bind=engine)
+    return applied
+
+@migration(1, "为收支记录添加时间与分类索引")
+def _add_transaction_indexes(conn: Connection):
+    conn.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_transactions_transaction_time "
+        "ON transactions (transaction_time)"
+    ))
+    conn.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_transactions_category_time "
+        "ON transactions (category, transaction_time)"
+    ))
+
+@migration(2, "为待办事项添加状态、分类、截止时间与创建时间索引")
+def _add_todo_indexes(conn: Connection):
+    conn.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_todos_status_created_at "
+        "ON todos (status, created_at)"
+    ))
+    conn.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_todos_category_created_at "
+        "ON todos (category, created_at)"
+    ))
+    conn.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_todos_deadline "
+        "ON todos (deadline)"
+    ))
+    conn.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_todos_created_at "
+        "ON todos (created_at)"
+    ))
+
+def _backfill_tags(conn: Connection, source: str, link_table: Table, owner_column: str,
+                   tag_ids: Dict[str, int], batch_size: int = 5000):
+    """将逗号分隔的标签字符串回填到标签表和关联表"""
+    rows = conn.execute(text(
+        f"SELECT id, tags FROM {source} WHERE tags IS NOT NULL AND tags != ''"
+    )).fetchall()
+    links = []
+    for owner_id, tags in rows:
+        for name in parse_tags(tags):
+            if name not in tag_ids:
+                tag_ids[name] = conn.execute(insert(Tag.__table__).values(name=name)).inserted_primary_key[0]
+            links.append({owner_column: owner_id, "tag_id": tag_ids[name]})
+        if len(links) >= batch_size:
+            conn.execute(insert(link_table), links)
+            links = []
+    if links:
+        conn.execute(insert(link_table), links)
+
+@migration(3, "新增标签表及收支记录/待办事项关联表，并回填已有标签")
+def _add_tag_tables(conn: Connection):
+    for table in (Tag.__table__, transaction_tags, todo_tags):
+        table.create(bind=conn, checkfirst=True)
+    tag_ids = {name: tag_id for tag_id, name in conn.execute(select(Tag.id, Tag.name))}
+    _backfill_tags(conn, "transactions", transaction_tags, "transaction_id", tag_ids)
+    _backfill_tags(conn, "todos", todo_tags, "todo_id", tag_ids)
+
+@migration(4, "收支金额改为以分为单位的整数存储")
+def _store_amount_in_cents(conn: Connection):
+    # SQLite不支持修改列类型，按官方推荐的方式新建表、复制数据后替换旧表
+    conn.execute(text("DROP TABLE IF EXISTS transactions_new"))
+    conn.execute(text(
+        "CREATE TABLE transactions_new ("
+        "id INTEGER NOT NULL, "
+        "amount_cents INTEGER NOT NULL, "
+        "category VARCHAR(50) NOT NULL, "
+        "tags VARCHAR(200), "
+        "remark VARCHAR(500), "
+        "transaction_time DATETIME NOT NULL, "
+        "created_at DATETIME NOT NULL, "
+        "updated_at DATETIME NOT NULL, "
+        "PRIMARY KEY (id))"
+    ))
+    conn.execute(text(
+        "INSERT INTO transactions_new "
+        "(id, amount_cents, category, tags, remark, transaction_time, created_at, updated_at) "
+        "SELECT id, CAST(ROUND(amount * 100) AS INTEGER), category, tags, remark, "
+        "transaction_time, created_at, updated_at FROM transactions"
+    ))
+    conn.execute(text("DROP TABLE transactions"))
+    conn.execute(text("ALTER TABLE transactions_new RENAME TO transactions"))
+    _add_transaction_indexes(conn)
+
+@migration(5, "新增月度分类汇总表，并根据已有收支记录生成")
+def _add_monthly_rollups(conn: Connection):
+    MonthlyRollup.__table__.create(bind=conn, checkfirst=True)
+    conn.execute(text("DELETE FROM monthly_rollups"))
+    conn.execute(MONTHLY_ROLLUP_REBUILD_SQL)
+
+@migration(6, "为区间报表添加交易时间、分类、金额覆盖索引")
+def _add_range_report_index(conn: Connection):
+    conn.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_transactions_time_category_amount "
+        "ON transactions (transaction_time, category, amount_cents)"
+    ))
+
+@migration(7, "为收支记录添加采集日志条目ID，用于日志压缩时去重")
+def _add_capture_id(conn: Connection):
+    columns = {column["name"] for column in inspect(conn).get_columns("transactions")}
+    if "capture_id" not in columns:
+        conn.execute(text("ALTER TABLE transactions ADD COLUMN capture_id VARCHAR(32)"))
+    conn.execute(text(
+        "CREATE UNIQUE INDEX IF NOT EXISTS ix_transactions_capture_id "
+        "ON transactions (capture_id) WHERE capture_id IS NOT NULL"
+    ))
+
+@migration(8, "新增收支备注与待办内容的全文索引，并根据已有数据生成")
+def _add_search_indexes(conn: Connection):
+    create_search_index(conn, "transactions", rebuild=True)
+    create_search_index(conn, "todos", rebuild=True)
+
+@migration(9, "为未完成待办添加按截止时间排序的部分索引")
+def _add_open_deadline_index(conn: Connection):
+    conn.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_todos_open_deadline "
+        "ON todos (deadline) WHERE status != 'DONE' AND deadline IS NOT NULL"
+    ))
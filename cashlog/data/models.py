@@ -1,7 +1,11 @@
-from sqlalchemy import Column, Integer, Float, String, DateTime, Boolean, Enum
+from sqlalchemy import Column, Integer, Float, String, DateTime, Boolean, Enum, Index, Table, ForeignKey, event, text
 from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.orm import relationship
 from datetime import datetime
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
 import enum
+from typing import Iterable, List, Optional, Union
+from .search import create_search_index
 
 Base = declarative_base()
 
@@ -16,27 +20,153 @@ class TodoStatus(enum.Enum):
     DOING = "doing"
     DONE = "done"
 
+def to_cents(amount: Union[Decimal, float, int, str]) -> int:
+    """将金额转换为以分为单位的整数，超过两位的小数四舍五入
+    
+    Args:
+        amount (Union[Decimal, float, int, str]): 金额
+    
+    Returns:
+        int: 以分为单位的金额
+    
+    Raises:
+        ValueError: 金额不是有限数字时抛出
+    """
+    try:
+        # 浮点数先转为最短十进制表示，避免 0.1 变成 0.1000000000000000055...
+        value = amount if isinstance(amount, Decimal) else Decimal(str(amount).strip())
+    except InvalidOperation:
+        raise ValueError(f"金额需为数字：{amount}")
+    if not value.is_finite():
+        raise ValueError(f"金额需为有限数字：{amount}")
+    return int(value.quantize(Decimal("0.01"), rounding=ROUND_HALF_UP).scaleb(2))
+
+def from_cents(cents: Optional[int]) -> Decimal:
+    """将以分为单位的整数转换为保留两位小数的金额
+    
+    Args:
+        cents (Optional[int]): 以分为单位的金额，None视为0
+    
+    Returns:
+        Decimal: 金额
+    """
+    return Decimal(cents or 0).scaleb(-2)
+
+def parse_tags(tags: Optional[str]) -> List[str]:
+    """解析逗号分隔的标签字符串
+    
+    Args:
+        tags (Optional[str]): 标签字符串，支持中英文逗号分隔
+    
+    Returns:
+        List[str]: 去除空白和重复项后的标签列表，保持原有顺序
+    """
+    if not tags:
+        return []
+    names = []
+    for name in tags.replace("，", ",").split(","):
+        name = name.strip()
+        if name and name not in names:
+            names.append(name)
+    return names
+
+def format_tags(names: Iterable[str]) -> Optional[str]:
+    """将标签列表格式化为逗号分隔的字符串
+    
+    Args:
+        names (Iterable[str]): 标签列表
+    
+    Returns:
+        Optional[str]: 逗号分隔的标签字符串，无标签时返回None
+    """
+    joined = ",".join(names)
+    return joined or None
+
+# 收支记录与标签的多对多关联表
+transaction_tags = Table(
+    "transaction_tags",
+    Base.metadata,
+    Column("transaction_id", Integer, ForeignKey("transactions.id", ondelete="CASCADE"), primary_key=True),
+    Column("tag_id", Integer, ForeignKey("tags.id", ondelete="CASCADE"), primary_key=True),
+    # 按标签反查收支记录
+    Index("ix_transaction_tags_tag_id", "tag_id", "transaction_id"),
+)
+
+# 待办事项与标签的多对多关联表
+todo_tags = Table(
+    "todo_tags",
+    Base.metadata,
+    Column("todo_id", Integer, ForeignKey("todos.id", ondelete="CASCADE"), primary_key=True),
+    Column("tag_id", Integer, ForeignKey("tags.id", ondelete="CASCADE"), primary_key=True),
+    # 按标签反查待办事项
+    Index("ix_todo_tags_tag_id", "tag_id", "todo_id"),
+)
+
+class Tag(Base):
+    """标签模型"""
+    __tablename__ = "tags"
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    name = Column(String(50), nullable=False, unique=True)
+
 class Transaction(Base):
     """收支记录模型"""
     __tablename__ = "transactions"
+    __table_args__ = (
+        # 按月份筛选与按交易时间排序
+        Index("ix_transactions_transaction_time", "transaction_time"),
+        # 按分类筛选并按交易时间排序
+        Index("ix_transactions_category_time", "category", "transaction_time"),
+        # 覆盖索引：区间报表只需读取索引即可完成按周期和分类的聚合
+        Index("ix_transactions_time_category_amount", "transaction_time", "category", "amount_cents"),
+        # 采集日志条目ID唯一，日志压缩重复执行时不会重复入库
+        Index("ix_transactions_capture_id", "capture_id", unique=True,
+              sqlite_where=text("capture_id IS NOT NULL")),
+    )
     
     id = Column(Integer, primary_key=True, autoincrement=True)
-    amount = Column(Float, nullable=False)
+    # 金额以分为单位的整数存储，保证汇总精确
+    amount_cents = Column(Integer, nullable=False)
     category = Column(String(50), nullable=False)
     tags = Column(String(200), nullable=True)
     remark = Column(String(500), nullable=True)
     transaction_time = Column(DateTime, nullable=False, default=datetime.now)
     created_at = Column(DateTime, nullable=False, default=datetime.now)
     updated_at = Column(DateTime, nullable=False, default=datetime.now, onupdate=datetime.now)
+    # 经采集日志写入的记录对应的日志条目ID，直接新增的记录为空
+    capture_id = Column(String(32), nullable=True)
+    # 规范化后的标签，与tags字段由业务逻辑层保持同步
+    tag_list = relationship("Tag", secondary=transaction_tags)
+    
+    @property
+    def amount(self) -> Decimal:
+        """金额，正数为收入，负数为支出"""
+        return from_cents(self.amount_cents)
+    
+    @amount.setter
+    def amount(self, value: Union[Decimal, float, int, str]):
+        self.amount_cents = to_cents(value)
     
     @property
     def type(self):
         """根据金额判断收支类型"""
-        return TransactionType.INCOME if self.amount > 0 else TransactionType.EXPENSE
+        return TransactionType.INCOME if self.amount_cents > 0 else TransactionType.EXPENSE
 
 class Todo(Base):
     """待办事项模型"""
     __tablename__ = "todos"
+    __table_args__ = (
+        # 按状态/分类筛选并按创建时间排序
+        Index("ix_todos_status_created_at", "status", "created_at"),
+        Index("ix_todos_category_created_at", "category", "created_at"),
+        # 按截止时间筛选
+        Index("ix_todos_deadline", "deadline"),
+        # 未完成待办按截止时间排序：到期/逾期查询与到期提醒只读取该部分索引
+        Index("ix_todos_open_deadline", "deadline",
+              sqlite_where=text("status != 'DONE' AND deadline IS NOT NULL")),
+        # 不带筛选条件时按创建时间排序
+        Index("ix_todos_created_at", "created_at"),
+    )
     
     id = Column(Integer, primary_key=True, autoincrement=True)
     content = Column(String(500), nullable=False)
@@ -46,3 +176,36 @@ class Todo(Base):
     status = Column(Enum(TodoStatus), nullable=False, default=TodoStatus.TODO)
     created_at = Column(DateTime, nullable=False, default=datetime.now)
     updated_at = Column(DateTime, nullable=False, default=datetime.now, onupdate=datetime.now)
+    # 规范化后的标签，与tags字段由业务逻辑层保持同步
+    tag_list = relationship("Tag", secondary=todo_tags)
+
+class MonthlyRollup(Base):
+    """月度分类汇总模型，由业务逻辑层随收支记录的写入增量维护"""
+    __tablename__ = "monthly_rollups"
+    
+    year = Column(Integer, primary_key=True)
+    month = Column(Integer, primary_key=True)
+    category = Column(String(50), primary_key=True)
+    # 金额均以分为单位
+    income_cents = Column(Integer, nullable=False, default=0)
+    expense_cents = Column(Integer, nullable=False, default=0)
+    transaction_count = Column(Integer, nullable=False, default=0)
+
+# 根据收支记录重新生成月度汇总：从交易时间中提取年月，按分类汇总全部收支记录。
+# 业务逻辑层的重建和数据库迁移（版本5）共用这一条语句
+MONTHLY_ROLLUP_REBUILD_SQL = text(
+    "INSERT INTO monthly_rollups (year, month, category, income_cents, expense_cents, transaction_count) "
+    "SELECT CAST(strftime('%Y', transaction_time) AS INTEGER), "
+    "CAST(strftime('%m', transaction_time) AS INTEGER), category, "
+    "SUM(CASE WHEN amount_cents > 0 THEN amount_cents ELSE 0 END), "
+    "SUM(CASE WHEN amount_cents < 0 THEN -amount_cents ELSE 0 END), "
+    "COUNT(*) "
+    "FROM transactions GROUP BY 1, 2, category"
+)
+
+def _create_search_index(target, connection, **kw):
+    """建表后创建备注/待办内容的全文索引，见 cashlog.data.search"""
+    create_search_index(connection, target.name)
+
+for _table in (Transaction.__table__, Todo.__table__):
+    event.listen(_table, "after_create", _create_search_index)
@@ -0,0 +1,252 @@
+"""查询结果缓存
+
+在两次写入之间反复以相同参数查询时（API服务、交互模式、嵌入cashlog的看板程序），
+业务逻辑层可以直接返回上次的结果。缓存按查询名称和规范化后的参数建键，按条目数（及可选的
+估算字节数）做LRU淘汰，并通过两种方式失效：
+
+- 本进程的写入：引擎上的事件记录每个事务写过的表，事务提交、连接归还连接池后递增这些表的
+  数据版本号；缓存条目记录其依赖表的版本号，版本变化后不再命中。INSERT/UPDATE/DELETE 不论来自
+  ORM、批量导入还是原始SQL都会被记录，无法确定表名的写入使全部缓存失效。
+- 其他进程的写入：每个事务第一次查缓存前读取当前连接的 PRAGMA data_version，其他连接提交过
+  写入时该值会变化，此时使全部缓存失效。
+
+开启方式见 Database 的 cache_size 参数或配置文件 [cache] 节；未开启时业务逻辑层照常查询数据库。
+"""
+import re
+import sys
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, Iterable, NamedTuple, Optional, Tuple
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+# Session.info 中保存缓存对象的键，由 Database 创建会话工厂时写入
+SESSION_INFO_KEY = "query_cache"
+
+# 连接信息（随连接池中的连接保存）中使用的键
+_WRITTEN = "cashlog_cache_written"      # 当前事务写过的表
+_COMMITTED = "cashlog_cache_committed"  # 已提交、尚未递增版本号的表
+_DATA_VERSION = "cashlog_cache_data_version"  # 该连接上次读到的 PRAGMA data_version
+_CHECKED = "cashlog_cache_checked"      # 当前事务已检查过其他进程的写入
+
+# 无法确定表名时使用，使全部缓存失效
+ALL_TABLES = "*"
+
+_DML = re.compile(r"^\s*(INSERT|REPLACE|UPDATE|DELETE)\b", re.IGNORECASE)
+
+class _Entry(NamedTuple):
+    """缓存条目"""
+    stamp: tuple
+    value: object
+    size: int
+
+def estimate_size(value) -> int:
+    """粗略估算查询结果占用的字节数，ORM对象按其已加载的属性计算"""
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(estimate_size(k) + estimate_size(v) for k, v in value.items())
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        size += sum(estimate_size(item) for item in value)
+    elif hasattr(value, "__dict__") and not isinstance(value, type):
+        size += sum(estimate_size(v) for k, v in vars(value).items() if not k.startswith("_sa_"))
+    return size
+
+class QueryCache:
+    """按表数据版本失效的LRU查询结果缓存，可在多个线程间共享"""
+
+    def __init__(self, max_entries: int = 256, max_bytes: Optional[int] = None, watch_external: bool = True):
+        """初始化缓存
+
+        Args:
+            max_entries (int, optional): 最多缓存的结果数. Defaults to 256.
+            max_bytes (Optional[int], optional): 缓存结果的估算总字节数上限. Defaults to None，不限制.
+            watch_external (bool, optional): 是否通过 PRAGMA data_version 发现其他进程的写入. Defaults to True.
+                本进程使用多个连接时，另一个连接的提交同样会使全部缓存失效
+        """
+        if max_entries < 1:
+            raise ValueError(f"缓存条目数需为正整数：{max_entries}")
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes or None
+        self.watch_external = watch_external
+        self._entries: "OrderedDict[Hashable, _Entry]" = OrderedDict()
+        self._versions: Dict[str, int] = {}
+        self._epoch = 0
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.bypasses = 0
+        self.evictions = 0
+
+    def attach(self, engine: Engine):
+        """在引擎上注册事件，记录写入并在提交后使相关缓存失效
+
+        Args:
+            engine (Engine): 数据库引擎
+        """
+        @event.listens_for(engine, "after_cursor_execute")
+        def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            if context.isinsert or context.isupdate or context.isdelete:
+                table = getattr(context.compiled.statement, "table", None)
+                name = getattr(table, "name", ALL_TABLES)
+            elif _DML.match(statement):
+                name = ALL_TABLES
+            else:
+                return
+            conn.info.setdefault(_WRITTEN, set()).add(name)
+
+        @event.listens_for(engine, "commit")
+        def commit(conn):
+            # 此时尚未真正提交，先记下，等连接归还或开始下一个事务时再递增版本号，
+            # 避免其他线程在提交完成前按新版本号缓存旧数据
+            written = conn.info.pop(_WRITTEN, None)
+            if written:
+                conn.info.setdefault(_COMMITTED, set()).update(written)
+
+        @event.listens_for(engine, "rollback")
+        def rollback(conn):
+            conn.info.pop(_WRITTEN, None)
+
+        @event.listens_for(engine, "begin")
+        def begin(conn):
+            conn.info.pop(_CHECKED, None)
+            self._release(conn.info)
+
+        @event.listens_for(engine, "checkin")
+        def checkin(dbapi_connection, connection_record):
+            if connection_record is not None:
+                self._release(connection_record.info)
+
+    def _release(self, info: dict):
+        """递增连接上已提交写入所涉及表的版本号"""
+        committed = info.pop(_COMMITTED, None)
+        if committed:
+            self.invalidate(committed)
+
+    def invalidate(self, tables: Optional[Iterable[str]] = None):
+        """使依赖这些表的缓存失效
+
+        Args:
+            tables (Optional[Iterable[str]], optional): 表名. Defaults to None，使全部缓存失效.
+        """
+        tables = None if tables is None else set(tables)
+        with self._lock:
+            if tables is None or ALL_TABLES in tables:
+                self._epoch += 1
+                return
+            for table in tables:
+                self._versions[table] = self._versions.get(table, 0) + 1
+
+    def clear(self):
+        """清空缓存和命中统计"""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            self.hits = self.misses = self.bypasses = self.evictions = 0
+
+    def _stamp(self, tables: Tuple[str, ...]) -> tuple:
+        return (self._epoch,) + tuple(self._versions.get(table, 0) for table in tables)
+
+    def _check_external(self, connection):
+        """读取连接的 PRAGMA data_version，与上次不同（或首次读取）时使全部缓存失效
+
+        每个事务只检查一次，同一工作单元内的重复查询只需查找字典。
+        """
+        if connection.info.get(_CHECKED):
+            return
+        connection.info[_CHECKED] = True
+        dbapi_connection = connection.connection.driver_connection
+        version = dbapi_connection.execute("PRAGMA data_version").fetchone()[0]
+        if connection.info.get(_DATA_VERSION) != version:
+            connection.info[_DATA_VERSION] = version
+            self.invalidate()
+
+    def get_or_load(self, session: Session, key: Hashable, tables: Tuple[str, ...], load: Callable[[], object],
+                    detach: bool = False):
+        """返回缓存的查询结果，未命中时调用 load 查询并缓存
+
+        Args:
+            session (Session): 执行查询的会话
+            key (Hashable): 查询名称和规范化后的参数
+            tables (Tuple[str, ...]): 查询依赖的表
+            load (Callable[[], object]): 查询函数
+            detach (bool, optional): 结果是否为ORM对象序列，是则在缓存前将其移出会话. Defaults to False.
+                结果中有查询前已在会话中的对象时不缓存
+
+        Returns:
+            object: 查询结果，命中时与之前返回的是同一个对象，调用方不应修改
+        """
+        connection = session.connection()
+        if connection.info.get(_WRITTEN):
+            # 当前事务有未提交的写入，结果可能包含未提交的数据，既不读也不写缓存
+            with self._lock:
+                self.bypasses += 1
+            return load()
+        if self.watch_external:
+            self._check_external(connection)
+
+        with self._lock:
+            # 版本号在查询前取得：查询期间有新的写入提交时，本次结果存入后也不会再命中
+            stamp = self._stamp(tables)
+            entry = self._entries.get(key)
+            if entry is not None and entry.stamp == stamp:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry.value
+            self.misses += 1
+
+        # 查询前会话中已有的对象，调用方可能仍持有并继续修改（如刚新增或更新的记录）
+        held = set(session.identity_map.values()) if detach else None
+        value = load()
+        if detach:
+            if any(obj in held for obj in value):
+                # 不能把调用方的对象移出会话，也不能让其他会话读到它，本次结果不缓存
+                return value
+            # 缓存的ORM对象会被其他会话读取，不能再随本会话过期或刷新
+            for obj in value:
+                session.expunge(obj)
+        self._store(key, stamp, value)
+        return value
+
+    def _store(self, key: Hashable, stamp: tuple, value: object):
+        """写入缓存并按LRU淘汰超出上限的条目"""
+        size = estimate_size(value) if self.max_bytes else 0
+        if self.max_bytes and size > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous.size
+            self._entries[key] = _Entry(stamp, value, size)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or (self.max_bytes and self._bytes > self.max_bytes):
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted.size
+                self.evictions += 1
+
+    def stats(self) -> dict:
+        """命中统计
+
+        Returns:
+            dict: hits、misses、bypasses（有未提交写入时直接查询的次数）、evictions、hit_rate、entries、bytes
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "bypasses": self.bypasses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+            }
+
+def cached(session: Session, key: Hashable, tables: Tuple[str, ...], load: Callable[[], object],
+           detach: bool = False):
+    """业务逻辑层使用的缓存入口，会话未配置缓存时直接调用 load，参数见 QueryCache.get_or_load"""
+    cache = session.info.get(SESSION_INFO_KEY)
+    if cache is None:
+        return load()
+    return cache.get_or_load(session, key, tables, load, detach)
@@ -0,0 +1,132 @@
+"""收支备注与待办内容的全文索引
+
+使用 SQLite FTS5 的 trigram 分词器建立外部内容（external content）索引：索引只保存三字组，
+文本仍在原表中；原表上的触发器在增删改时同步索引，批量导入等绕过ORM的写入同样生效。
+
+trigram 分词不依赖空格切词，中文和英文都可以按任意子串（包括前缀）检索，不区分大小写；
+但少于3个字符的关键词无法使用索引，只能对原表做 LIKE 匹配（见 parse_query）。
+需要 SQLite 3.34 及以上版本。
+
+全部匹配记录（已应用其他筛选条件）按 FTS5 的 rank 列（bm25）排序，见 match_candidates；
+只有少于3个字符的关键词时没有相关度，按原表查询的时间顺序排列。
+"""
+from sqlalchemy import column, literal, literal_column, table, text, ColumnElement, Select, Subquery
+from sqlalchemy.engine import Connection
+from typing import List, NamedTuple, Optional, Tuple
+
+# trigram 分词能够使用索引的最短关键词长度
+MIN_INDEXED_TERM_LENGTH = 3
+
+class SearchIndex(NamedTuple):
+    """一张原表上的全文索引"""
+    table: str
+    fts_table: str
+    text_column: str
+
+SEARCH_INDEXES = {
+    "transactions": SearchIndex("transactions", "transactions_fts", "remark"),
+    "todos": SearchIndex("todos", "todos_fts", "content"),
+}
+
+# 查询用的全文索引表，rowid 与原表ID相同，rank 为匹配记录的相关度（越小越相关）
+transactions_fts = table("transactions_fts", column("rowid"), column("rank"))
+todos_fts = table("todos_fts", column("rowid"), column("rank"))
+
+class SearchQuery(NamedTuple):
+    """解析后的搜索关键词"""
+    terms: List[str]
+    # FTS5 MATCH 表达式，没有可以使用索引的关键词时为None
+    expression: Optional[str]
+    # 少于3个字符、需要用 LIKE 匹配的关键词
+    short_terms: List[str]
+
+def _index_ddl(index: SearchIndex) -> List[str]:
+    """全文索引表及同步触发器的建表语句"""
+    fts, source, col = index.fts_table, index.table, index.text_column
+    delete_old = f"INSERT INTO {fts}({fts}, rowid, {col}) VALUES ('delete', old.id, old.{col});"
+    insert_new = f"INSERT INTO {fts}(rowid, {col}) VALUES (new.id, new.{col});"
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5("
+        f"{col}, content='{source}', content_rowid='id', tokenize='trigram')",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_insert AFTER INSERT ON {source} BEGIN {insert_new} END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_delete AFTER DELETE ON {source} BEGIN {delete_old} END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_update AFTER UPDATE OF {col} ON {source} "
+        f"BEGIN {delete_old} {insert_new} END",
+    ]
+
+def create_search_index(conn: Connection, source: str, rebuild: bool = False):
+    """在原表上创建全文索引和同步触发器，已存在时跳过
+
+    Args:
+        conn (Connection): 数据库连接
+        source (str): 原表名，transactions 或 todos
+        rebuild (bool, optional): 是否根据原表已有数据重建索引，为已有数据库补建索引时使用. Defaults to False.
+    """
+    index = SEARCH_INDEXES[source]
+    for statement in _index_ddl(index):
+        conn.execute(text(statement))
+    if rebuild:
+        conn.execute(text(f"INSERT INTO {index.fts_table}({index.fts_table}) VALUES ('rebuild')"))
+
+def parse_query(query: str) -> SearchQuery:
+    """解析用户输入的搜索关键词
+
+    关键词以空白分隔，需全部匹配；每个关键词按子串匹配，末尾的 * 可省略。
+
+    Args:
+        query (str): 搜索关键词
+
+    Returns:
+        SearchQuery: 关键词列表、FTS5 MATCH 表达式和需要用 LIKE 匹配的短关键词
+
+    Raises:
+        ValueError: 没有有效关键词时抛出
+    """
+    terms = [term.rstrip("*") for term in query.split()]
+    terms = [term for term in terms if term]
+    if not terms:
+        raise ValueError("搜索关键词不能为空")
+    # 每个关键词作为一个短语，双引号转义后不会被解释为 FTS5 语法
+    phrases = ['"' + term.replace('"', '""') + '"' for term in terms if len(term) >= MIN_INDEXED_TERM_LENGTH]
+    short_terms = [term for term in terms if len(term) < MIN_INDEXED_TERM_LENGTH]
+    return SearchQuery(terms, " AND ".join(phrases) or None, short_terms)
+
+def match_candidates(statement: Select, fts_table, id_column: ColumnElement, text_column: ColumnElement,
+                     query: SearchQuery, order_by: Tuple[ColumnElement, ...], limit: Optional[int] = None,
+                     id_range: Optional[Tuple[ColumnElement, ColumnElement]] = None) -> Subquery:
+    """在已带筛选条件的查询上匹配关键词，按相关度取前 limit 条匹配记录的ID
+
+    相关度需对全部匹配记录计算，前 limit 条在子查询中选出，外层查询只需读取这些记录；
+    调用方按 rank 列和相同的 order_by 对外层查询排序。
+
+    Args:
+        statement (Select): 原表查询，使用其筛选条件
+        fts_table: 全文索引表，transactions_fts 或 todos_fts
+        id_column (ColumnElement): 原表ID列
+        text_column (ColumnElement): 被索引的文本列
+        query (SearchQuery): 解析后的搜索关键词
+        order_by (Tuple[ColumnElement, ...]): 相关度相同时的排序条件
+        limit (Optional[int], optional): 最多返回的记录数. Defaults to None，返回全部匹配记录.
+        id_range (Optional[Tuple[ColumnElement, ColumnElement]], optional): 符合筛选条件的记录ID的上下界，
+            全文索引只读取该范围内的匹配记录；SQLite不会把原表ID上的范围条件传递给全文索引. Defaults to None.
+
+    Returns:
+        Subquery: 包含 id 和 rank 列的子查询，没有可用索引的关键词时 rank 均为0
+    """
+    for term in query.short_terms:
+        statement = statement.where(text_column.contains(term, autoescape=True))
+    rank = literal(0)
+    if query.expression is None:
+        # 没有相关度，按原表索引的顺序读取，取满即停
+        statement = statement.order_by(None).order_by(*order_by)
+    else:
+        statement = (
+            statement.join(fts_table, fts_table.c.rowid == id_column)
+            .where(literal_column(fts_table.name).match(query.expression))
+            .order_by(None)
+            .order_by(fts_table.c.rank, *order_by)
+        )
+        if id_range is not None:
+            statement = statement.where(fts_table.c.rowid.between(*id_range))
+        rank = fts_table.c.rank
+    return statement.with_only_columns(id_column.label("id"), rank.label("rank")).limit(limit).subquery()
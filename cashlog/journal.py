@@ -0,0 +1,194 @@
+"""收支记录快速采集日志
+
+开启采集模式后（`transaction add --capture`，或配置 [journal] capture = on），新增的收支记录
+不直接写入SQLite，而是以一行JSON追加到数据库旁的 cashlog.journal 文件后立即返回。
+之后的查询命令或 `transaction compact` 会把日志批量写入数据库并清空日志（见 JournalService）。
+
+每个条目带有唯一ID，入库时记录在 transactions.capture_id 上，压缩中途失败后重复执行不会重复入库。
+追加和压缩通过文件锁互斥；fsync 按条数或时间间隔批量执行，进程退出时总会执行一次。
+
+本模块只依赖标准库，采集路径不导入SQLAlchemy。
+"""
+import atexit
+import json
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+from decimal import Decimal
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+from .config import get_cashlog_dir, get_setting
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows 没有 fcntl，只支持单进程采集
+    fcntl = None
+
+JOURNAL_SUFFIX = ".journal"
+
+# 默认每追加多少条或间隔多少秒执行一次fsync
+DEFAULT_SYNC_EVERY = 64
+DEFAULT_SYNC_INTERVAL = 1.0
+
+def default_journal_path() -> Path:
+    """默认采集日志路径：~/.cashlog/cashlog.journal，与默认数据库同目录同名"""
+    return get_cashlog_dir() / f"cashlog{JOURNAL_SUFFIX}"
+
+def capture_enabled() -> bool:
+    """是否默认开启采集模式
+
+    优先级：环境变量 CASHLOG_CAPTURE > 配置文件 [journal] capture > 默认关闭
+    """
+    value = get_setting("journal", "capture", env_var="CASHLOG_CAPTURE", default="off")
+    return str(value).strip().lower() in ("1", "on", "true", "yes")
+
+def has_entries(path: Union[str, Path]) -> bool:
+    """日志中是否有待入库的条目，只检查文件大小"""
+    try:
+        return os.path.getsize(path) > 0
+    except OSError:
+        return False
+
+@contextmanager
+def file_lock(fd: int):
+    """对日志文件加排他锁，追加与压缩互斥"""
+    if fcntl is None:
+        yield
+        return
+    fcntl.flock(fd, fcntl.LOCK_EX)
+    try:
+        yield
+    finally:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+
+def parse_entries(data: bytes) -> Tuple[List[dict], List[bytes]]:
+    """解析日志内容
+
+    Args:
+        data (bytes): 日志文件内容
+
+    Returns:
+        Tuple[List[dict], List[bytes]]: 有效条目，以及无法解析的行（例如写入中途断电留下的半行）
+    """
+    entries, invalid = [], []
+    for line in data.splitlines():
+        if not line.strip():
+            continue
+        try:
+            entry = json.loads(line)
+            if not isinstance(entry, dict) or not entry.get("id") or not entry.get("category"):
+                raise ValueError
+            Decimal(str(entry["amount"]))
+            datetime.fromisoformat(entry["transaction_time"])
+        except (ValueError, KeyError, TypeError, ArithmeticError):
+            invalid.append(line)
+            continue
+        entries.append(entry)
+    return entries, invalid
+
+class JournalWriter:
+    """采集日志的追加写入器，可在多个线程间共享"""
+
+    def __init__(self, path: Union[str, Path], sync_every: int = DEFAULT_SYNC_EVERY,
+                 sync_interval: float = DEFAULT_SYNC_INTERVAL):
+        """打开（或创建）日志文件
+
+        Args:
+            path (Union[str, Path]): 日志文件路径
+            sync_every (int, optional): 每追加多少条执行一次fsync. Defaults to 64.
+            sync_interval (float, optional): 距上次fsync超过多少秒时执行fsync. Defaults to 1.0.
+        """
+        self.path = Path(path)
+        self.sync_every = sync_every
+        self.sync_interval = sync_interval
+        self._fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o600)
+        self._pending = 0
+        self._last_sync = time.monotonic()
+        self._lock = threading.Lock()
+
+    def append(self, amount: Union[Decimal, float, str], category: str, tags: Optional[str] = None,
+               remark: Optional[str] = None, transaction_time: Optional[datetime] = None) -> str:
+        """追加一条收支记录
+
+        Args:
+            amount (Union[Decimal, float, str]): 金额，正数为收入，负数为支出
+            category (str): 分类
+            tags (Optional[str], optional): 标签，多个标签用逗号分隔. Defaults to None.
+            remark (Optional[str], optional): 备注. Defaults to None.
+            transaction_time (Optional[datetime], optional): 交易时间. Defaults to None，取当前时间.
+
+        Returns:
+            str: 条目ID
+
+        Raises:
+            ValueError: 金额不是有限数字或缺少分类时抛出
+        """
+        value = Decimal(str(amount).strip())
+        if not value.is_finite() or not category:
+            raise ValueError(f"收支记录缺少分类或金额无效：{amount}")
+        entry_id = uuid.uuid4().hex
+        line = json.dumps({
+            "id": entry_id,
+            "amount": str(value),
+            "category": category,
+            "tags": tags,
+            "remark": remark,
+            "transaction_time": (transaction_time or datetime.now()).isoformat(sep=" "),
+        }, ensure_ascii=False) + "\n"
+        with self._lock:
+            # 整行一次写入，O_APPEND 保证多个进程的条目不会交错
+            with file_lock(self._fd):
+                os.write(self._fd, line.encode("utf-8"))
+            self._pending += 1
+            if self._pending >= self.sync_every or time.monotonic() - self._last_sync >= self.sync_interval:
+                self._sync()
+        return entry_id
+
+    def _sync(self):
+        os.fsync(self._fd)
+        self._pending = 0
+        self._last_sync = time.monotonic()
+
+    def sync(self):
+        """将已追加的条目落盘"""
+        with self._lock:
+            if self._pending:
+                self._sync()
+
+    def close(self):
+        """落盘并关闭文件"""
+        with self._lock:
+            if self._fd is None:
+                return
+            if self._pending:
+                self._sync()
+            os.close(self._fd)
+            self._fd = None
+
+# 当前进程中按路径共享的写入器，进程退出时统一落盘
+_writers: Dict[Path, JournalWriter] = {}
+
+def get_writer(path: Optional[Union[str, Path]] = None) -> JournalWriter:
+    """获取日志写入器，同一进程内对同一文件复用
+
+    Args:
+        path (Optional[Union[str, Path]], optional): 日志文件路径. Defaults to None，使用默认路径.
+
+    Returns:
+        JournalWriter: 日志写入器
+    """
+    path = Path(path) if path is not None else default_journal_path()
+    writer = _writers.get(path)
+    if writer is None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        writer = _writers[path] = JournalWriter(path)
+    return writer
+
+@atexit.register
+def close_writers():
+    """关闭全部写入器"""
+    while _writers:
+        _writers.popitem()[1].close()
@@ -0,0 +1,265 @@
+"""命令耗时分析
+
+执行 `cashlog --profile <命令>` 时会启动全局 Profiler，Database 随之开始记录每条SQL语句的耗时和
+行数（见 QueryStats，未开启分析时不记录），命令结束后输出各阶段耗时
+（启动与模块导入、数据库初始化、SQL执行、输出渲染、ORM与业务逻辑）和最慢的SQL语句。
+
+本模块只依赖标准库，可在CLI入口处直接导入而不影响启动速度。
+"""
+import re
+import threading
+import time
+import unicodedata
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+# 阶段名称 -> 报告中显示的名称
+PHASE_LABELS = {
+    "import": "启动与模块导入",
+    "engine": "数据库初始化",
+    "sql": "SQL执行",
+    "render": "输出渲染",
+}
+OTHER_LABEL = "ORM与业务逻辑"
+
+_WHITESPACE = re.compile(r"\s+")
+
+def _pad(text: str, width: int) -> str:
+    """按终端显示宽度左对齐，中文字符占两列"""
+    display = sum(2 if unicodedata.east_asian_width(c) in "WF" else 1 for c in text)
+    return text + " " * max(width - display, 0)
+
+class QueryStats:
+    """按SQL语句汇总的执行统计
+
+    统计量按语句文本聚合，内存占用只与不同语句的数量有关，长时间运行的进程也可以一直开启。
+    连接池中的多个连接可能在不同线程中同时执行语句，记录时加锁。
+    """
+
+    def __init__(self):
+        """初始化统计"""
+        # 语句 -> [执行次数, 累计耗时（秒）, 单次最大耗时（秒）, 行数]
+        self.statements: Dict[str, list] = {}
+        self._lock = threading.Lock()
+
+    def record(self, statement: str, seconds: float, rows: int = 0, executions: int = 1):
+        """记录一次执行或一次结果读取
+
+        Args:
+            statement (str): SQL语句
+            seconds (float): 耗时（秒）
+            rows (int, optional): 影响或读取的行数. Defaults to 0.
+            executions (int, optional): 执行次数，读取结果时为0. Defaults to 1.
+        """
+        with self._lock:
+            entry = self.statements.get(statement)
+            if entry is None:
+                entry = self.statements[statement] = [0, 0.0, 0.0, 0]
+            entry[0] += executions
+            entry[1] += seconds
+            entry[2] = max(entry[2], seconds)
+            entry[3] += rows
+
+    @property
+    def total_seconds(self) -> float:
+        """全部语句的累计耗时（秒）"""
+        return sum(entry[1] for entry in self.statements.values())
+
+    @property
+    def total_executions(self) -> int:
+        """全部语句的执行次数"""
+        return sum(entry[0] for entry in self.statements.values())
+
+    def slowest(self, limit: int = 10) -> List[dict]:
+        """按累计耗时列出最慢的语句
+
+        Args:
+            limit (int, optional): 最多返回的语句数. Defaults to 10.
+
+        Returns:
+            List[dict]: 包含 statement、executions、seconds、max_seconds、rows 的统计
+        """
+        with self._lock:
+            items = [(statement, list(entry)) for statement, entry in self.statements.items()]
+        ranked = sorted(items, key=lambda item: item[1][1], reverse=True)[:limit]
+        return [
+            {"statement": statement, "executions": entry[0], "seconds": entry[1],
+             "max_seconds": entry[2], "rows": entry[3]}
+            for statement, entry in ranked
+        ]
+
+    def reset(self):
+        """清空统计"""
+        with self._lock:
+            self.statements.clear()
+
+class TimedCursor:
+    """记录结果读取耗时和行数的DBAPI游标包装
+
+    SQLite在execute时只执行到第一行，大部分查询工作发生在读取结果时，
+    因此分析模式下需要把读取时间也计入SQL执行耗时。
+    """
+
+    def __init__(self, cursor, statement: str, stats: QueryStats):
+        """包装游标
+
+        Args:
+            cursor: DBAPI游标
+            statement (str): 对应的SQL语句
+            stats (QueryStats): 记录统计的对象
+        """
+        self._cursor = cursor
+        self._statement = statement
+        self._stats = stats
+
+    def _record(self, started: float, rows: int):
+        elapsed = time.perf_counter() - started
+        self._stats.record(self._statement, elapsed, rows, executions=0)
+        add_time("sql", elapsed)
+
+    def fetchone(self):
+        started = time.perf_counter()
+        row = self._cursor.fetchone()
+        self._record(started, 0 if row is None else 1)
+        return row
+
+    def fetchmany(self, *args):
+        started = time.perf_counter()
+        rows = self._cursor.fetchmany(*args)
+        self._record(started, len(rows))
+        return rows
+
+    def fetchall(self):
+        started = time.perf_counter()
+        rows = self._cursor.fetchall()
+        self._record(started, len(rows))
+        return rows
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+class Profiler:
+    """按阶段统计一次命令的耗时
+
+    阶段可以嵌套，每个阶段只统计扣除嵌套阶段后的独占耗时；
+    总耗时中未归入任何阶段的部分在报告中记为 "ORM与业务逻辑"。
+    """
+
+    def __init__(self, started: Optional[float] = None):
+        """开始计时
+
+        Args:
+            started (Optional[float], optional): 开始时间（time.perf_counter），可早于创建时间. Defaults to None.
+        """
+        self.started = time.perf_counter() if started is None else started
+        self.phases: Dict[str, float] = {}
+        # 每个进行中的阶段已被嵌套阶段占用的时间
+        self._nested: List[float] = []
+
+    @contextmanager
+    def phase(self, name: str):
+        """统计代码块的耗时
+
+        Args:
+            name (str): 阶段名称
+        """
+        started = time.perf_counter()
+        self._nested.append(0.0)
+        try:
+            yield
+        finally:
+            nested = self._nested.pop()
+            self.add(name, time.perf_counter() - started, exclusive=nested)
+
+    def add(self, name: str, seconds: float, exclusive: float = 0.0):
+        """将一段耗时计入阶段，并从外层阶段中扣除
+
+        Args:
+            name (str): 阶段名称
+            seconds (float): 耗时（秒）
+            exclusive (float, optional): 其中已计入嵌套阶段的耗时. Defaults to 0.0.
+        """
+        self.phases[name] = self.phases.get(name, 0.0) + seconds - exclusive
+        if self._nested:
+            self._nested[-1] += seconds
+
+    def report(self, stats: Optional[QueryStats] = None, limit: int = 10) -> str:
+        """生成耗时报告
+
+        Args:
+            stats (Optional[QueryStats], optional): SQL语句统计. Defaults to None.
+            limit (int, optional): 列出的最慢语句数. Defaults to 10.
+
+        Returns:
+            str: 报告文本
+        """
+        total = time.perf_counter() - self.started
+        names = [name for name in PHASE_LABELS if name in self.phases]
+        names += [name for name in self.phases if name not in PHASE_LABELS]
+        rows = [(PHASE_LABELS.get(name, name), self.phases[name]) for name in names]
+        rows.append((OTHER_LABEL, max(total - sum(self.phases.values()), 0.0)))
+
+        lines = [f"性能分析：总耗时 {total * 1000:.1f} ms"]
+        for label, seconds in rows:
+            share = seconds / total * 100 if total else 0.0
+            lines.append(f"  {_pad(label, 16)}{seconds * 1000:>10.1f} ms {share:>6.1f}%")
+
+        if stats is not None and stats.statements:
+            lines.append(f"最慢的SQL语句（共执行 {stats.total_executions} 次，{stats.total_seconds * 1000:.1f} ms）：")
+            lines.append("     累计ms    最大ms   次数     行数  语句")
+            for entry in stats.slowest(limit):
+                statement = _WHITESPACE.sub(" ", entry["statement"]).strip()
+                if len(statement) > 120:
+                    statement = statement[:117] + "..."
+                lines.append(f"  {entry['seconds'] * 1000:>9.2f} {entry['max_seconds'] * 1000:>9.2f} "
+                             f"{entry['executions']:>6d} {entry['rows']:>8d}  {statement}")
+        return "\n".join(lines)
+
+# 当前进程的全局分析器，未开启分析时为None
+_active: Optional[Profiler] = None
+
+def start(started: Optional[float] = None) -> Profiler:
+    """开启全局耗时分析
+
+    Args:
+        started (Optional[float], optional): 开始时间（time.perf_counter）. Defaults to None.
+
+    Returns:
+        Profiler: 全局分析器
+    """
+    global _active
+    _active = Profiler(started)
+    return _active
+
+def stop() -> Optional[Profiler]:
+    """关闭全局耗时分析并返回分析器"""
+    global _active
+    profiler, _active = _active, None
+    return profiler
+
+def get_profiler() -> Optional[Profiler]:
+    """获取全局分析器，未开启分析时返回None"""
+    return _active
+
+@contextmanager
+def phase(name: str):
+    """开启分析时统计代码块的耗时，未开启时不做任何事
+
+    Args:
+        name (str): 阶段名称
+    """
+    if _active is None:
+        yield
+    else:
+        with _active.phase(name):
+            yield
+
+def add_time(name: str, seconds: float):
+    """开启分析时将一段耗时计入阶段
+
+    Args:
+        name (str): 阶段名称
+        seconds (float): 耗时（秒）
+    """
+    if _active is not None:
+        _active.add(name, seconds)
@@ -0,0 +1,346 @@
+"""收支记录列式分析
+
+将筛选后的收支记录一次性读入 NumPy 列数组（金额分值、时间戳、分类编码），
+分位数、直方图、环比等统计均以向量化运算完成，百万级记录也能交互式使用。
+
+依赖可选组件 numpy：uv sync --extra analytics
+"""
+from sqlalchemy import cast, func, select, Integer
+from sqlalchemy.orm import Session
+from datetime import datetime, timedelta
+from ..data.models import Transaction, TransactionType, from_cents
+from .transaction_service import GRANULARITIES, _period_label
+from typing import Dict, List, Optional, Sequence
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - 取决于安装环境
+    np = None
+
+# 每批从数据库游标读取的行数
+FETCH_BATCH_SIZE = 100000
+
+# 直方图支持的时间粒度（秒）
+HISTOGRAM_BUCKETS = {"day": 86400, "week": 7 * 86400}
+
+# 1970-01-01 是星期四，偏移3天后按周分桶即以星期一为每周第一天
+_WEEK_OFFSET_SECONDS = 3 * 86400
+
+# 各汇总粒度包含的月数
+_GRANULARITY_MONTHS = {"month": 1, "quarter": 3, "year": 12}
+
+_EPOCH = datetime(1970, 1, 1)
+
+def _epoch_seconds(moment: datetime) -> int:
+    """将时间换算为自1970-01-01起的秒数，不足一秒的部分向上取整
+
+    与 strftime('%s') 一样按本地时间直接换算。时间戳本身截断到秒，
+    向上取整后 ">= 开始" 和 "< 结束" 的比较结果与按原始时间比较一致（整秒边界时完全一致）。
+    """
+    return -((_EPOCH - moment) // timedelta(seconds=1))
+
+def require_numpy():
+    """确认已安装numpy
+
+    Raises:
+        ImportError: 未安装numpy时抛出，并提示安装方式
+    """
+    if np is None:
+        raise ImportError("统计分析需要安装 numpy：uv sync --extra analytics 或 pip install numpy")
+
+class TransactionFrame:
+    """收支记录的列式表示
+
+    Attributes:
+        amounts (np.ndarray): int64 金额，以分为单位
+        timestamps (np.ndarray): int64 交易时间，自1970-01-01起的秒数（按本地时间直接换算，不做时区转换）
+        category_codes (np.ndarray): int32 分类编码，对应 categories 中的下标
+        categories (List[str]): 分类字典
+        sorted_by_time (bool): 记录是否按交易时间升序排列
+        source (str): 数据来源，database 或 snapshot
+    """
+
+    def __init__(self, amounts, timestamps, category_codes, categories: List[str],
+                 sorted_by_time: bool = False, source: str = "database"):
+        """初始化列式数据
+
+        Args:
+            amounts: 金额分值数组
+            timestamps: 时间戳数组
+            category_codes: 分类编码数组
+            categories (List[str]): 分类字典
+            sorted_by_time (bool, optional): 记录是否按交易时间升序排列. Defaults to False.
+            source (str, optional): 数据来源. Defaults to "database".
+        """
+        require_numpy()
+        # 数据类型一致时不复制，内存映射的数组保持映射
+        self.amounts = np.asarray(amounts, dtype=np.int64)
+        self.timestamps = np.asarray(timestamps, dtype=np.int64)
+        self.category_codes = np.asarray(category_codes, dtype=np.int32)
+        self.categories = list(categories)
+        self.sorted_by_time = sorted_by_time
+        self.source = source
+
+    def __len__(self) -> int:
+        return len(self.amounts)
+
+    def filter(self, start: Optional[datetime] = None, end: Optional[datetime] = None,
+               category: Optional[str] = None,
+               transaction_type: Optional[TransactionType] = None) -> "TransactionFrame":
+        """按条件筛选记录，筛选条件与 AnalyticsService.load_frame 一致
+
+        按时间升序排列时，时间区间通过二分查找得到切片，不复制数据。
+
+        Args:
+            start (Optional[datetime], optional): 开始时间（包含）. Defaults to None.
+            end (Optional[datetime], optional): 结束时间（不包含）. Defaults to None.
+            category (Optional[str], optional): 分类. Defaults to None.
+            transaction_type (Optional[TransactionType], optional): 收支类型. Defaults to None.
+
+        Returns:
+            TransactionFrame: 筛选后的列式数据，共用同一个分类字典
+        """
+        amounts, timestamps, codes = self.amounts, self.timestamps, self.category_codes
+        lower = _epoch_seconds(start) if start is not None else None
+        upper = _epoch_seconds(end) if end is not None else None
+        mask = None
+        if self.sorted_by_time:
+            first = np.searchsorted(timestamps, lower, side="left") if lower is not None else 0
+            last = np.searchsorted(timestamps, upper, side="left") if upper is not None else len(timestamps)
+            amounts, timestamps, codes = amounts[first:last], timestamps[first:last], codes[first:last]
+        else:
+            if lower is not None:
+                mask = timestamps >= lower
+            if upper is not None:
+                mask = timestamps < upper if mask is None else mask & (timestamps < upper)
+
+        conditions = [] if mask is None else [mask]
+        if category is not None:
+            code = self.categories.index(category) if category in self.categories else -1
+            conditions.append(codes == code)
+        if transaction_type == TransactionType.INCOME:
+            conditions.append(amounts > 0)
+        elif transaction_type == TransactionType.EXPENSE:
+            conditions.append(amounts < 0)
+        if conditions:
+            mask = np.logical_and.reduce(conditions)
+            amounts, timestamps, codes = amounts[mask], timestamps[mask], codes[mask]
+        return TransactionFrame(amounts, timestamps, codes, self.categories,
+                                sorted_by_time=self.sorted_by_time, source=self.source)
+
+    def period_rows(self, granularity: str = "month") -> List[tuple]:
+        """按周期和分类聚合，结果与 TransactionService 区间报表的SQL聚合格式相同
+
+        Args:
+            granularity (str, optional): 汇总粒度，month、quarter 或 year. Defaults to "month".
+
+        Returns:
+            List[tuple]: (周期, 分类, 收入分值, 支出分值, 笔数) 列表
+        """
+        if granularity not in GRANULARITIES:
+            raise ValueError(f"不支持的汇总粒度：{granularity}，可选值：{', '.join(GRANULARITIES)}")
+        if len(self) == 0:
+            return []
+        span = _GRANULARITY_MONTHS[granularity]
+        periods = self.timestamps.astype("datetime64[s]").astype("datetime64[M]").astype(np.int64) // span
+        # 周期与分类组合为一个整数键后分组
+        keys, groups = np.unique(periods * len(self.categories) + self.category_codes, return_inverse=True)
+        counts = np.bincount(groups, minlength=len(keys))
+        income = np.bincount(groups, weights=np.where(self.amounts > 0, self.amounts, 0), minlength=len(keys))
+        expense = np.bincount(groups, weights=np.where(self.amounts < 0, -self.amounts, 0), minlength=len(keys))
+
+        rows = []
+        for i, key in enumerate(keys.tolist()):
+            period, code = divmod(key, len(self.categories))
+            year, month = divmod(period * span, 12)
+            rows.append((
+                _period_label(datetime(1970 + year, month + 1, 1), granularity),
+                self.categories[code],
+                int(income[i]),
+                int(expense[i]),
+                int(counts[i])
+            ))
+        return rows
+
+    def category_stats(self, percentiles: Sequence[float] = (50, 90, 99)) -> List[dict]:
+        """按分类统计笔数、合计、均值和金额分位数
+
+        分位数基于金额绝对值计算，收入和支出同等对待。
+
+        Args:
+            percentiles (Sequence[float], optional): 需要计算的百分位. Defaults to (50, 90, 99).
+
+        Returns:
+            List[dict]: 按分类名称排序的统计结果，金额单位为元
+        """
+        if len(self) == 0:
+            return []
+        magnitudes = np.abs(self.amounts)
+        # 先按分类、再按金额排序，每个分类对应一段连续且有序的切片
+        order = np.lexsort((magnitudes, self.category_codes))
+        sorted_codes = self.category_codes[order]
+        sorted_values = magnitudes[order]
+        counts = np.bincount(self.category_codes, minlength=len(self.categories))
+        income = np.bincount(self.category_codes, weights=np.where(self.amounts > 0, self.amounts, 0),
+                             minlength=len(self.categories))
+        expense = np.bincount(self.category_codes, weights=np.where(self.amounts < 0, -self.amounts, 0),
+                              minlength=len(self.categories))
+        bounds = np.searchsorted(sorted_codes, np.arange(len(self.categories) + 1))
+
+        results = []
+        for code in np.argsort(self.categories):
+            if counts[code] == 0:
+                continue
+            values = sorted_values[bounds[code]:bounds[code + 1]]
+            points = np.percentile(values, percentiles) if len(percentiles) else []
+            results.append({
+                "category": self.categories[code],
+                "count": int(counts[code]),
+                "total_income": from_cents(int(income[code])),
+                "total_expense": from_cents(int(expense[code])),
+                "mean": round(float(values.mean()) / 100, 2),
+                "percentiles": {p: round(float(v) / 100, 2) for p, v in zip(percentiles, points)},
+            })
+        return results
+
+    def histogram(self, bucket: str = "day") -> List[dict]:
+        """按天或按周统计收支直方图
+
+        Args:
+            bucket (str, optional): 时间粒度，day 或 week（周一为每周第一天）. Defaults to "day".
+
+        Returns:
+            List[dict]: 按时间顺序排列、包含空区间的统计结果，金额为精确到分的 Decimal
+
+        Raises:
+            ValueError: 时间粒度不支持时抛出
+        """
+        if bucket not in HISTOGRAM_BUCKETS:
+            raise ValueError(f"不支持的直方图粒度：{bucket}，可选值：{', '.join(HISTOGRAM_BUCKETS)}")
+        if len(self) == 0:
+            return []
+        width = HISTOGRAM_BUCKETS[bucket]
+        offset = _WEEK_OFFSET_SECONDS if bucket == "week" else 0
+        indexes = (self.timestamps + offset) // width
+        first = int(indexes.min())
+        indexes = indexes - first
+        counts = np.bincount(indexes)
+        income = np.bincount(indexes, weights=np.where(self.amounts > 0, self.amounts, 0))
+        expense = np.bincount(indexes, weights=np.where(self.amounts < 0, -self.amounts, 0))
+
+        epoch = datetime(1970, 1, 1)
+        return [
+            {
+                "start": (epoch + timedelta(seconds=(first + i) * width - offset)).date(),
+                "count": int(counts[i]),
+                "total_income": from_cents(int(income[i])),
+                "total_expense": from_cents(int(expense[i])),
+            }
+            for i in range(len(counts))
+        ]
+
+    def month_over_month(self) -> List[dict]:
+        """按月汇总收支并计算环比变化
+
+        Returns:
+            List[dict]: 按月份排列、包含空月份的统计结果，delta 为与上月相比的结余变化，
+                change_percent 为支出环比变化百分比（首月或上月无支出时为None）
+        """
+        if len(self) == 0:
+            return []
+        months = self.timestamps.astype("datetime64[s]").astype("datetime64[M]").astype(np.int64)
+        first = int(months.min())
+        indexes = months - first
+        counts = np.bincount(indexes)
+        income = np.bincount(indexes, weights=np.where(self.amounts > 0, self.amounts, 0)).astype(np.int64)
+        expense = np.bincount(indexes, weights=np.where(self.amounts < 0, -self.amounts, 0)).astype(np.int64)
+        balance = income - expense
+        balance_delta = np.diff(balance, prepend=0)
+        previous_expense = np.concatenate(([0], expense[:-1]))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            change = np.where(previous_expense > 0, (expense - previous_expense) / previous_expense * 100, np.nan)
+
+        results = []
+        for i in range(len(counts)):
+            year, month = divmod(first + i, 12)
+            results.append({
+                "period": f"{1970 + year}-{month + 1:02d}",
+                "count": int(counts[i]),
+                "total_income": from_cents(int(income[i])),
+                "total_expense": from_cents(int(expense[i])),
+                "balance": from_cents(int(balance[i])),
+                "delta": None if i == 0 else from_cents(int(balance_delta[i])),
+                "change_percent": None if i == 0 or np.isnan(change[i]) else round(float(change[i]), 2),
+            })
+        return results
+
+class AnalyticsService:
+    """收支统计分析业务逻辑层"""
+
+    def __init__(self, db_session: Session):
+        """初始化业务逻辑层
+
+        Args:
+            db_session (Session): 数据库会话对象
+        """
+        require_numpy()
+        self.db_session = db_session
+
+    def load_frame(self, start: Optional[datetime] = None, end: Optional[datetime] = None,
+                   category: Optional[str] = None,
+                   transaction_type: Optional[TransactionType] = None,
+                   use_snapshot: bool = False) -> TransactionFrame:
+        """将筛选后的收支记录读入列式数组
+
+        时间戳在SQLite中直接换算为整数，读取时不创建ORM对象和datetime对象。
+        use_snapshot 为True且存在与数据库一致的列式快照时，改为内存映射快照并在数组上筛选。
+
+        Args:
+            start (Optional[datetime], optional): 开始时间（包含）. Defaults to None.
+            end (Optional[datetime], optional): 结束时间（不包含）. Defaults to None.
+            category (Optional[str], optional): 分类. Defaults to None.
+            transaction_type (Optional[TransactionType], optional): 收支类型. Defaults to None.
+            use_snapshot (bool, optional): 是否优先使用列式快照. Defaults to False.
+
+        Returns:
+            TransactionFrame: 列式数据
+        """
+        if use_snapshot:
+            from .snapshot_service import SnapshotService
+            snapshot = SnapshotService(self.db_session).load_if_fresh()
+            if snapshot is not None:
+                return snapshot.filter(start, end, category, transaction_type)
+
+        query = select(
+            Transaction.amount_cents,
+            cast(func.strftime("%s", Transaction.transaction_time), Integer),
+            Transaction.category
+        )
+        if start is not None:
+            query = query.where(Transaction.transaction_time >= start)
+        if end is not None:
+            query = query.where(Transaction.transaction_time < end)
+        if category is not None:
+            query = query.where(Transaction.category == category)
+        if transaction_type == TransactionType.INCOME:
+            query = query.where(Transaction.amount_cents > 0)
+        elif transaction_type == TransactionType.EXPENSE:
+            query = query.where(Transaction.amount_cents < 0)
+        result = self.db_session.execute(query)
+
+        codes: Dict[str, int] = {}
+        amount_chunks, time_chunks, code_chunks = [], [], []
+        for chunk in result.partitions(FETCH_BATCH_SIZE):
+            amounts, timestamps, categories = zip(*chunk)
+            amount_chunks.append(np.array(amounts, dtype=np.int64))
+            time_chunks.append(np.array(timestamps, dtype=np.int64))
+            # 字典编码：分类名称映射为连续整数
+            code_chunks.append(np.array([codes.setdefault(c, len(codes)) for c in categories], dtype=np.int32))
+        if not amount_chunks:
+            return TransactionFrame([], [], [], [])
+        return TransactionFrame(
+            np.concatenate(amount_chunks),
+            np.concatenate(time_chunks),
+            np.concatenate(code_chunks),
+            list(codes)
+        )
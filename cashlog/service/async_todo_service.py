@@ -0,0 +1,96 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import datetime
+from ..data.models import Todo, TodoStatus
+from .tag_service import parse_tags, format_tags, _resolve_tags, _tags_select, TAG_MATCH_ALL
+from .todo_service import _cursor_select, _due_select, _search_select, _todos_select
+from typing import AsyncIterator, List, Optional
+
+class AsyncTodoService:
+    """待办事项业务逻辑层的 asyncio 版本
+
+    方法与 TodoService 一一对应，参数、返回值和异常相同，查询语句由两者共用的函数构造。
+    """
+    
+    def __init__(self, db_session: AsyncSession):
+        """初始化业务逻辑层
+        
+        Args:
+            db_session (AsyncSession): 异步数据库会话对象
+        """
+        self.db_session = db_session
+    
+    async def add_todo(self, content: str, category: str, tags: Optional[str] = None,
+                       deadline: Optional[datetime] = None) -> Todo:
+        """新增待办事项，见 TodoService.add_todo"""
+        tag_names = parse_tags(tags)
+        todo = Todo(
+            content=content,
+            category=category,
+            tags=format_tags(tag_names),
+            deadline=deadline
+        )
+        existing = {tag.name: tag for tag in await self.db_session.scalars(_tags_select(tag_names))} if tag_names else {}
+        todo.tag_list = _resolve_tags(tag_names, existing, self.db_session.add)
+        
+        self.db_session.add(todo)
+        await self.db_session.commit()
+        await self.db_session.refresh(todo)
+        
+        return todo
+    
+    async def update_todo_status(self, todo_id: int, status: TodoStatus) -> Optional[Todo]:
+        """更新待办事项状态，见 TodoService.update_todo_status"""
+        todo = await self.db_session.get(Todo, todo_id)
+        if todo:
+            todo.status = status
+            await self.db_session.commit()
+            await self.db_session.refresh(todo)
+        return todo
+    
+    async def get_todos(self, status: Optional[TodoStatus] = None, category: Optional[str] = None,
+                        deadline_before: Optional[datetime] = None, tags: Optional[str] = None,
+                        tag_match: str = TAG_MATCH_ALL, limit: Optional[int] = None,
+                        after: Optional[int] = None) -> List[Todo]:
+        """查询待办事项，见 TodoService.get_todos"""
+        statement = await self._build_query(status, category, deadline_before, tags, tag_match, limit, after)
+        return (await self.db_session.scalars(statement)).all()
+    
+    async def iter_todos(self, status: Optional[TodoStatus] = None, category: Optional[str] = None,
+                         deadline_before: Optional[datetime] = None, tags: Optional[str] = None,
+                         tag_match: str = TAG_MATCH_ALL, limit: Optional[int] = None,
+                         after: Optional[int] = None, batch_size: int = 1000) -> AsyncIterator[Todo]:
+        """逐条流式查询待办事项，见 TodoService.iter_todos
+        
+        Yields:
+            Todo: 待办事项对象，用法为 async for
+        """
+        statement = await self._build_query(status, category, deadline_before, tags, tag_match, limit, after)
+        result = await self.db_session.stream_scalars(statement.execution_options(yield_per=batch_size))
+        async for todo in result:
+            yield todo
+    
+    async def _build_query(self, status, category, deadline_before, tags, tag_match, limit=None, after=None):
+        """查询分页游标后构造待办事项查询，见 _todos_select"""
+        cursor_time = (await self.db_session.execute(_cursor_select(after))).scalar() if after is not None else None
+        return _todos_select(status, category, deadline_before, tags, tag_match, limit, after, cursor_time)
+    
+    async def get_due_todos(self, start: Optional[datetime] = None, end: Optional[datetime] = None,
+                            limit: Optional[int] = None) -> List[Todo]:
+        """按截止时间查询未完成的待办事项，见 TodoService.get_due_todos"""
+        return (await self.db_session.scalars(_due_select(start, end, limit))).all()
+
+    async def search_todos(self, query: str, status: Optional[TodoStatus] = None, category: Optional[str] = None,
+                           deadline_before: Optional[datetime] = None, tags: Optional[str] = None,
+                           tag_match: str = TAG_MATCH_ALL, limit: Optional[int] = 20) -> List[Todo]:
+        """按内容全文搜索待办事项，见 TodoService.search_todos"""
+        statement = _search_select(query, status, category, deadline_before, tags, tag_match, limit)
+        return (await self.db_session.scalars(statement)).all()
+    
+    async def delete_todo(self, todo_id: int) -> bool:
+        """删除待办事项，见 TodoService.delete_todo"""
+        todo = await self.db_session.get(Todo, todo_id)
+        if todo:
+            await self.db_session.delete(todo)
+            await self.db_session.commit()
+            return True
+        return False
@@ -0,0 +1,118 @@
+import asyncio
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import datetime
+from decimal import Decimal
+from ..data.models import Transaction, TransactionType
+from .rollup_service import RollupService
+from .tag_service import parse_tags, _resolve_tags, _tags_select, TAG_MATCH_ALL
+from .transaction_service import (TransactionService, _build_monthly_summary, _build_range_summary, _check_range,
+                                  _cursor_select, _database_file, _monthly_rollup_select, _new_transaction,
+                                  _parallel_range_rows, _range_rows_select, _search_select, _transactions_select)
+from typing import AsyncIterator, Iterable, List, Optional, Union
+
+class AsyncTransactionService:
+    """收支记录业务逻辑层的 asyncio 版本
+
+    方法与 TransactionService 一一对应，参数、返回值和异常相同，查询语句由两者共用的函数构造。
+    批量导入、重建汇总表和读取列式快照等整段执行的操作通过 run_sync 直接复用同步实现。
+    """
+    
+    def __init__(self, db_session: AsyncSession):
+        """初始化业务逻辑层
+        
+        Args:
+            db_session (AsyncSession): 异步数据库会话对象
+        """
+        self.db_session = db_session
+    
+    async def add_transaction(self, amount: Union[Decimal, float, str], category: str, tags: Optional[str] = None,
+                              remark: Optional[str] = None, transaction_time: Optional[datetime] = None) -> Transaction:
+        """新增收支记录，见 TransactionService.add_transaction"""
+        tag_names = parse_tags(tags)
+        transaction = _new_transaction(amount, category, tag_names, remark, transaction_time)
+        existing = {tag.name: tag for tag in await self.db_session.scalars(_tags_select(tag_names))} if tag_names else {}
+        transaction.tag_list = _resolve_tags(tag_names, existing, self.db_session.add)
+        
+        self.db_session.add(transaction)
+        # 月度汇总与收支记录在同一事务中提交
+        deltas = {}
+        RollupService.add_delta(deltas, transaction.transaction_time, category, transaction.amount_cents)
+        await self.db_session.execute(RollupService.upsert_statement(), RollupService.delta_rows(deltas))
+        await self.db_session.commit()
+        await self.db_session.refresh(transaction)
+        
+        return transaction
+    
+    async def add_transactions_bulk(self, records: Iterable[dict], batch_size: int = 5000) -> int:
+        """批量新增收支记录，见 TransactionService.add_transactions_bulk"""
+        return await self.db_session.run_sync(
+            lambda session: TransactionService(session).add_transactions_bulk(records, batch_size))
+    
+    async def get_transactions(self, month: Optional[int] = None, year: Optional[int] = None,
+                               category: Optional[str] = None, tags: Optional[str] = None,
+                               transaction_type: Optional[TransactionType] = None,
+                               tag_match: str = TAG_MATCH_ALL, limit: Optional[int] = None,
+                               after: Optional[int] = None) -> List[Transaction]:
+        """查询收支记录，见 TransactionService.get_transactions"""
+        statement = await self._build_query(month, year, category, tags, transaction_type, tag_match,
+                                            limit, after)
+        return (await self.db_session.scalars(statement)).all()
+    
+    async def iter_transactions(self, month: Optional[int] = None, year: Optional[int] = None,
+                                category: Optional[str] = None, tags: Optional[str] = None,
+                                transaction_type: Optional[TransactionType] = None,
+                                tag_match: str = TAG_MATCH_ALL, limit: Optional[int] = None,
+                                after: Optional[int] = None, batch_size: int = 1000) -> AsyncIterator[Transaction]:
+        """逐条流式查询收支记录，见 TransactionService.iter_transactions
+        
+        Yields:
+            Transaction: 收支记录对象，用法为 async for
+        """
+        statement = await self._build_query(month, year, category, tags, transaction_type, tag_match,
+                                            limit, after)
+        result = await self.db_session.stream_scalars(statement.execution_options(yield_per=batch_size))
+        async for transaction in result:
+            yield transaction
+    
+    async def _build_query(self, month, year, category, tags, transaction_type, tag_match, limit=None, after=None):
+        """查询分页游标后构造收支记录查询，见 _transactions_select"""
+        cursor_time = (await self.db_session.execute(_cursor_select(after))).scalar() if after is not None else None
+        return _transactions_select(month, year, category, tags, transaction_type, tag_match,
+                                    limit, after, cursor_time)
+    
+    async def search_transactions(self, query: str, month: Optional[int] = None, year: Optional[int] = None,
+                                  category: Optional[str] = None, tags: Optional[str] = None,
+                                  transaction_type: Optional[TransactionType] = None,
+                                  tag_match: str = TAG_MATCH_ALL, limit: Optional[int] = 20) -> List[Transaction]:
+        """按备注全文搜索收支记录，见 TransactionService.search_transactions"""
+        statement = _search_select(query, month, year, category, tags, transaction_type, tag_match, limit)
+        return (await self.db_session.scalars(statement)).all()
+    
+    async def get_monthly_summary(self, month: int, year: int) -> dict:
+        """获取月度收支汇总，见 TransactionService.get_monthly_summary"""
+        rows = (await self.db_session.execute(_monthly_rollup_select(month, year))).all()
+        return _build_monthly_summary(rows, month, year)
+    
+    async def rebuild_rollups(self) -> int:
+        """根据收支记录重新生成月度汇总表，见 TransactionService.rebuild_rollups"""
+        return await self.db_session.run_sync(lambda session: TransactionService(session).rebuild_rollups())
+    
+    async def get_range_summary(self, start: datetime, end: datetime, granularity: str = "month",
+                                use_snapshot: bool = False, parallel: int = 1) -> dict:
+        """获取时间区间内按周期和分类的收支汇总，见 TransactionService.get_range_summary
+        
+        并行聚合时在默认线程池中等待进程池的结果，不阻塞事件循环；
+        使用列式快照时，快照的读取和聚合（快照不可用时改为数据库聚合）在事件循环线程中同步执行。
+        """
+        _check_range(start, end, granularity)
+        if parallel < 1:
+            raise ValueError(f"工作进程数需为正整数：{parallel}")
+        if use_snapshot:
+            return await self.db_session.run_sync(
+                lambda session: TransactionService(session).get_range_summary(start, end, granularity, True, parallel))
+        if parallel > 1:
+            database = _database_file(self.db_session.bind.url)
+            rows = await asyncio.to_thread(_parallel_range_rows, database, start, end, granularity, parallel)
+        else:
+            rows = await self.db_session.execute(_range_rows_select(start, end, granularity))
+        return _build_range_summary(rows, start, end, granularity)
@@ -0,0 +1,100 @@
+"""待办事项到期提醒
+
+DeadlineWatcher 将未完成待办事项的截止时间放入最小堆，睡眠到最近的截止时间再唤醒并提醒，
+不需要反复查询待办事项表。其他进程（如 cashlog todo add/update）修改数据库后，
+通过 PRAGMA data_version 发现变化并经 ix_todos_open_deadline 部分索引重新加载堆；
+检查间隔（refresh）只决定发现变化的延迟，检查本身不读取任何表。
+"""
+import heapq
+import time
+from datetime import datetime
+from typing import Callable, List, Optional, Tuple
+from ..data.models import Todo
+from .todo_service import TodoService
+
+class DeadlineWatcher:
+    """按截止时间依次提醒未完成的待办事项"""
+
+    def __init__(self, db, refresh: float = 60.0, clock: Callable[[], datetime] = datetime.now,
+                 sleep: Callable[[float], None] = time.sleep):
+        """初始化到期提醒
+
+        Args:
+            db (Database): 数据库实例
+            refresh (float, optional): 检查数据库是否被修改的最长间隔（秒）. Defaults to 60.0.
+            clock (Callable[[], datetime], optional): 当前时间. Defaults to datetime.now.
+            sleep (Callable[[float], None], optional): 睡眠函数. Defaults to time.sleep.
+        """
+        if refresh <= 0:
+            raise ValueError(f"检查间隔需为正数：{refresh}")
+        self.db = db
+        self.refresh = refresh
+        self.clock = clock
+        self.sleep = sleep
+        # (截止时间, ID, 待办事项)，ID 保证截止时间相同时不比较待办事项对象
+        self._heap: List[Tuple[datetime, int, Todo]] = []
+        # 截止时间不晚于该时间的待办事项已提醒过或在开始前已逾期
+        self._fired_until: Optional[datetime] = None
+        self._connection = None
+        self._data_version = None
+
+    def _changed(self) -> bool:
+        """数据库自上次检查后是否被其他连接修改
+
+        使用单独保持的连接读取 PRAGMA data_version，该值只在其他连接提交写入后变化。
+        """
+        if self._connection is None:
+            self._connection = self.db.engine.raw_connection()
+        version = self._connection.driver_connection.execute("PRAGMA data_version").fetchone()[0]
+        changed = version != self._data_version
+        self._data_version = version
+        return changed
+
+    def _load(self):
+        """重新加载截止时间晚于已提醒时间的全部未完成待办事项"""
+        with self.db.session_scope() as session:
+            todos = TodoService(session).get_due_todos(start=self._fired_until)
+        # 查询结果按截止时间升序排列，已满足堆的性质
+        self._heap = [(todo.deadline, todo.id, todo) for todo in todos if todo.deadline > self._fired_until]
+
+    def pending(self) -> int:
+        """尚未提醒的待办事项数"""
+        return len(self._heap)
+
+    def next_deadline(self) -> Optional[datetime]:
+        """最近的尚未提醒的截止时间"""
+        return self._heap[0][0] if self._heap else None
+
+    def run(self, notify: Callable[[Todo], None], stop: Optional[Callable[[], bool]] = None):
+        """持续提醒到期的待办事项，直到 stop 返回True（默认一直运行，由 Ctrl-C 结束）
+
+        启动时已逾期的待办事项不会提醒，可先用 TodoService.get_due_todos 查询。
+
+        Args:
+            notify (Callable[[Todo], None]): 待办事项到期时调用，同一截止时间的按ID顺序调用
+            stop (Optional[Callable[[], bool]], optional): 每次唤醒后调用，返回True时结束. Defaults to None.
+        """
+        self._fired_until = self.clock()
+        self._changed()
+        self._load()
+        try:
+            while stop is None or not stop():
+                wait = self.refresh
+                if self._heap:
+                    wait = min(wait, (self._heap[0][0] - self.clock()).total_seconds())
+                if wait > 0:
+                    self.sleep(wait)
+                if self._changed():
+                    self._load()
+                now = self.clock()
+                while self._heap and self._heap[0][0] <= now:
+                    notify(heapq.heappop(self._heap)[2])
+                self._fired_until = max(self._fired_until, now)
+        finally:
+            self.close()
+
+    def close(self):
+        """归还用于检查数据库变化的连接"""
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
@@ -0,0 +1,105 @@
+"""采集日志压缩
+
+把采集模式追加到 cashlog.journal 的收支记录批量写入数据库，见 cashlog.journal。
+"""
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from datetime import datetime
+from pathlib import Path
+from ..data.models import Transaction
+from ..journal import JOURNAL_SUFFIX, file_lock, parse_entries
+from .transaction_service import TransactionService
+from typing import Optional, Union
+import os
+
+# 查询已入库条目ID时每批的参数个数，低于SQLite的变量数上限
+ID_BATCH_SIZE = 500
+
+class JournalService:
+    """采集日志的压缩入库"""
+
+    def __init__(self, db_session: Session):
+        """初始化业务逻辑层
+
+        Args:
+            db_session (Session): 数据库会话对象
+        """
+        self.db_session = db_session
+
+    def default_path(self) -> Path:
+        """采集日志默认路径：与数据库文件同目录、同名的 .journal 文件"""
+        return Path(self.db_session.get_bind().url.database).with_suffix(JOURNAL_SUFFIX)
+
+    def compact(self, path: Optional[Union[str, Path]] = None) -> dict:
+        """将采集日志中的全部条目写入数据库并清空日志
+
+        压缩期间持有日志文件锁，新的追加会等待压缩完成。条目以批量导入方式在一个事务中写入，
+        已入库的条目ID（上次压缩提交后、清空日志前中断）会被跳过；无法解析的行另存到
+        .rejected 文件后从日志中移除。
+
+        Args:
+            path (Optional[Union[str, Path]], optional): 日志文件路径. Defaults to None，使用 default_path().
+
+        Returns:
+            dict: applied 为本次入库的条数，duplicates 为跳过的已入库条数，invalid 为无法解析的行数
+        """
+        path = Path(path) if path is not None else self.default_path()
+        result = {"applied": 0, "duplicates": 0, "invalid": 0}
+        try:
+            fd = os.open(path, os.O_RDWR)
+        except FileNotFoundError:
+            return result
+
+        try:
+            with file_lock(fd):
+                data = self._read_all(fd)
+                if not data:
+                    return result
+                entries, invalid = parse_entries(data)
+                # 同一条目在日志中出现多次时只保留一次
+                entries = list({entry["id"]: entry for entry in entries}.values())
+                existing = self._existing_ids([entry["id"] for entry in entries])
+                records = [
+                    {
+                        "amount": entry["amount"],
+                        "category": entry["category"],
+                        "tags": entry.get("tags"),
+                        "remark": entry.get("remark"),
+                        "transaction_time": datetime.fromisoformat(entry["transaction_time"]),
+                        "capture_id": entry["id"],
+                    }
+                    for entry in entries if entry["id"] not in existing
+                ]
+                if records:
+                    result["applied"] = TransactionService(self.db_session).add_transactions_bulk(records)
+                result["duplicates"] = len(entries) - len(records)
+                result["invalid"] = len(invalid)
+                if invalid:
+                    with open(path.with_name(path.name + ".rejected"), "ab") as rejected:
+                        rejected.write(b"\n".join(invalid) + b"\n")
+                # 数据库已提交，清空日志
+                os.ftruncate(fd, 0)
+                os.fsync(fd)
+        finally:
+            os.close(fd)
+        return result
+
+    @staticmethod
+    def _read_all(fd: int) -> bytes:
+        """从头读取整个日志文件"""
+        os.lseek(fd, 0, os.SEEK_SET)
+        chunks = []
+        while True:
+            chunk = os.read(fd, 1 << 20)
+            if not chunk:
+                return b"".join(chunks)
+            chunks.append(chunk)
+
+    def _existing_ids(self, entry_ids: list) -> set:
+        """查询已入库的条目ID"""
+        existing = set()
+        for i in range(0, len(entry_ids), ID_BATCH_SIZE):
+            existing.update(self.db_session.execute(
+                select(Transaction.capture_id).where(Transaction.capture_id.in_(entry_ids[i:i + ID_BATCH_SIZE]))
+            ).scalars())
+        return existing
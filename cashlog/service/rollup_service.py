@@ -0,0 +1,102 @@
+from sqlalchemy import delete
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.orm import Session
+from datetime import datetime
+from ..data.models import MonthlyRollup, MONTHLY_ROLLUP_REBUILD_SQL
+from typing import Dict, Iterable, List, Tuple
+
+RollupKey = Tuple[int, int, str]
+
+class RollupService:
+    """月度汇总表维护逻辑
+    
+    所有变更都在调用方的会话事务中执行，与收支记录的写入一同提交或回滚。
+    """
+    
+    def __init__(self, db_session: Session):
+        """初始化业务逻辑层
+        
+        Args:
+            db_session (Session): 数据库会话对象
+        """
+        self.db_session = db_session
+    
+    @staticmethod
+    def add_delta(deltas: Dict[RollupKey, list], transaction_time: datetime, category: str,
+                  amount_cents: int, sign: int = 1):
+        """将一笔收支记录的变化累加到待写入的汇总增量中
+        
+        Args:
+            deltas (Dict[RollupKey, list]): (年, 月, 分类) 到 [收入, 支出, 笔数] 增量的映射
+            transaction_time (datetime): 交易时间
+            category (str): 分类
+            amount_cents (int): 以分为单位的金额
+            sign (int, optional): 新增记录为1，删除记录为-1. Defaults to 1.
+        """
+        delta = deltas.setdefault((transaction_time.year, transaction_time.month, category), [0, 0, 0])
+        if amount_cents > 0:
+            delta[0] += sign * amount_cents
+        else:
+            delta[1] += sign * -amount_cents
+        delta[2] += sign
+    
+    def apply(self, deltas: Dict[RollupKey, list]):
+        """将汇总增量写入月度汇总表
+        
+        Args:
+            deltas (Dict[RollupKey, list]): add_delta 累加得到的增量
+        """
+        if not deltas:
+            return
+        self.db_session.execute(self.upsert_statement(), self.delta_rows(deltas))
+    
+    @staticmethod
+    def upsert_statement():
+        """将增量累加到月度汇总表的 INSERT ... ON CONFLICT DO UPDATE 语句"""
+        table = MonthlyRollup.__table__
+        statement = insert(table)
+        return statement.on_conflict_do_update(
+            index_elements=[table.c.year, table.c.month, table.c.category],
+            set_={
+                "income_cents": table.c.income_cents + statement.excluded.income_cents,
+                "expense_cents": table.c.expense_cents + statement.excluded.expense_cents,
+                "transaction_count": table.c.transaction_count + statement.excluded.transaction_count,
+            }
+        )
+    
+    @staticmethod
+    def delta_rows(deltas: Dict[RollupKey, list]) -> List[dict]:
+        """将汇总增量转换为 upsert_statement 的参数列表"""
+        return [
+            {
+                "year": year,
+                "month": month,
+                "category": category,
+                "income_cents": income,
+                "expense_cents": expense,
+                "transaction_count": count,
+            }
+            for (year, month, category), (income, expense, count) in deltas.items()
+        ]
+    
+    def record(self, transaction_time: datetime, category: str, amount_cents: int, sign: int = 1):
+        """记录单笔收支记录的新增（sign=1）或删除（sign=-1）
+        
+        Args:
+            transaction_time (datetime): 交易时间
+            category (str): 分类
+            amount_cents (int): 以分为单位的金额
+            sign (int, optional): 新增记录为1，删除记录为-1. Defaults to 1.
+        """
+        deltas = {}
+        self.add_delta(deltas, transaction_time, category, amount_cents, sign)
+        self.apply(deltas)
+    
+    def rebuild(self) -> int:
+        """根据收支记录重新生成月度汇总表
+        
+        Returns:
+            int: 生成的汇总行数
+        """
+        self.db_session.execute(delete(MonthlyRollup))
+        return self.db_session.execute(MONTHLY_ROLLUP_REBUILD_SQL).rowcount
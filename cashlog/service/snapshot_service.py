@@ -0,0 +1,225 @@
+"""收支记录列式快照
+
+快照是一个目录，包含定长列文件和一个小的头文件：
+
+    header.json               格式版本、行数、生成时间、数据指纹、各列文件及类型
+    transaction_time.i64      交易时间，自1970-01-01起的秒数（小端 int64）
+    amount_cents.i64          金额，以分为单位（小端 int64）
+    category.i32              分类编码（小端 int32），对应 categories.json 中的下标
+    categories.json           分类字典
+
+记录按交易时间升序写入，加载时通过内存映射直接得到 NumPy 数组，不复制数据。
+头文件中的数据指纹由月度汇总表和最大记录ID计算，数据库有新的写入后快照即视为过期。
+
+依赖可选组件 numpy：uv sync --extra analytics
+"""
+from sqlalchemy import cast, func, select, Integer
+from sqlalchemy.orm import Session
+from datetime import datetime
+from pathlib import Path
+from ..data.models import MonthlyRollup, Transaction
+from .analytics_service import FETCH_BATCH_SIZE, TransactionFrame, np, require_numpy
+from typing import Dict, Optional, Union
+import hashlib
+import json
+import os
+import shutil
+
+SNAPSHOT_FORMAT = "cashlog-columnar"
+SNAPSHOT_VERSION = 1
+HEADER_FILE = "header.json"
+CATEGORIES_FILE = "categories.json"
+
+# 列名 -> (文件名, 小端数据类型)
+COLUMNS = {
+    "transaction_time": ("transaction_time.i64", "<i8"),
+    "amount_cents": ("amount_cents.i64", "<i8"),
+    "category": ("category.i32", "<i4"),
+}
+
+class SnapshotService:
+    """收支记录列式快照的导出与加载"""
+
+    def __init__(self, db_session: Session):
+        """初始化业务逻辑层
+
+        Args:
+            db_session (Session): 数据库会话对象
+        """
+        self.db_session = db_session
+
+    def default_path(self) -> Path:
+        """快照默认目录：与数据库文件同目录、同名的 .columnar 目录"""
+        return Path(self.db_session.get_bind().url.database).with_suffix(".columnar")
+
+    def fingerprint(self) -> str:
+        """计算当前数据的指纹
+
+        月度汇总表随每次写入增量维护，体积只与月份和分类数量有关，
+        对其内容和最大记录ID取摘要即可低成本判断快照是否仍与数据库一致。
+
+        Returns:
+            str: 十六进制摘要
+        """
+        digest = hashlib.sha1()
+        max_id = self.db_session.execute(select(func.max(Transaction.id))).scalar()
+        digest.update(f"{max_id or 0}\n".encode())
+        rollups = self.db_session.execute(
+            select(
+                MonthlyRollup.year,
+                MonthlyRollup.month,
+                MonthlyRollup.category,
+                MonthlyRollup.income_cents,
+                MonthlyRollup.expense_cents,
+                MonthlyRollup.transaction_count
+            ).where(
+                MonthlyRollup.transaction_count > 0
+            ).order_by(MonthlyRollup.year, MonthlyRollup.month, MonthlyRollup.category)
+        )
+        for row in rollups:
+            digest.update("\t".join(str(value) for value in row).encode())
+            digest.update(b"\n")
+        return digest.hexdigest()
+
+    def export(self, path: Optional[Union[str, Path]] = None) -> dict:
+        """将收支记录导出为列式快照
+
+        先写入临时目录，完成后再替换旧快照，导出中途失败不会留下不完整的快照。
+
+        Args:
+            path (Optional[Union[str, Path]], optional): 快照目录. Defaults to None，使用 default_path().
+
+        Returns:
+            dict: 快照头信息
+        """
+        target = Path(path) if path is not None else self.default_path()
+        staging = target.with_name(f"{target.name}.tmp-{os.getpid()}")
+        if staging.exists():
+            shutil.rmtree(staging)
+        staging.mkdir(parents=True)
+
+        try:
+            # 先取指纹再读数据：导出期间若有新写入，快照会被判定为过期而不会被误用
+            fingerprint = self.fingerprint()
+            result = self.db_session.execute(
+                select(
+                    cast(func.strftime("%s", Transaction.transaction_time), Integer),
+                    Transaction.amount_cents,
+                    Transaction.category
+                ).order_by(Transaction.transaction_time, Transaction.id)
+            )
+            codes: Dict[str, int] = {}
+            rows = 0
+            files = {name: open(staging / file_name, "wb") for name, (file_name, _) in COLUMNS.items()}
+            try:
+                for chunk in result.partitions(FETCH_BATCH_SIZE):
+                    timestamps, amounts, categories = zip(*chunk)
+                    np.array(timestamps, dtype=COLUMNS["transaction_time"][1]).tofile(files["transaction_time"])
+                    np.array(amounts, dtype=COLUMNS["amount_cents"][1]).tofile(files["amount_cents"])
+                    np.array([codes.setdefault(c, len(codes)) for c in categories],
+                             dtype=COLUMNS["category"][1]).tofile(files["category"])
+                    rows += len(chunk)
+            finally:
+                for file in files.values():
+                    file.close()
+
+            with open(staging / CATEGORIES_FILE, "w", encoding="utf-8") as f:
+                json.dump(list(codes), f, ensure_ascii=False)
+            header = {
+                "format": SNAPSHOT_FORMAT,
+                "version": SNAPSHOT_VERSION,
+                "rows": rows,
+                "created_at": datetime.now().isoformat(timespec="seconds"),
+                "fingerprint": fingerprint,
+                "columns": {name: {"file": file_name, "dtype": dtype}
+                            for name, (file_name, dtype) in COLUMNS.items()},
+                "categories": CATEGORIES_FILE,
+            }
+            # 头文件最后写入
+            with open(staging / HEADER_FILE, "w", encoding="utf-8") as f:
+                json.dump(header, f, ensure_ascii=False, indent=2)
+        except Exception:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+
+        if target.exists():
+            retired = target.with_name(f"{target.name}.old-{os.getpid()}")
+            target.rename(retired)
+            staging.rename(target)
+            shutil.rmtree(retired, ignore_errors=True)
+        else:
+            staging.rename(target)
+        return header
+
+    @staticmethod
+    def read_header(path: Union[str, Path]) -> Optional[dict]:
+        """读取快照头信息
+
+        Args:
+            path (Union[str, Path]): 快照目录
+
+        Returns:
+            Optional[dict]: 头信息，快照不存在或格式不支持时返回None
+        """
+        header_path = Path(path) / HEADER_FILE
+        if not header_path.is_file():
+            return None
+        with open(header_path, encoding="utf-8") as f:
+            header = json.load(f)
+        if header.get("format") != SNAPSHOT_FORMAT or header.get("version") != SNAPSHOT_VERSION:
+            return None
+        return header
+
+    @staticmethod
+    def load(path: Union[str, Path]) -> TransactionFrame:
+        """以内存映射方式加载快照
+
+        Args:
+            path (Union[str, Path]): 快照目录
+
+        Returns:
+            TransactionFrame: 按交易时间升序排列的列式数据，数组直接映射快照文件
+
+        Raises:
+            ValueError: 快照不存在或格式不支持时抛出
+        """
+        require_numpy()
+        path = Path(path)
+        header = SnapshotService.read_header(path)
+        if header is None:
+            raise ValueError(f"不是有效的列式快照：{path}")
+        rows = header["rows"]
+        columns = {}
+        for name, spec in header["columns"].items():
+            if rows == 0:
+                # 空文件无法映射
+                columns[name] = np.empty(0, dtype=spec["dtype"])
+            else:
+                columns[name] = np.memmap(path / spec["file"], dtype=spec["dtype"], mode="r", shape=(rows,))
+        with open(path / header["categories"], encoding="utf-8") as f:
+            categories = json.load(f)
+        return TransactionFrame(
+            columns["amount_cents"],
+            columns["transaction_time"],
+            columns["category"],
+            categories,
+            sorted_by_time=True,
+            source="snapshot"
+        )
+
+    def load_if_fresh(self, path: Optional[Union[str, Path]] = None) -> Optional[TransactionFrame]:
+        """存在与数据库一致的快照时加载它
+
+        Args:
+            path (Optional[Union[str, Path]], optional): 快照目录. Defaults to None，使用 default_path().
+
+        Returns:
+            Optional[TransactionFrame]: 快照数据，未安装numpy、快照不存在或已过期时返回None
+        """
+        if np is None:
+            return None
+        path = Path(path) if path is not None else self.default_path()
+        header = self.read_header(path)
+        if header is None or header["fingerprint"] != self.fingerprint():
+            return None
+        return self.load(path)
@@ -0,0 +1,88 @@
+from sqlalchemy import func, select, Table
+from sqlalchemy.orm import Session
+from ..data.models import Tag, parse_tags, format_tags
+from typing import Callable, Dict, List, Optional, Tuple
+
+# 标签匹配方式：all 需同时包含全部标签，any 包含任一标签即可
+TAG_MATCH_ALL = "all"
+TAG_MATCH_ANY = "any"
+
+def tag_filter(link_table: Table, owner_column: str, id_column, names: List[str], match: str = TAG_MATCH_ALL):
+    """构造按标签筛选的条件，通过关联表和标签名索引完成查找
+    
+    Args:
+        link_table (Table): 关联表，如 transaction_tags
+        owner_column (str): 关联表中指向记录的列名，如 transaction_id
+        id_column: 被筛选记录的主键列，如 Transaction.id
+        names (List[str]): 标签列表
+        match (str, optional): 匹配方式，all 或 any. Defaults to "all".
+    
+    Returns:
+        筛选条件表达式
+    """
+    if match not in (TAG_MATCH_ALL, TAG_MATCH_ANY):
+        raise ValueError(f"不支持的标签匹配方式：{match}")
+    owner = link_table.c[owner_column]
+    subquery = (
+        select(owner)
+        .join(Tag, Tag.id == link_table.c.tag_id)
+        .where(Tag.name.in_(names))
+    )
+    if match == TAG_MATCH_ALL and len(names) > 1:
+        subquery = subquery.group_by(owner).having(func.count() == len(names))
+    return id_column.in_(subquery)
+
+def tag_cache_key(tags: Optional[str], match: str = TAG_MATCH_ALL) -> Tuple[Tuple[str, ...], str]:
+    """查询缓存键中的标签条件，结果相同的写法（标签顺序、单个标签时的匹配方式）得到相同的键"""
+    names = tuple(sorted(parse_tags(tags)))
+    return names, match if len(names) > 1 else TAG_MATCH_ALL
+
+def _tags_select(names: List[str]):
+    """按名称查询标签"""
+    return select(Tag).where(Tag.name.in_(names))
+
+def _resolve_tags(names: List[str], existing: Dict[str, Tag], add: Callable[[Tag], None]) -> List[Tag]:
+    """按names顺序返回标签，不存在的标签通过add加入会话
+    
+    Args:
+        names (List[str]): 标签名称列表
+        existing (Dict[str, Tag]): 已存在的标签，名称到对象的映射
+        add (Callable[[Tag], None]): 将新标签加入会话的函数
+    
+    Returns:
+        List[Tag]: 与names顺序一致的标签对象列表
+    """
+    tags = []
+    for name in names:
+        tag = existing.get(name)
+        if tag is None:
+            tag = Tag(name=name)
+            add(tag)
+            existing[name] = tag
+        tags.append(tag)
+    return tags
+
+class TagService:
+    """标签业务逻辑层"""
+    
+    def __init__(self, db_session: Session):
+        """初始化业务逻辑层
+        
+        Args:
+            db_session (Session): 数据库会话对象
+        """
+        self.db_session = db_session
+    
+    def get_or_create_tags(self, names: List[str]) -> List[Tag]:
+        """按名称获取标签，不存在的标签将被创建
+        
+        Args:
+            names (List[str]): 标签名称列表
+        
+        Returns:
+            List[Tag]: 与names顺序一致的标签对象列表
+        """
+        if not names:
+            return []
+        existing = {tag.name: tag for tag in self.db_session.scalars(_tags_select(names))}
+        return _resolve_tags(names, existing, self.db_session.add)
@@ -1,18 +1,134 @@
+from sqlalchemy import select, tuple_, Select
 from sqlalchemy.orm import Session
 from datetime import datetime
-from ..data.models import Todo, TodoStatus
-from typing import List, Optional
+from ..data.models import Todo, TodoStatus, todo_tags
+from ..data.query_cache import cached
+from ..data.search import todos_fts, match_candidates, parse_query
+from .tag_service import TagService, parse_tags, format_tags, tag_filter, tag_cache_key, TAG_MATCH_ALL
+from typing import Iterator, List, Optional
+
+# 待办事项查询依赖的表，其中任一张表有写入时缓存的查询结果失效
+TODO_CACHE_TABLES = ("todos", "todo_tags", "tags")
+
+def _cursor_select(after: int) -> Select:
+    """查询分页游标待办事项的创建时间"""
+    return select(Todo.created_at).where(Todo.id == after)
+
+def _todos_select(status: Optional[TodoStatus], category: Optional[str],
+                  deadline_before: Optional[datetime], tags: Optional[str], tag_match: str,
+                  limit: Optional[int] = None, after: Optional[int] = None,
+                  cursor_time: Optional[datetime] = None) -> Select:
+    """构造带筛选条件和排序的待办事项查询，同步和异步业务逻辑层共用
+    
+    Args:
+        after (Optional[int], optional): 分页游标待办事项的ID. Defaults to None.
+        cursor_time (Optional[datetime], optional): 分页游标待办事项的创建时间，由 _cursor_select 查得. Defaults to None.
+    
+    Returns:
+        Select: 按创建时间、ID降序排列的查询语句
+    
+    Raises:
+        ValueError: 分页游标对应的待办事项不存在时抛出
+    """
+    statement = select(Todo)
+    
+    # 按状态筛选
+    if status is not None:
+        statement = statement.where(Todo.status == status)
+    
+    # 按分类筛选
+    if category is not None:
+        statement = statement.where(Todo.category == category)
+    
+    # 按截止时间筛选
+    if deadline_before is not None:
+        statement = statement.where(Todo.deadline <= deadline_before)
+    
+    # 按标签筛选
+    tag_names = parse_tags(tags)
+    if tag_names:
+        statement = statement.where(tag_filter(todo_tags, "todo_id", Todo.id, tag_names, tag_match))
+    
+    # 键集分页：从游标待办事项的 (创建时间, ID) 之后继续
+    if after is not None:
+        if cursor_time is None:
+            raise ValueError(f"分页游标对应的待办事项不存在：ID {after}")
+        statement = statement.where(tuple_(Todo.created_at, Todo.id) < tuple_(cursor_time, after))
+    
+    # 按创建时间降序排列，时间相同时按ID降序，保证分页顺序稳定
+    statement = statement.order_by(Todo.created_at.desc(), Todo.id.desc())
+    if limit is not None:
+        statement = statement.limit(limit)
+    return statement
+
+def _due_select(start: Optional[datetime], end: Optional[datetime], limit: Optional[int] = None) -> Select:
+    """构造按截止时间查询未完成待办事项的查询，同步和异步业务逻辑层共用
+    
+    条件与 ix_todos_open_deadline 部分索引的条件一致，只读取索引中截止时间在区间内的部分，不需要排序。
+    
+    Args:
+        start (Optional[datetime]): 截止时间下限（包含），None 为不限
+        end (Optional[datetime]): 截止时间上限（不包含），None 为不限
+        limit (Optional[int], optional): 最多返回的记录数. Defaults to None.
+    
+    Returns:
+        Select: 按截止时间、ID升序排列的查询语句
+    """
+    statement = select(Todo).where(Todo.status != TodoStatus.DONE, Todo.deadline.is_not(None))
+    if start is not None:
+        statement = statement.where(Todo.deadline >= start)
+    if end is not None:
+        statement = statement.where(Todo.deadline < end)
+    return statement.order_by(Todo.deadline, Todo.id).limit(limit)
+
+def _search_select(query: str, status: Optional[TodoStatus], category: Optional[str],
+                   deadline_before: Optional[datetime], tags: Optional[str], tag_match: str,
+                   limit: Optional[int] = None) -> Select:
+    """构造按内容全文搜索待办事项的查询，同步和异步业务逻辑层共用
+    
+    筛选条件与 _todos_select 相同。全部匹配记录按相关度排序，
+    相关度相同时按创建时间降序，见 cashlog.data.search。
+    
+    Returns:
+        Select: 查询语句
+    
+    Raises:
+        ValueError: 没有有效关键词时抛出
+    """
+    parsed = parse_query(query)
+    order_by = (Todo.created_at.desc(), Todo.id.desc())
+    candidates = match_candidates(
+        _todos_select(status, category, deadline_before, tags, tag_match),
+        todos_fts, Todo.id, Todo.content, parsed, order_by, limit
+    )
+    return (
+        select(Todo)
+        .join(candidates, candidates.c.id == Todo.id)
+        .order_by(candidates.c.rank, *order_by)
+    )
 
 class TodoService:
     """待办事项业务逻辑层"""
     
-    def __init__(self, db_session: Session):
+    def __init__(self, db_session: Session, autocommit: bool = True):
         """初始化业务逻辑层
         
         Args:
             db_session (Session): 数据库会话对象
+            autocommit (bool, optional): 写操作是否立即提交. Defaults to True.
+                为False时写操作只刷新到数据库（分配ID、检查约束），由调用方统一提交或回滚
         """
         self.db_session = db_session
+        self.autocommit = autocommit
+    
+    def _commit(self, obj=None):
+        """完成一次写操作：提交并重新读取obj；非自动提交模式下只执行flush"""
+        if not self.autocommit:
+            self.db_session.flush()
+            return
+        self.db_session.commit()
+        if obj is not None:
+            self.db_session.refresh(obj)
     
     def add_todo(self, content: str, category: str, tags: Optional[str] = None, 
                 deadline: Optional[datetime] = None) -> Todo:
@@ -27,16 +143,17 @@ class TodoService:
         Returns:
             Todo: 新增的待办事项对象
         """
+        tag_names = parse_tags(tags)
         todo = Todo(
             content=content,
             category=category,
-            tags=tags,
+            tags=format_tags(tag_names),
             deadline=deadline
         )
+        todo.tag_list = TagService(self.db_session).get_or_create_tags(tag_names)
         
         self.db_session.add(todo)
-        self.db_session.commit()
-        self.db_session.refresh(todo)
+        self._commit(todo)
         
         return todo
     
@@ -50,41 +167,95 @@ class TodoService:
         Returns:
             Optional[Todo]: 更新后的待办事项对象，若不存在则返回None
         """
-        todo = self.db_session.query(Todo).filter(Todo.id == todo_id).first()
+        todo = self.db_session.get(Todo, todo_id)
         if todo:
             todo.status = status
-            self.db_session.commit()
-            self.db_session.refresh(todo)
+            self._commit(todo)
         return todo
     
     def get_todos(self, status: Optional[TodoStatus] = None, category: Optional[str] = None, 
-                 deadline_before: Optional[datetime] = None) -> List[Todo]:
+                 deadline_before: Optional[datetime] = None, tags: Optional[str] = None,
+                 tag_match: str = TAG_MATCH_ALL, limit: Optional[int] = None,
+                 after: Optional[int] = None) -> List[Todo]:
         """查询待办事项
         
         Args:
             status (Optional[TodoStatus], optional): 状态. Defaults to None.
             category (Optional[str], optional): 分类. Defaults to None.
             deadline_before (Optional[datetime], optional): 截止时间之前. Defaults to None.
+            tags (Optional[str], optional): 标签，多个标签用逗号分隔. Defaults to None.
+            tag_match (str, optional): 多个标签的匹配方式，all 为同时包含，any 为包含任一. Defaults to "all".
+            limit (Optional[int], optional): 最多返回的记录数. Defaults to None.
+            after (Optional[int], optional): 分页游标，返回排在该ID待办事项之后的记录. Defaults to None.
+        
+        Returns:
+            List[Todo]: 待办事项列表；开启查询缓存时为已移出会话的只读对象
+        """
+        key = ("todos", status, category, deadline_before, tag_cache_key(tags, tag_match), limit, after)
+        return list(cached(self.db_session, key, TODO_CACHE_TABLES,
+                           lambda: tuple(self.db_session.scalars(self._build_query(
+                               status, category, deadline_before, tags, tag_match, limit, after))),
+                           detach=True))
+    
+    def iter_todos(self, status: Optional[TodoStatus] = None, category: Optional[str] = None, 
+                  deadline_before: Optional[datetime] = None, tags: Optional[str] = None,
+                  tag_match: str = TAG_MATCH_ALL, limit: Optional[int] = None,
+                  after: Optional[int] = None, batch_size: int = 1000) -> Iterator[Todo]:
+        """逐条流式查询待办事项，内存占用与结果总数无关
+        
+        参数与 get_todos 相同，结果按批从数据库游标读取。
+        
+        Args:
+            batch_size (int, optional): 每批从数据库读取的记录数. Defaults to 1000.
+        
+        Yields:
+            Todo: 待办事项对象
+        """
+        statement = self._build_query(status, category, deadline_before, tags, tag_match,
+                                      limit, after)
+        yield from self.db_session.scalars(statement.execution_options(yield_per=batch_size))
+    
+    def _build_query(self, status: Optional[TodoStatus], category: Optional[str],
+                     deadline_before: Optional[datetime], tags: Optional[str], tag_match: str,
+                     limit: Optional[int] = None, after: Optional[int] = None) -> Select:
+        """查询分页游标后构造待办事项查询，见 _todos_select"""
+        cursor_time = self.db_session.execute(_cursor_select(after)).scalar() if after is not None else None
+        return _todos_select(status, category, deadline_before, tags, tag_match, limit, after, cursor_time)
+    
+    def get_due_todos(self, start: Optional[datetime] = None, end: Optional[datetime] = None,
+                      limit: Optional[int] = None) -> List[Todo]:
+        """按截止时间查询未完成的待办事项
+        
+        Args:
+            start (Optional[datetime], optional): 截止时间下限（包含）. Defaults to None，不限.
+            end (Optional[datetime], optional): 截止时间上限（不包含）. Defaults to None，不限.
+            limit (Optional[int], optional): 最多返回的记录数. Defaults to None.
         
         Returns:
-            List[Todo]: 待办事项列表
+            List[Todo]: 按截止时间升序排列的待办事项列表，不含已完成和没有截止时间的待办事项
         """
-        query = self.db_session.query(Todo)
+        return self.db_session.scalars(_due_select(start, end, limit)).all()
+    
+    def search_todos(self, query: str, status: Optional[TodoStatus] = None, category: Optional[str] = None,
+                     deadline_before: Optional[datetime] = None, tags: Optional[str] = None,
+                     tag_match: str = TAG_MATCH_ALL, limit: Optional[int] = 20) -> List[Todo]:
+        """按内容全文搜索待办事项
         
-        # 按状态筛选
-        if status is not None:
-            query = query.filter(Todo.status == status)
+        关键词以空白分隔、需全部匹配，每个关键词按子串匹配且不区分大小写。
         
-        # 按分类筛选
-        if category is not None:
-            query = query.filter(Todo.category == category)
+        Args:
+            query (str): 搜索关键词
+            limit (Optional[int], optional): 最多返回的记录数. Defaults to 20.
+            其余参数与 get_todos 相同
         
-        # 按截止时间筛选
-        if deadline_before is not None:
-            query = query.filter(Todo.deadline <= deadline_before)
+        Returns:
+            List[Todo]: 按相关度排序的待办事项列表
         
-        # 按创建时间降序排列
-        return query.order_by(Todo.created_at.desc()).all()
+        Raises:
+            ValueError: 没有有效关键词时抛出
+        """
+        return self.db_session.scalars(_search_select(query, status, category, deadline_before, tags,
+                                                      tag_match, limit)).all()
     
     def delete_todo(self, todo_id: int) -> bool:
         """删除待办事项
@@ -95,9 +266,9 @@ class TodoService:
         Returns:
             bool: 删除成功返回True，否则返回False
         """
-        todo = self.db_session.query(Todo).filter(Todo.id == todo_id).first()
+        todo = self.db_session.get(Todo, todo_id)
         if todo:
             self.db_session.delete(todo)
-            self.db_session.commit()
+            self._commit()
             return True
         return False
@@ -1,25 +1,295 @@
+from sqlalchemy import create_engine, func, case, cast, insert, select, tuple_, Integer, Select, String
 from sqlalchemy.orm import Session
+from sqlalchemy.pool import NullPool
 from datetime import datetime, date
-from ..data.models import Transaction, TransactionType
-from typing import List, Optional
+from decimal import Decimal
+from ..data.models import Transaction, TransactionType, Tag, MonthlyRollup, transaction_tags, to_cents, from_cents
+from ..data.query_cache import cached
+from ..data.search import transactions_fts, match_candidates, parse_query
+from .rollup_service import RollupService
+from .tag_service import TagService, parse_tags, format_tags, tag_filter, tag_cache_key, TAG_MATCH_ALL
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+def _month_bounds(month: int, year: int) -> Tuple[datetime, datetime]:
+    """计算某月的起止时间（左闭右开）
+
+    Args:
+        month (int): 月份 (1-12)
+        year (int): 年份
+
+    Returns:
+        Tuple[datetime, datetime]: 当月第一天和下月第一天
+    """
+    start_date = datetime(year, month, 1)
+    if month == 12:
+        end_date = datetime(year + 1, 1, 1)
+    else:
+        end_date = datetime(year, month + 1, 1)
+    return start_date, end_date
+
+# 区间报表支持的汇总粒度
+GRANULARITIES = ("month", "quarter", "year")
+
+# 收支记录查询依赖的表，其中任一张表有写入时缓存的查询结果失效
+TRANSACTION_CACHE_TABLES = ("transactions", "transaction_tags", "tags")
+
+def _period_label(moment: datetime, granularity: str) -> str:
+    """计算时间所属周期的名称，与 _period_expr 在数据库中的计算结果一致
+    
+    Args:
+        moment (datetime): 时间
+        granularity (str): 汇总粒度，month、quarter 或 year
+    
+    Returns:
+        str: 周期名称，如 2024-01、2024-Q1、2024
+    """
+    if granularity == "month":
+        return f"{moment.year}-{moment.month:02d}"
+    if granularity == "quarter":
+        return f"{moment.year}-Q{(moment.month + 2) // 3}"
+    return str(moment.year)
+
+def _period_expr(granularity: str):
+    """构造在数据库中计算交易时间所属周期名称的表达式
+    
+    Args:
+        granularity (str): 汇总粒度，month、quarter 或 year
+    """
+    time_column = Transaction.transaction_time
+    if granularity == "month":
+        return func.strftime("%Y-%m", time_column)
+    if granularity == "quarter":
+        quarter = (cast(func.strftime("%m", time_column), Integer) + 2) // 3
+        return func.strftime("%Y", time_column).concat("-Q").concat(cast(quarter, String))
+    return func.strftime("%Y", time_column)
+
+def _period_labels(start: datetime, end: datetime, granularity: str) -> List[str]:
+    """列出时间区间 [start, end) 覆盖的全部周期名称
+    
+    Args:
+        start (datetime): 开始时间（包含）
+        end (datetime): 结束时间（不包含）
+        granularity (str): 汇总粒度
+    
+    Returns:
+        List[str]: 按时间顺序排列的周期名称
+    """
+    labels = []
+    year, month = start.year, start.month
+    while datetime(year, month, 1) < end:
+        label = _period_label(datetime(year, month, 1), granularity)
+        if not labels or labels[-1] != label:
+            labels.append(label)
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return labels
+
+def _new_transaction(amount: Union[Decimal, float, str], category: str, tag_names: List[str],
+                     remark: Optional[str], transaction_time: Optional[datetime]) -> Transaction:
+    """构造待写入的收支记录对象（不含标签关联）"""
+    return Transaction(
+        amount_cents=to_cents(amount),
+        category=category,
+        tags=format_tags(tag_names),
+        remark=remark,
+        transaction_time=transaction_time or datetime.now()
+    )
+
+def _cursor_select(after: int) -> Select:
+    """查询分页游标记录的交易时间"""
+    return select(Transaction.transaction_time).where(Transaction.id == after)
+
+def _transactions_select(month: Optional[int], year: Optional[int], category: Optional[str],
+                         tags: Optional[str], transaction_type: Optional[TransactionType], tag_match: str,
+                         limit: Optional[int] = None, after: Optional[int] = None,
+                         cursor_time: Optional[datetime] = None) -> Select:
+    """构造带筛选条件和排序的收支记录查询，同步和异步业务逻辑层共用
+    
+    Args:
+        after (Optional[int], optional): 分页游标记录的ID. Defaults to None.
+        cursor_time (Optional[datetime], optional): 分页游标记录的交易时间，由 _cursor_select 查得. Defaults to None.
+    
+    Returns:
+        Select: 按交易时间、ID降序排列的查询语句
+    
+    Raises:
+        ValueError: 分页游标对应的记录不存在时抛出
+    """
+    statement = select(Transaction)
+    
+    # 按月份和年份筛选
+    if month is not None and year is not None:
+        start_date, end_date = _month_bounds(month, year)
+        statement = statement.where(Transaction.transaction_time >= start_date,
+                                    Transaction.transaction_time < end_date)
+    
+    # 按分类筛选
+    if category is not None:
+        statement = statement.where(Transaction.category == category)
+    
+    # 按标签筛选
+    tag_names = parse_tags(tags)
+    if tag_names:
+        statement = statement.where(tag_filter(transaction_tags, "transaction_id", Transaction.id,
+                                               tag_names, tag_match))
+    
+    # 按收支类型筛选
+    if transaction_type is not None:
+        if transaction_type == TransactionType.INCOME:
+            statement = statement.where(Transaction.amount_cents > 0)
+        else:
+            statement = statement.where(Transaction.amount_cents < 0)
+    
+    # 键集分页：从游标记录的 (交易时间, ID) 之后继续，沿索引定位而不是跳过前面的行
+    if after is not None:
+        if cursor_time is None:
+            raise ValueError(f"分页游标对应的收支记录不存在：ID {after}")
+        statement = statement.where(
+            tuple_(Transaction.transaction_time, Transaction.id) < tuple_(cursor_time, after)
+        )
+    
+    # 按交易时间降序排列，时间相同时按ID降序，保证分页顺序稳定
+    statement = statement.order_by(Transaction.transaction_time.desc(), Transaction.id.desc())
+    if limit is not None:
+        statement = statement.limit(limit)
+    return statement
+
+def _search_select(query: str, month: Optional[int], year: Optional[int], category: Optional[str],
+                   tags: Optional[str], transaction_type: Optional[TransactionType], tag_match: str,
+                   limit: Optional[int] = None) -> Select:
+    """构造按备注全文搜索收支记录的查询，同步和异步业务逻辑层共用
+    
+    筛选条件与 _transactions_select 相同。全部匹配记录按相关度排序，
+    相关度相同时按交易时间降序，见 cashlog.data.search。
+    
+    Returns:
+        Select: 查询语句
+    
+    Raises:
+        ValueError: 没有有效关键词时抛出
+    """
+    parsed = parse_query(query)
+    id_range = None
+    if month is not None and year is not None:
+        # 当月记录的ID范围，使全文索引不必读取其他月份的匹配记录
+        start_date, end_date = _month_bounds(month, year)
+        in_month = (Transaction.transaction_time >= start_date, Transaction.transaction_time < end_date)
+        id_range = (select(func.min(Transaction.id)).where(*in_month).scalar_subquery(),
+                    select(func.max(Transaction.id)).where(*in_month).scalar_subquery())
+    order_by = (Transaction.transaction_time.desc(), Transaction.id.desc())
+    candidates = match_candidates(
+        _transactions_select(month, year, category, tags, transaction_type, tag_match),
+        transactions_fts, Transaction.id, Transaction.remark, parsed, order_by, limit, id_range
+    )
+    return (
+        select(Transaction)
+        .join(candidates, candidates.c.id == Transaction.id)
+        .order_by(candidates.c.rank, *order_by)
+    )
+
+def _monthly_rollup_select(month: int, year: int) -> Select:
+    """查询某月各分类的月度汇总行"""
+    return select(
+        MonthlyRollup.category,
+        MonthlyRollup.income_cents,
+        MonthlyRollup.expense_cents,
+        MonthlyRollup.transaction_count
+    ).where(
+        MonthlyRollup.year == year,
+        MonthlyRollup.month == month,
+        MonthlyRollup.transaction_count > 0
+    ).order_by(MonthlyRollup.category)
+
+def _build_monthly_summary(rows: Iterable[tuple], month: int, year: int) -> dict:
+    """将月度汇总行整理为月度收支汇总，格式见 TransactionService.get_monthly_summary"""
+    # 以分为单位计算总收入、总支出及分类金额，全程整数运算
+    total_income = 0
+    total_expense = 0
+    transaction_count = 0
+    category_cents = {}
+    for cat, income, expense, count in rows:
+        income = income or 0
+        expense = expense or 0
+        total_income += income
+        total_expense += expense
+        transaction_count += count
+        category_cents[cat] = income + expense
+    
+    # 计算占比百分比
+    total_amount = total_income + total_expense
+    category_percentage = {}
+    for cat, amount in category_cents.items():
+        if total_amount > 0:
+            category_percentage[cat] = round((amount / total_amount) * 100, 2)
+        else:
+            category_percentage[cat] = 0.0
+    
+    return {
+        "month": month,
+        "year": year,
+        "total_income": from_cents(total_income),
+        "total_expense": from_cents(total_expense),
+        "balance": from_cents(total_income - total_expense),
+        "transaction_count": transaction_count,
+        "category_stats": {cat: from_cents(amount) for cat, amount in category_cents.items()},
+        "category_percentage": category_percentage
+    }
+
+def _check_range(start: datetime, end: datetime, granularity: str):
+    """校验区间报表参数
+
+    Raises:
+        ValueError: 汇总粒度不支持或时间区间为空时抛出
+    """
+    if granularity not in GRANULARITIES:
+        raise ValueError(f"不支持的汇总粒度：{granularity}，可选值：{', '.join(GRANULARITIES)}")
+    if start >= end:
+        raise ValueError("开始时间需早于结束时间")
+
+def _range_rows_select(start: datetime, end: datetime, granularity: str) -> Select:
+    """按周期和分类聚合时间区间内收支记录的查询，每行为 (周期, 分类, 收入分值, 支出分值, 笔数)"""
+    period = _period_expr(granularity).label("period")
+    income_expr = case((Transaction.amount_cents > 0, Transaction.amount_cents), else_=0)
+    expense_expr = case((Transaction.amount_cents < 0, -Transaction.amount_cents), else_=0)
+    return select(
+        period,
+        Transaction.category,
+        func.sum(income_expr),
+        func.sum(expense_expr),
+        func.count()
+    ).where(
+        Transaction.transaction_time >= start,
+        Transaction.transaction_time < end
+    ).group_by(period, Transaction.category)
 
 class TransactionService:
     """收支记录业务逻辑层"""
     
-    def __init__(self, db_session: Session):
+    def __init__(self, db_session: Session, autocommit: bool = True):
         """初始化业务逻辑层
         
         Args:
             db_session (Session): 数据库会话对象
+            autocommit (bool, optional): 写操作是否立即提交. Defaults to True.
+                为False时写操作只刷新到数据库（分配ID、检查约束），由调用方统一提交或回滚
         """
         self.db_session = db_session
+        self.autocommit = autocommit
+    
+    def _commit(self, obj=None):
+        """完成一次写操作：提交并重新读取obj；非自动提交模式下只执行flush"""
+        if not self.autocommit:
+            self.db_session.flush()
+            return
+        self.db_session.commit()
+        if obj is not None:
+            self.db_session.refresh(obj)
     
-    def add_transaction(self, amount: float, category: str, tags: Optional[str] = None, 
+    def add_transaction(self, amount: Union[Decimal, float, str], category: str, tags: Optional[str] = None, 
                       remark: Optional[str] = None, transaction_time: Optional[datetime] = None) -> Transaction:
         """新增收支记录
         
         Args:
-            amount (float): 金额，正数为收入，负数为支出
+            amount (Union[Decimal, float, str]): 金额，正数为收入，负数为支出，精确到分
             category (str): 分类
             tags (Optional[str], optional): 标签，多个标签用逗号分隔. Defaults to None.
             remark (Optional[str], optional): 备注. Defaults to None.
@@ -27,68 +297,190 @@ class TransactionService:
         
         Returns:
             Transaction: 新增的收支记录对象
+        
+        Raises:
+            ValueError: 金额不是有效数字时抛出
         """
-        if transaction_time is None:
-            transaction_time = datetime.now()
-        
-        transaction = Transaction(
-            amount=amount,
-            category=category,
-            tags=tags,
-            remark=remark,
-            transaction_time=transaction_time
-        )
+        tag_names = parse_tags(tags)
+        transaction = _new_transaction(amount, category, tag_names, remark, transaction_time)
+        transaction.tag_list = TagService(self.db_session).get_or_create_tags(tag_names)
         
         self.db_session.add(transaction)
-        self.db_session.commit()
-        self.db_session.refresh(transaction)
+        # 月度汇总与收支记录在同一事务中提交
+        RollupService(self.db_session).record(transaction.transaction_time, category, transaction.amount_cents)
+        self._commit(transaction)
         
         return transaction
     
+    def add_transactions_bulk(self, records: Iterable[dict], batch_size: int = 5000) -> int:
+        """批量新增收支记录，所有记录在同一个事务中分批插入
+        
+        Args:
+            records (Iterable[dict]): 收支记录，字段同 add_transaction 的参数：
+                amount、category 必填，tags、remark、transaction_time 可选，
+                capture_id 为采集日志条目ID，仅由日志压缩使用
+            batch_size (int, optional): 每批插入的记录数. Defaults to 5000.
+        
+        Returns:
+            int: 新增的记录数
+        
+        Raises:
+            ValueError: 记录缺少必填字段或金额无效时抛出，此时所有记录均不会写入
+        """
+        tag_ids: Dict[str, int] = {}
+        count = 0
+        batch = []
+        try:
+            for record in records:
+                batch.append(record)
+                if len(batch) >= batch_size:
+                    count += self._insert_batch(batch, tag_ids)
+                    batch = []
+            if batch:
+                count += self._insert_batch(batch, tag_ids)
+            self._commit()
+        except Exception:
+            self.db_session.rollback()
+            raise
+        return count
+    
+    def _insert_batch(self, records: List[dict], tag_ids: Dict[str, int]) -> int:
+        """插入一批收支记录及其标签关联
+        
+        Args:
+            records (List[dict]): 收支记录
+            tag_ids (Dict[str, int]): 标签名称到ID的缓存，跨批次复用
+        
+        Returns:
+            int: 插入的记录数
+        """
+        now = datetime.now()
+        connection = self.db_session.connection()
+        rows = []
+        row_tags = []
+        rollup_deltas = {}
+        for record in records:
+            if record.get("amount") is None or not record.get("category"):
+                raise ValueError(f"收支记录缺少金额或分类：{record}")
+            names = parse_tags(record.get("tags"))
+            rows.append({
+                "amount_cents": to_cents(record["amount"]),
+                "category": record["category"],
+                "tags": format_tags(names),
+                "remark": record.get("remark"),
+                "transaction_time": record.get("transaction_time") or now,
+                "created_at": now,
+                "updated_at": now,
+                "capture_id": record.get("capture_id"),
+            })
+            row_tags.append(names)
+            RollupService.add_delta(rollup_deltas, rows[-1]["transaction_time"], rows[-1]["category"],
+                                    rows[-1]["amount_cents"])
+            if names:
+                self._resolve_tag_ids(connection, names, tag_ids)
+        
+        # 主键由SQLite在插入时分配，多行 INSERT ... RETURNING 按参数顺序取回ID，
+        # 不依赖事先读取的 max(id)，其他连接并发写入时也不会主键冲突
+        statement = insert(Transaction.__table__).returning(Transaction.__table__.c.id, sort_by_parameter_order=True)
+        ids = connection.execute(statement, rows).scalars().all()
+        links = [{"transaction_id": transaction_id, "tag_id": tag_ids[name]}
+                 for transaction_id, names in zip(ids, row_tags) for name in names]
+        if links:
+            connection.execute(insert(transaction_tags), links)
+        RollupService(self.db_session).apply(rollup_deltas)
+        return len(rows)
+    
+    @staticmethod
+    def _resolve_tag_ids(connection, names: List[str], tag_ids: Dict[str, int]):
+        """查询或创建标签，并将其ID写入缓存
+        
+        Args:
+            connection (Connection): 当前事务的数据库连接
+            names (List[str]): 标签名称列表
+            tag_ids (Dict[str, int]): 标签名称到ID的缓存
+        """
+        for name in names:
+            if name in tag_ids:
+                continue
+            tag_id = connection.execute(select(Tag.id).where(Tag.name == name)).scalar()
+            if tag_id is None:
+                tag_id = connection.execute(insert(Tag.__table__).values(name=name)).inserted_primary_key[0]
+            tag_ids[name] = tag_id
+    
     def get_transactions(self, month: Optional[int] = None, year: Optional[int] = None, 
                        category: Optional[str] = None, tags: Optional[str] = None, 
-                       transaction_type: Optional[TransactionType] = None) -> List[Transaction]:
+                       transaction_type: Optional[TransactionType] = None,
+                       tag_match: str = TAG_MATCH_ALL, limit: Optional[int] = None,
+                       after: Optional[int] = None) -> List[Transaction]:
         """查询收支记录
         
         Args:
             month (Optional[int], optional): 月份 (1-12). Defaults to None.
             year (Optional[int], optional): 年份. Defaults to None.
             category (Optional[str], optional): 分类. Defaults to None.
-            tags (Optional[str], optional): 标签. Defaults to None.
+            tags (Optional[str], optional): 标签，多个标签用逗号分隔. Defaults to None.
             transaction_type (Optional[TransactionType], optional): 收支类型. Defaults to None.
+            tag_match (str, optional): 多个标签的匹配方式，all 为同时包含，any 为包含任一. Defaults to "all".
+            limit (Optional[int], optional): 最多返回的记录数. Defaults to None.
+            after (Optional[int], optional): 分页游标，返回排在该ID记录之后的记录. Defaults to None.
         
         Returns:
-            List[Transaction]: 收支记录列表
+            List[Transaction]: 收支记录列表；开启查询缓存时为已移出会话的只读对象
         """
-        query = self.db_session.query(Transaction)
+        key = ("transactions", month, year, category, tag_cache_key(tags, tag_match), transaction_type, limit, after)
+        return list(cached(self.db_session, key, TRANSACTION_CACHE_TABLES,
+                           lambda: tuple(self.db_session.scalars(self._build_query(
+                               month, year, category, tags, transaction_type, tag_match, limit, after))),
+                           detach=True))
+    
+    def iter_transactions(self, month: Optional[int] = None, year: Optional[int] = None, 
+                        category: Optional[str] = None, tags: Optional[str] = None, 
+                        transaction_type: Optional[TransactionType] = None,
+                        tag_match: str = TAG_MATCH_ALL, limit: Optional[int] = None,
+                        after: Optional[int] = None, batch_size: int = 1000) -> Iterator[Transaction]:
+        """逐条流式查询收支记录，内存占用与结果总数无关
         
-        # 按月份和年份筛选
-        if month is not None and year is not None:
-            start_date = datetime(year, month, 1)
-            if month == 12:
-                end_date = datetime(year + 1, 1, 1)
-            else:
-                end_date = datetime(year, month + 1, 1)
-            query = query.filter(Transaction.transaction_time >= start_date, 
-                               Transaction.transaction_time < end_date)
-        
-        # 按分类筛选
-        if category is not None:
-            query = query.filter(Transaction.category == category)
-        
-        # 按标签筛选
-        if tags is not None:
-            query = query.filter(Transaction.tags.contains(tags))
-        
-        # 按收支类型筛选
-        if transaction_type is not None:
-            if transaction_type == TransactionType.INCOME:
-                query = query.filter(Transaction.amount > 0)
-            else:
-                query = query.filter(Transaction.amount < 0)
+        参数与 get_transactions 相同，结果按批从数据库游标读取。
         
-        # 按交易时间降序排列
-        return query.order_by(Transaction.transaction_time.desc()).all()
+        Args:
+            batch_size (int, optional): 每批从数据库读取的记录数. Defaults to 1000.
+        
+        Yields:
+            Transaction: 收支记录对象
+        """
+        statement = self._build_query(month, year, category, tags, transaction_type, tag_match,
+                                      limit, after)
+        yield from self.db_session.scalars(statement.execution_options(yield_per=batch_size))
+    
+    def _build_query(self, month: Optional[int], year: Optional[int], category: Optional[str],
+                     tags: Optional[str], transaction_type: Optional[TransactionType], tag_match: str,
+                     limit: Optional[int] = None, after: Optional[int] = None) -> Select:
+        """查询分页游标后构造收支记录查询，见 _transactions_select"""
+        cursor_time = self.db_session.execute(_cursor_select(after)).scalar() if after is not None else None
+        return _transactions_select(month, year, category, tags, transaction_type, tag_match,
+                                    limit, after, cursor_time)
+    
+    def search_transactions(self, query: str, month: Optional[int] = None, year: Optional[int] = None,
+                            category: Optional[str] = None, tags: Optional[str] = None,
+                            transaction_type: Optional[TransactionType] = None,
+                            tag_match: str = TAG_MATCH_ALL, limit: Optional[int] = 20) -> List[Transaction]:
+        """按备注全文搜索收支记录
+        
+        关键词以空白分隔、需全部匹配，每个关键词按子串匹配且不区分大小写。
+        
+        Args:
+            query (str): 搜索关键词
+            limit (Optional[int], optional): 最多返回的记录数. Defaults to 20.
+            其余参数与 get_transactions 相同
+        
+        Returns:
+            List[Transaction]: 按相关度排序的收支记录列表
+        
+        Raises:
+            ValueError: 没有有效关键词时抛出
+        """
+        return self.db_session.scalars(_search_select(query, month, year, category, tags, transaction_type,
+                                                      tag_match, limit)).all()
     
     def get_monthly_summary(self, month: int, year: int) -> dict:
         """获取月度收支汇总
@@ -98,50 +490,165 @@ class TransactionService:
             year (int): 年份
         
         Returns:
-            dict: 月度收支汇总数据
+            dict: 月度收支汇总数据，金额均为精确到分的 Decimal；开启查询缓存时调用方不应修改
         """
-        start_date = datetime(year, month, 1)
-        if month == 12:
-            end_date = datetime(year + 1, 1, 1)
-        else:
-            end_date = datetime(year, month + 1, 1)
-        
-        # 获取当月所有交易
-        transactions = self.db_session.query(Transaction).filter(
-            Transaction.transaction_time >= start_date, 
-            Transaction.transaction_time < end_date
-        ).all()
-        
-        # 计算总收入、总支出
-        total_income = sum(t.amount for t in transactions if t.amount > 0)
-        total_expense = abs(sum(t.amount for t in transactions if t.amount < 0))
-        balance = total_income - total_expense
-        
-        # 计算分类占比
-        category_stats = {}
-        for t in transactions:
-            cat = t.category
-            amount = abs(t.amount)
-            if cat not in category_stats:
-                category_stats[cat] = 0
-            category_stats[cat] += amount
-        
-        # 计算占比百分比
-        total_amount = total_income + total_expense
-        category_percentage = {}
-        for cat, amount in category_stats.items():
-            if total_amount > 0:
-                category_percentage[cat] = round((amount / total_amount) * 100, 2)
+        # 读取增量维护的月度汇总表，行数只与分类数量有关
+        def load():
+            rows = self.db_session.execute(_monthly_rollup_select(month, year)).all()
+            return _build_monthly_summary(rows, month, year)
+        return cached(self.db_session, ("monthly_summary", month, year), (MonthlyRollup.__tablename__,), load)
+    
+    def rebuild_rollups(self) -> int:
+        """根据收支记录重新生成月度汇总表
+        
+        Returns:
+            int: 生成的汇总行数
+        """
+        try:
+            count = RollupService(self.db_session).rebuild()
+            self._commit()
+        except Exception:
+            self.db_session.rollback()
+            raise
+        return count
+    
+    def get_range_summary(self, start: datetime, end: datetime, granularity: str = "month",
+                          use_snapshot: bool = False, parallel: int = 1) -> dict:
+        """获取时间区间内按周期和分类的收支汇总
+        
+        所有周期和分类的合计由一条按交易时间索引筛选的 GROUP BY 查询得到；
+        use_snapshot 为True且存在与数据库一致的列式快照时，改为在快照数组上聚合。
+        parallel 大于1且未使用快照时，将时间区间等分为 parallel 个分片，由进程池中的工作进程
+        各自以只读连接聚合后合并，结果与串行聚合完全相同；工作进程只能读到已提交的数据。
+        
+        Args:
+            start (datetime): 开始时间（包含）
+            end (datetime): 结束时间（不包含）
+            granularity (str, optional): 汇总粒度，month、quarter 或 year. Defaults to "month".
+            use_snapshot (bool, optional): 是否优先使用列式快照（需要numpy）. Defaults to False.
+            parallel (int, optional): 并行聚合的工作进程数. Defaults to 1，在当前连接上串行聚合.
+        
+        Returns:
+            dict: 区间汇总数据，periods 按时间顺序列出区间内的每个周期（无记录的周期金额为0），
+                金额均为精确到分的 Decimal；开启查询缓存时调用方不应修改
+        
+        Raises:
+            ValueError: 汇总粒度不支持、时间区间为空，或对内存数据库并行聚合时抛出
+        """
+        _check_range(start, end, granularity)
+        if parallel < 1:
+            raise ValueError(f"工作进程数需为正整数：{parallel}")
+
+        def load():
+            snapshot = None
+            if use_snapshot:
+                from .snapshot_service import SnapshotService
+                snapshot = SnapshotService(self.db_session).load_if_fresh()
+            if snapshot is not None:
+                rows = snapshot.filter(start, end).period_rows(granularity)
             else:
-                category_percentage[cat] = 0.0
-        
-        return {
-            "month": month,
-            "year": year,
-            "total_income": total_income,
-            "total_expense": total_expense,
-            "balance": balance,
-            "transaction_count": len(transactions),
-            "category_stats": category_stats,
-            "category_percentage": category_percentage
-        }
+                rows = self._range_rows(start, end, granularity, parallel)
+            return _build_range_summary(rows, start, end, granularity)
+        # 快照与数据库一致、并行与串行聚合时结果相同，缓存键不区分聚合方式
+        key = ("range_summary", start, end, granularity)
+        return cached(self.db_session, key, (Transaction.__tablename__,), load)
+    
+    def _range_rows(self, start: datetime, end: datetime, granularity: str, parallel: int = 1) -> List[tuple]:
+        """按周期和分类聚合时间区间内的收支记录
+        
+        Returns:
+            List[tuple]: (周期, 分类, 收入分值, 支出分值, 笔数) 列表
+        """
+        if parallel > 1:
+            database = _database_file(self.db_session.get_bind().url)
+            return _parallel_range_rows(database, start, end, granularity, parallel)
+        return [tuple(row) for row in self.db_session.execute(_range_rows_select(start, end, granularity))]
+
+def _database_file(url) -> str:
+    """并行聚合时工作进程各自打开的数据库文件路径
+    
+    Raises:
+        ValueError: 内存数据库无法被其他进程打开
+    """
+    if not url.database or url.database == ":memory:":
+        raise ValueError("并行汇总需要使用数据库文件，不支持内存数据库")
+    return url.database
+
+def _split_range(start: datetime, end: datetime, shards: int) -> List[Tuple[datetime, datetime]]:
+    """将时间区间 [start, end) 等分为最多 shards 个首尾相接的分片"""
+    step = (end - start) / shards
+    bounds = [start] + [start + step * i for i in range(1, shards)] + [end]
+    return [(lower, upper) for lower, upper in zip(bounds, bounds[1:]) if lower < upper]
+
+def _range_rows_shard(database: str, start: datetime, end: datetime, granularity: str) -> List[tuple]:
+    """在工作进程中以只读连接聚合一个时间分片，每行为 (周期, 分类, 收入分值, 支出分值, 笔数)"""
+    from urllib.parse import quote
+    engine = create_engine(f"sqlite:///file:{quote(database)}?mode=ro&uri=true", poolclass=NullPool)
+    try:
+        with engine.connect() as conn:
+            return [tuple(row) for row in conn.execute(_range_rows_select(start, end, granularity))]
+    finally:
+        engine.dispose()
+
+def _parallel_range_rows(database: str, start: datetime, end: datetime, granularity: str,
+                         workers: int) -> List[tuple]:
+    """将时间区间分片，在进程池中并行聚合，按分片顺序拼接各分片的结果
+    
+    跨越分片边界的周期在多个分片中各出现一次，由 _build_range_summary 累加；
+    金额均为整数分，合并结果与串行聚合完全相同，与各分片完成的先后无关。
+    """
+    from concurrent.futures import ProcessPoolExecutor
+    shards = _split_range(start, end, workers)
+    with ProcessPoolExecutor(max_workers=len(shards)) as executor:
+        futures = [executor.submit(_range_rows_shard, database, lower, upper, granularity)
+                   for lower, upper in shards]
+        return [row for future in futures for row in future.result()]
+
+def _build_range_summary(rows: Iterable[tuple], start: datetime, end: datetime, granularity: str) -> dict:
+    """将 (周期, 分类, 收入分值, 支出分值, 笔数) 聚合结果整理为区间汇总
+    
+    Args:
+        rows (Iterable[tuple]): 聚合结果，同一周期和分类可出现多次，将被累加
+        start (datetime): 开始时间（包含）
+        end (datetime): 结束时间（不包含）
+        granularity (str): 汇总粒度
+    
+    Returns:
+        dict: 区间汇总数据，格式见 TransactionService.get_range_summary
+    """
+    buckets = {label: {"income": 0, "expense": 0, "count": 0, "categories": {}}
+               for label in _period_labels(start, end, granularity)}
+    category_cents = {}
+    for period, category, income, expense, count in rows:
+        bucket = buckets[period]
+        bucket["income"] += income or 0
+        bucket["expense"] += expense or 0
+        bucket["count"] += count
+        amount = (income or 0) + (expense or 0)
+        bucket["categories"][category] = bucket["categories"].get(category, 0) + amount
+        category_cents[category] = category_cents.get(category, 0) + amount
+    
+    periods = []
+    for label, bucket in buckets.items():
+        periods.append({
+            "period": label,
+            "total_income": from_cents(bucket["income"]),
+            "total_expense": from_cents(bucket["expense"]),
+            "balance": from_cents(bucket["income"] - bucket["expense"]),
+            "transaction_count": bucket["count"],
+            "category_stats": {cat: from_cents(bucket["categories"][cat])
+                               for cat in sorted(bucket["categories"])},
+        })
+    total_income = sum(bucket["income"] for bucket in buckets.values())
+    total_expense = sum(bucket["expense"] for bucket in buckets.values())
+    return {
+        "start": start,
+        "end": end,
+        "granularity": granularity,
+        "total_income": from_cents(total_income),
+        "total_expense": from_cents(total_expense),
+        "balance": from_cents(total_income - total_expense),
+        "transaction_count": sum(bucket["count"] for bucket in buckets.values()),
+        "category_stats": {cat: from_cents(category_cents[cat]) for cat in sorted(category_cents)},
+        "periods": periods,
+    }
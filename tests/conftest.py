@@ -0,0 +1,17 @@
+import pytest
+import sys
+import os
+# 将项目根目录添加到Python路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+@pytest.fixture
+def home(tmp_path, monkeypatch):
+    """使用临时HOME和新的全局数据库实例"""
+    from cashlog.data import database
+    monkeypatch.setenv('HOME', str(tmp_path))
+    # 环境中开启的采集模式会让写入命令只追加日志
+    monkeypatch.delenv('CASHLOG_CAPTURE', raising=False)
+    monkeypatch.setattr(database, '_db', None)
+    yield tmp_path
+    if database._db is not None:
+        database._db.close()
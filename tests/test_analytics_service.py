@@ -0,0 +1,82 @@
+import pytest
+import sys
+import os
+# 将项目根目录添加到Python路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+np = pytest.importorskip('numpy')
+
+from cashlog.service.analytics_service import AnalyticsService
+from cashlog.service.transaction_service import TransactionService
+from cashlog.data.models import TransactionType
+from datetime import datetime, date
+from decimal import Decimal
+from tests.test_database import temp_db
+
+@pytest.fixture
+def analytics(temp_db):
+    """写入测试数据并返回统计分析服务"""
+    session = temp_db()
+    TransactionService(session).add_transactions_bulk([
+        {'amount': 5000.0, 'category': '工资', 'transaction_time': datetime(2024, 1, 1, 9, 0, 0)},
+        {'amount': -10.0, 'category': '餐饮', 'transaction_time': datetime(2024, 1, 1, 12, 0, 0)},
+        {'amount': -20.0, 'category': '餐饮', 'transaction_time': datetime(2024, 1, 3, 12, 0, 0)},
+        {'amount': -30.0, 'category': '餐饮', 'transaction_time': datetime(2024, 1, 8, 12, 0, 0)},
+        {'amount': -40.0, 'category': '餐饮', 'transaction_time': datetime(2024, 3, 1, 12, 0, 0)},
+        {'amount': -100.0, 'category': '交通', 'transaction_time': datetime(2024, 3, 2, 8, 0, 0)},
+    ])
+    yield AnalyticsService(session)
+    session.close()
+
+def test_load_frame(analytics):
+    """测试将收支记录读入列式数组"""
+    frame = analytics.load_frame()
+    assert len(frame) == 6
+    assert frame.amounts.dtype == np.int64
+    assert frame.category_codes.dtype == np.int32
+    assert sorted(frame.categories) == ['交通', '工资', '餐饮']
+    assert int(frame.amounts.sum()) == 500000 - 20000
+    assert int(frame.timestamps.min()) == int((datetime(2024, 1, 1, 9) - datetime(1970, 1, 1)).total_seconds())
+    
+    # 筛选条件
+    assert len(analytics.load_frame(start=datetime(2024, 3, 1))) == 2
+    assert len(analytics.load_frame(category='餐饮', end=datetime(2024, 2, 1))) == 3
+    assert len(analytics.load_frame(transaction_type=TransactionType.INCOME)) == 1
+    assert len(analytics.load_frame(category='不存在')) == 0
+
+def test_category_stats(analytics):
+    """测试按分类计算分位数"""
+    stats = {s['category']: s for s in analytics.load_frame().category_stats(percentiles=(50, 100))}
+    food = stats['餐饮']
+    assert food['count'] == 4
+    assert food['total_expense'] == Decimal('100.00')
+    assert food['mean'] == 25.0
+    assert food['percentiles'] == {50: 25.0, 100: 40.0}
+    assert stats['工资']['total_income'] == Decimal('5000.00')
+
+def test_histogram(analytics):
+    """测试按天和按周的直方图"""
+    frame = analytics.load_frame(end=datetime(2024, 2, 1))
+    daily = frame.histogram('day')
+    assert daily[0] == {'start': date(2024, 1, 1), 'count': 2,
+                        'total_income': Decimal('5000.00'), 'total_expense': Decimal('10.00')}
+    assert [d['count'] for d in daily] == [2, 0, 1, 0, 0, 0, 0, 1]
+    
+    # 2024-01-01 是星期一
+    weekly = frame.histogram('week')
+    assert [(w['start'], w['count']) for w in weekly] == [(date(2024, 1, 1), 3), (date(2024, 1, 8), 1)]
+    
+    with pytest.raises(ValueError):
+        frame.histogram('hour')
+
+def test_month_over_month(analytics):
+    """测试月度环比"""
+    months = analytics.load_frame().month_over_month()
+    assert [m['period'] for m in months] == ['2024-01', '2024-02', '2024-03']
+    assert months[0]['balance'] == Decimal('4940.00')
+    assert months[0]['delta'] is None
+    assert months[1]['count'] == 0
+    assert months[1]['delta'] == Decimal('-4940.00')
+    assert months[1]['change_percent'] == -100.0
+    assert months[2]['total_expense'] == Decimal('140.00')
+    assert months[2]['change_percent'] is None
@@ -0,0 +1,99 @@
+import asyncio
+import pytest
+import sys
+import os
+# 将项目根目录添加到Python路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+pytest.importorskip('aiosqlite')
+
+from cashlog.data.async_database import AsyncDatabase
+from cashlog.data.database import Database
+from cashlog.data.models import TodoStatus
+from cashlog.service.async_todo_service import AsyncTodoService
+from cashlog.service.async_transaction_service import AsyncTransactionService
+from cashlog.service.todo_service import TodoService
+from cashlog.service.transaction_service import TransactionService
+from datetime import datetime
+
+RECORDS = [
+    {'amount': 5000, 'category': '工资', 'transaction_time': datetime(2024, 1, 1, 9)},
+    {'amount': -25.5, 'category': '餐饮', 'tags': '午餐,工作日', 'transaction_time': datetime(2024, 1, 2, 12)},
+    {'amount': -8, 'category': '交通', 'tags': '工作日', 'transaction_time': datetime(2024, 2, 3, 8)},
+    {'amount': -120, 'category': '餐饮', 'transaction_time': datetime(2024, 2, 14, 19)},
+]
+
+@pytest.fixture
+def db_path(tmp_path):
+    """写入测试数据的临时数据库路径"""
+    path = str(tmp_path / 'cashlog.db')
+    db = Database(path)
+    with db.session_scope() as session:
+        TransactionService(session).add_transactions_bulk(RECORDS)
+    db.close()
+    return path
+
+def test_async_queries_match_sync(db_path):
+    """测试异步业务逻辑层的查询结果与同步版本一致"""
+    db = Database(db_path)
+    with db.session_scope() as session:
+        service = TransactionService(session)
+        expected = (
+            [t.id for t in service.get_transactions(tags='工作日')],
+            [t.id for t in service.get_transactions(limit=2, after=4)],
+            service.get_monthly_summary(2, 2024),
+            service.get_range_summary(datetime(2024, 1, 1), datetime(2025, 1, 1), 'quarter'),
+        )
+    db.close()
+    
+    async def run():
+        db = AsyncDatabase(db_path)
+        async with db.session_scope() as session:
+            service = AsyncTransactionService(session)
+            result = (
+                [t.id for t in await service.get_transactions(tags='工作日')],
+                [t.id async for t in service.iter_transactions(limit=2, after=4)],
+                await service.get_monthly_summary(2, 2024),
+                await service.get_range_summary(datetime(2024, 1, 1), datetime(2025, 1, 1), 'quarter'),
+            )
+            assert await service.get_range_summary(datetime(2024, 1, 1), datetime(2025, 1, 1), 'quarter',
+                                                   parallel=2) == result[-1]
+            with pytest.raises(ValueError):
+                await service.get_transactions(after=999)
+        await db.close()
+        return result
+    
+    assert asyncio.run(run()) == expected
+
+def test_async_writes_and_concurrent_reads(db_path):
+    """测试异步写入与并发读取"""
+    async def run():
+        db = AsyncDatabase(db_path, pool_size=4, max_overflow=0)
+        async with db.session_scope() as session:
+            transaction = await AsyncTransactionService(session).add_transaction(
+                '-4.5', '餐饮', tags='午餐,咖啡', transaction_time=datetime(2024, 2, 20))
+            todos = AsyncTodoService(session)
+            todo = await todos.add_todo('报销', '工作', tags='工作日')
+            await todos.update_todo_status(todo.id, TodoStatus.DONE)
+        
+        async def read():
+            async with db.session_scope() as session:
+                return (await AsyncTransactionService(session).get_monthly_summary(2, 2024))['transaction_count']
+        counts = await asyncio.gather(*(read() for _ in range(50)))
+        
+        async with db.session_scope() as session:
+            assert await AsyncTodoService(session).delete_todo(todo.id)
+            assert not await AsyncTodoService(session).delete_todo(todo.id)
+        await db.close()
+        return transaction, todo, counts
+    
+    transaction, todo, counts = asyncio.run(run())
+    assert str(transaction.amount) == '-4.50'
+    assert transaction.tags == '午餐,咖啡'
+    assert counts == [3] * 50
+    
+    db = Database(db_path)
+    with db.session_scope() as session:
+        assert [t.id for t in TransactionService(session).get_transactions(tags='咖啡')] == [transaction.id]
+        assert TodoService(session).get_todos() == []
+    db.close()
@@ -0,0 +1,63 @@
+import pytest
+import sys
+import os
+# 将项目根目录添加到Python路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from click.testing import CliRunner
+from cashlog.cli.main import main_cli
+
+def counts():
+    """读取当前数据库中的收支记录数和待办状态"""
+    from cashlog.data.database import get_db
+    from cashlog.service.todo_service import TodoService
+    from cashlog.service.transaction_service import TransactionService
+    with get_db().session_scope() as session:
+        return (len(TransactionService(session).get_transactions()),
+                sorted((t.id, t.status.value) for t in TodoService(session).get_todos()))
+
+def test_batch_commits_all_lines_once(home):
+    """测试批处理在一个事务中执行全部命令，后面的行可以引用前面新增的记录"""
+    script = '\n'.join([
+        '# 每行一条命令',
+        'transaction add -a -25 -c 餐饮 -t 午餐',
+        'cashlog transaction add -a 100 -c 工资 -ti "2024-01-01 09:00:00"',
+        '',
+        'todo add -c "写 周报" -ca 工作',
+        'todo add -c 买菜 -ca 生活',
+        'todo update -i 1 -s done',
+        'todo delete -i 2',
+    ])
+    script_path = home / 'changes.txt'
+    script_path.write_text(script + '\n', encoding='utf-8')
+    
+    result = CliRunner().invoke(main_cli, ['batch', '--dry-run', str(script_path)])
+    assert result.exit_code == 0, result.output
+    assert '已回滚' in result.output
+    assert counts() == (0, [])
+    
+    result = CliRunner().invoke(main_cli, ['batch', '-v'], input=script + '\n')
+    assert result.exit_code == 0, result.output
+    assert '第7行：待办事项状态更新成功！ID: 1，新状态: done' in result.output
+    assert '共 6 条命令在一个事务中提交' in result.output
+    assert counts() == (2, [(1, 'done')])
+
+def test_batch_reports_errors_and_writes_nothing(home):
+    """测试任一行出错时全部回滚，并逐行报告错误"""
+    script = '\n'.join([
+        'transaction add -a -25 -c 餐饮',
+        'transaction add -a abc -c 餐饮',
+        'todo update -i 99 -s done',
+        'transaction list',
+        'todo add -c 没有分类',
+        'todo add -c 之后的行只做校验 -ca 工作 -d 2024-13-01',
+    ])
+    result = CliRunner().invoke(main_cli, ['batch'], input=script + '\n')
+    assert result.exit_code == 1
+    assert '第2行：' in result.stderr and '金额需为数字' in result.stderr
+    assert '第3行：待办事项不存在：ID 99' in result.stderr
+    assert '第4行：批处理不支持该命令：transaction list' in result.stderr
+    assert '第5行：NOT NULL constraint failed' in result.stderr
+    assert '第6行：' in result.stderr
+    assert '5 行出错，全部 6 条命令均未写入' in result.stderr
+    assert counts() == (0, [])
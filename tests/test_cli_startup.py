@@ -0,0 +1,40 @@
+import pytest
+import sys
+import os
+import subprocess
+# 将项目根目录添加到Python路径
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, PROJECT_ROOT)
+
+# 在子进程中执行 --help，并输出已导入的重量级模块
+HELP_SCRIPT = """
+import sys
+from click.testing import CliRunner
+from cashlog.cli.main import main_cli
+for args in (['--help'], ['transaction', '--help'], ['todo', '--help']):
+    result = CliRunner().invoke(main_cli, args)
+    assert result.exit_code == 0, result.output
+print(','.join(sorted(name for name in ('sqlalchemy', 'tabulate') if name in sys.modules)))
+"""
+
+def test_help_does_not_touch_database(tmp_path):
+    """测试 --help 不导入SQLAlchemy/tabulate，也不创建数据库目录"""
+    env = dict(os.environ, HOME=str(tmp_path))
+    result = subprocess.run([sys.executable, '-c', HELP_SCRIPT], cwd=PROJECT_ROOT, env=env,
+                            capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == ''
+    assert not (tmp_path / '.cashlog').exists()
+
+def test_get_db_is_lazy(tmp_path, monkeypatch):
+    """测试全局数据库实例在首次使用时才创建"""
+    from cashlog.data import database
+    monkeypatch.setattr(database, '_db', None)
+    monkeypatch.setenv('HOME', str(tmp_path))
+    
+    assert not (tmp_path / '.cashlog').exists()
+    db = database.get_db()
+    assert (tmp_path / '.cashlog' / 'cashlog.db').exists()
+    assert database.get_db() is db
+    # 兼容旧的模块属性访问方式
+    assert database.db is db
+    db.engine.dispose()
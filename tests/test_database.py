@@ -9,6 +9,7 @@ from sqlalchemy.orm import sessionmaker
 from sqlalchemy import inspect
 from cashlog.data.models import Base, Transaction, Todo, TransactionType, TodoStatus
 from cashlog.data.database import Database
+from cashlog.service.transaction_service import TransactionService
 from datetime import datetime
 import tempfile
 
@@ -107,3 +108,94 @@ def test_todo_model(temp_db):
     assert retrieved.status == TodoStatus.DOING
     
     session.close()
+
+@pytest.mark.parametrize('profile, journal_mode, synchronous', [
+    ('durable', 'delete', 2),
+    ('fast', 'wal', 1),
+])
+def test_database_profile_pragmas(profile, journal_mode, synchronous):
+    """测试SQLite性能配置在连接上生效"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        db = Database(db_path=os.path.join(temp_dir, 'cashlog.db'), profile=profile)
+        with db.engine.connect() as conn:
+            assert conn.exec_driver_sql('PRAGMA journal_mode').scalar() == journal_mode
+            assert conn.exec_driver_sql('PRAGMA synchronous').scalar() == synchronous
+            assert conn.exec_driver_sql('PRAGMA temp_store').scalar() == 2
+        db.engine.dispose()
+
+def test_durable_database_opens_while_fast_database_is_in_use(tmp_path):
+    """测试 fast 配置的实例（如API服务）持有连接时，durable 配置的实例仍可读写，数据库保持WAL"""
+    path = str(tmp_path / 'cashlog.db')
+    fast = Database(db_path=path, profile='fast')
+    with fast.engine.connect() as held:
+        held.exec_driver_sql('SELECT COUNT(*) FROM transactions').scalar()
+        durable = Database(db_path=path, profile='durable')
+        session = durable.get_session()
+        TransactionService(session).add_transaction(-10, '餐饮')
+        session.close()
+        with durable.engine.connect() as conn:
+            assert conn.exec_driver_sql('PRAGMA journal_mode').scalar() == 'wal'
+            assert conn.exec_driver_sql('PRAGMA synchronous').scalar() == 2
+        assert held.exec_driver_sql('SELECT COUNT(*) FROM transactions').scalar() == 1
+        durable.engine.dispose()
+    fast.engine.dispose()
+
+def test_database_profile_from_env_and_config(tmp_path, monkeypatch):
+    """测试从环境变量和配置文件选择性能配置"""
+    config_path = tmp_path / 'config.ini'
+    config_path.write_text('[database]\nprofile = fast\n', encoding='utf-8')
+    monkeypatch.setenv('CASHLOG_CONFIG', str(config_path))
+    monkeypatch.delenv('CASHLOG_DB_PROFILE', raising=False)
+    
+    db = Database(db_path=str(tmp_path / 'a.db'))
+    assert db.profile == 'fast'
+    db.engine.dispose()
+    
+    # 环境变量优先于配置文件
+    monkeypatch.setenv('CASHLOG_DB_PROFILE', 'durable')
+    db = Database(db_path=str(tmp_path / 'b.db'))
+    assert db.profile == 'durable'
+    db.engine.dispose()
+    
+    monkeypatch.setenv('CASHLOG_DB_PROFILE', 'unknown')
+    with pytest.raises(ValueError):
+        Database(db_path=str(tmp_path / 'c.db'))
+
+def test_session_scope_commits_and_rolls_back(tmp_path):
+    """测试工作单元正常结束时提交，异常时回滚，并始终关闭会话"""
+    db = Database(db_path=str(tmp_path / 'cashlog.db'))
+    with db.session_scope() as session:
+        session.add(Todo(content='提交', category='工作'))
+    
+    with pytest.raises(RuntimeError):
+        with db.session_scope() as session:
+            session.add(Todo(content='回滚', category='工作'))
+            session.flush()
+            raise RuntimeError('中断')
+    
+    with db.session_scope() as session:
+        assert [t.content for t in session.query(Todo)] == ['提交']
+        todo = session.query(Todo).one()
+    # 会话关闭后已加载的属性仍可读取
+    assert todo.content == '提交'
+    assert db.engine.pool.checkedout() == 0
+    db.close()
+
+def test_session_scope_keeps_connections_flat(tmp_path, monkeypatch):
+    """测试长时间运行时连接数不随操作次数增长"""
+    from cashlog.service.todo_service import TodoService
+    monkeypatch.setenv('CASHLOG_DB_POOL_SIZE', '2')
+    db = Database(db_path=str(tmp_path / 'cashlog.db'), max_overflow=0)
+    assert db.pool_config == {'pool_size': 2, 'max_overflow': 0, 'pool_timeout': 30}
+    
+    for i in range(300):
+        with db.session_scope() as session:
+            service = TodoService(session)
+            service.add_todo(f'待办{i}', '工作')
+            assert len(service.get_todos(limit=10)) == min(i + 1, 10)
+        assert db.engine.pool.checkedout() == 0
+    assert db.engine.pool.checkedin() <= 2
+    db.close()
+    
+    with pytest.raises(ValueError):
+        Database(db_path=str(tmp_path / 'other.db'), pool_size=-1)
@@ -0,0 +1,49 @@
+import pytest
+import sys
+import os
+# 将项目根目录添加到Python路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from datetime import datetime, timedelta
+from cashlog.data.database import Database
+from cashlog.data.models import TodoStatus
+from cashlog.service.deadline_watcher import DeadlineWatcher
+from cashlog.service.todo_service import TodoService
+
+def test_watcher_sleeps_until_deadlines_and_reloads_on_change(tmp_path):
+    """测试到期提醒按截止时间睡眠唤醒，数据库被修改后重新加载"""
+    db = Database(str(tmp_path / 'cashlog.db'))
+    start = datetime(2024, 1, 1, 9, 0, 0)
+    with db.session_scope() as session:
+        service = TodoService(session)
+        service.add_todo('已逾期', '生活', deadline=start - timedelta(hours=1))
+        service.add_todo('开会', '工作', deadline=start + timedelta(minutes=30))
+        cancelled = service.add_todo('取消的会议', '工作', deadline=start + timedelta(minutes=45))
+        service.add_todo('交报告', '工作', deadline=start + timedelta(hours=2))
+    
+    now = [start]
+    sleeps = []
+    fired = []
+    
+    def sleep(seconds):
+        sleeps.append(seconds)
+        now[0] += timedelta(seconds=seconds)
+        if len(sleeps) == 1:
+            # 第一次唤醒前，其他连接完成了一项并新增了一项
+            with db.session_scope() as session:
+                service = TodoService(session)
+                service.update_todo_status(cancelled.id, TodoStatus.DONE)
+                service.add_todo('打电话', '生活', deadline=start + timedelta(hours=1))
+    
+    watcher = DeadlineWatcher(db, refresh=3600, clock=lambda: now[0], sleep=sleep)
+    watcher.run(lambda todo: fired.append((now[0], todo.content)), stop=lambda: len(sleeps) >= 3)
+    
+    assert fired == [
+        (start + timedelta(minutes=30), '开会'),
+        (start + timedelta(hours=1), '打电话'),
+        (start + timedelta(hours=2), '交报告'),
+    ]
+    # 每次都直接睡眠到下一个截止时间
+    assert sleeps == [1800, 1800, 3600]
+    assert watcher.pending() == 0
+    db.close()
@@ -0,0 +1,65 @@
+import pytest
+import sys
+import os
+# 将项目根目录添加到Python路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from decimal import Decimal
+from click.testing import CliRunner
+from cashlog.cli.main import main_cli
+from cashlog.data.database import Database
+from cashlog.journal import JournalWriter, has_entries
+from cashlog.service.journal_service import JournalService
+from cashlog.service.transaction_service import TransactionService
+
+def test_capture_is_compacted_before_reads(home):
+    """测试采集模式只写日志，查询命令先将日志入库"""
+    runner = CliRunner()
+    result = runner.invoke(main_cli, ['transaction', 'add', '-a', '-25', '-c', '餐饮', '--capture'])
+    assert result.exit_code == 0
+    assert '采集日志' in result.output
+    result = runner.invoke(main_cli, ['transaction', 'add', '-a', '100', '-c', '工资', '--capture',
+                                      '-ti', '2024-01-01 09:00:00'])
+    assert result.exit_code == 0
+    journal = home / '.cashlog' / 'cashlog.journal'
+    assert has_entries(journal)
+
+    result = runner.invoke(main_cli, ['transaction', 'list'])
+    assert result.exit_code == 0
+    assert '餐饮' in result.output and '工资' in result.output
+    assert not has_entries(journal)
+
+    result = runner.invoke(main_cli, ['transaction', 'compact'])
+    assert result.exit_code == 0
+    assert '入库 0 条' in result.output
+
+def test_compact_is_idempotent_and_rejects_torn_lines(tmp_path):
+    """测试重复压缩不会重复入库，无法解析的行移到 .rejected 文件"""
+    journal = tmp_path / 'cashlog.journal'
+    writer = JournalWriter(journal)
+    first = writer.append('-12.50', '交通', tags='地铁')
+    writer.append('-30', '餐饮', remark='晚餐')
+    writer.close()
+    data = journal.read_bytes()
+    # 模拟上次压缩已提交但未清空日志，且末尾留下写入中途中断的半行
+    with open(journal, 'ab') as f:
+        f.write(data + b'{"id": "torn", "amou')
+
+    db = Database(str(tmp_path / 'cashlog.db'))
+    try:
+        with db.session_scope() as session:
+            TransactionService(session).add_transactions_bulk([
+                {'amount': '-12.50', 'category': '交通', 'tags': '地铁', 'capture_id': first},
+            ])
+        with db.session_scope() as session:
+            result = JournalService(session).compact(journal)
+        assert result == {'applied': 1, 'duplicates': 1, 'invalid': 1}
+        assert not has_entries(journal)
+        assert (tmp_path / 'cashlog.journal.rejected').read_bytes() == b'{"id": "torn", "amou\n'
+
+        with db.session_scope() as session:
+            assert JournalService(session).compact(journal) == {'applied': 0, 'duplicates': 0, 'invalid': 0}
+            transactions = TransactionService(session).get_transactions()
+            assert sorted(t.amount for t in transactions) == [Decimal('-30.00'), Decimal('-12.50')]
+    finally:
+        db.close()
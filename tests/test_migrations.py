@@ -0,0 +1,110 @@
+import pytest
+import sys
+import os
+# 将项目根目录添加到Python路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sqlalchemy import create_engine, inspect, text
+from cashlog.data.database import Database
+from cashlog.data.migrations import upgrade, get_schema_version, latest_version
+import tempfile
+
+# 引入版本迁移之前的表结构
+LEGACY_SCHEMA = [
+    """CREATE TABLE transactions (
+        id INTEGER NOT NULL PRIMARY KEY,
+        amount FLOAT NOT NULL,
+        category VARCHAR(50) NOT NULL,
+        tags VARCHAR(200),
+        remark VARCHAR(500),
+        transaction_time DATETIME NOT NULL,
+        created_at DATETIME NOT NULL,
+        updated_at DATETIME NOT NULL
+    )""",
+    """CREATE TABLE todos (
+        id INTEGER NOT NULL PRIMARY KEY,
+        content VARCHAR(500) NOT NULL,
+        category VARCHAR(50) NOT NULL,
+        tags VARCHAR(200),
+        deadline DATETIME,
+        status VARCHAR(5) NOT NULL,
+        created_at DATETIME NOT NULL,
+        updated_at DATETIME NOT NULL
+    )""",
+    """INSERT INTO transactions (amount, category, tags, remark, transaction_time, created_at, updated_at)
+       VALUES (-25.5, '餐饮', '午餐', '面条', '2024-01-02 12:00:00.000000',
+               '2024-01-02 12:00:00.000000', '2024-01-02 12:00:00.000000')""",
+    """INSERT INTO todos (content, category, tags, deadline, status, created_at, updated_at)
+       VALUES ('交房租', '生活', NULL, '2024-01-05 18:00:00.000000', 'TODO',
+               '2024-01-01 09:00:00.000000', '2024-01-01 09:00:00.000000')""",
+]
+
+@pytest.fixture
+def temp_db_path():
+    """创建临时数据库文件路径"""
+    with tempfile.NamedTemporaryFile(suffix='.db', delete=False) as f:
+        temp_db_path = f.name
+    os.unlink(temp_db_path)
+    
+    yield temp_db_path
+    
+    # 清理
+    if os.path.exists(temp_db_path):
+        os.unlink(temp_db_path)
+
+def index_names(engine, table):
+    """获取表上的索引名称集合"""
+    return {index['name'] for index in inspect(engine).get_indexes(table)}
+
+def test_fresh_database_is_stamped_latest(temp_db_path):
+    """测试全新数据库直接建表并标记为最新版本"""
+    db = Database(db_path=temp_db_path)
+    with db.engine.connect() as conn:
+        assert get_schema_version(conn) == latest_version()
+    assert 'ix_transactions_transaction_time' in index_names(db.engine, 'transactions')
+    assert 'ix_todos_status_created_at' in index_names(db.engine, 'todos')
+    db.engine.dispose()
+
+def test_legacy_database_upgrades_in_place(temp_db_path):
+    """测试旧版本数据库原地升级且数据保留"""
+    engine = create_engine(f'sqlite:///{temp_db_path}')
+    with engine.begin() as conn:
+        for statement in LEGACY_SCHEMA:
+            conn.execute(text(statement))
+    
+    applied = upgrade(engine)
+    assert applied == list(range(1, latest_version() + 1))
+    with engine.connect() as conn:
+        assert get_schema_version(conn) == latest_version()
+        # 浮点金额转换为以分为单位的整数
+        assert conn.execute(text('SELECT amount_cents FROM transactions')).scalar() == -2550
+        # 月度汇总表根据已有记录生成
+        assert conn.execute(text(
+            'SELECT year, month, category, income_cents, expense_cents, transaction_count FROM monthly_rollups'
+        )).fetchall() == [(2024, 1, '餐饮', 0, 2550, 1)]
+        assert conn.execute(text('SELECT COUNT(*) FROM todos')).scalar() == 1
+        # 已有的标签字符串被回填到关联表
+        assert conn.execute(text(
+            "SELECT t.name FROM transaction_tags l JOIN tags t ON t.id = l.tag_id"
+        )).fetchall() == [('午餐',)]
+        # 已有的备注和待办内容建立全文索引
+        # integrity-check 在索引与原表内容不一致时报错
+        conn.execute(text("INSERT INTO transactions_fts(transactions_fts, rank) VALUES ('integrity-check', 1)"))
+        assert conn.execute(text("SELECT rowid FROM todos_fts WHERE todos_fts MATCH '\"交房租\"'")).fetchall() == [(1,)]
+    assert {'ix_transactions_transaction_time', 'ix_transactions_category_time'} <= index_names(engine, 'transactions')
+    assert {'ix_todos_status_created_at', 'ix_todos_deadline'} <= index_names(engine, 'todos')
+    
+    # 再次执行不会重复迁移
+    assert upgrade(engine) == []
+    engine.dispose()
+
+def test_month_filter_uses_index(temp_db_path):
+    """测试按月份筛选使用交易时间索引"""
+    db = Database(db_path=temp_db_path)
+    with db.engine.connect() as conn:
+        plan = conn.execute(text(
+            "EXPLAIN QUERY PLAN SELECT * FROM transactions "
+            "WHERE transaction_time >= '2024-01-01' AND transaction_time < '2024-02-01'"
+        )).fetchall()
+    assert any('ix_transactions_transaction_time' in row[-1] for row in plan)
+    db.engine.dispose()
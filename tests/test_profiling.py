@@ -0,0 +1,74 @@
+import pytest
+import sys
+import os
+# 将项目根目录添加到Python路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from click.testing import CliRunner
+from cashlog import profiling
+from cashlog.data.database import Database
+from cashlog.service.transaction_service import TransactionService
+from datetime import datetime
+
+@pytest.fixture
+def db(tmp_path):
+    """创建临时数据库"""
+    db = Database(db_path=str(tmp_path / 'cashlog.db'))
+    yield db
+    profiling.stop()
+    db.engine.dispose()
+
+def test_query_stats_records_statements(db):
+    """测试Database记录每条SQL语句的耗时和行数"""
+    session = db.get_session()
+    TransactionService(session).add_transactions_bulk([
+        {'amount': -1, 'category': '餐饮', 'transaction_time': datetime(2024, 1, d)} for d in range(1, 4)
+    ])
+    # 未开启耗时分析时不记录SQL语句
+    assert db.query_stats.statements == {}
+    
+    profiling.start()
+    db.record_queries()
+    assert len(TransactionService(session).get_transactions()) == 3
+    profiler = profiling.stop()
+    db.record_queries(False)
+    TransactionService(session).get_transactions()
+    session.close()
+    
+    [entry] = db.query_stats.slowest()
+    assert entry['statement'].startswith('SELECT transactions.id')
+    assert entry['executions'] == 1
+    # 分析模式下读取结果的行数也计入统计
+    assert entry['rows'] == 3
+    assert entry['seconds'] > 0
+    assert profiler.phases['sql'] == pytest.approx(entry['seconds'])
+
+def test_profiler_nested_phases():
+    """测试嵌套阶段只统计独占耗时"""
+    profiler = profiling.Profiler()
+    with profiler.phase('render'):
+        profiler.add('sql', 0.5)
+        with profiler.phase('engine'):
+            pass
+    assert profiler.phases['sql'] == 0.5
+    # 嵌套阶段的耗时从外层扣除
+    assert profiler.phases['render'] < 0
+    assert '输出渲染' in profiler.report()
+
+def test_cli_profile_option(tmp_path, monkeypatch):
+    """测试 --profile 在命令结束后输出耗时报告"""
+    from cashlog.cli.main import main_cli
+    from cashlog.data import database
+    monkeypatch.setenv('HOME', str(tmp_path))
+    monkeypatch.setattr(database, '_db', None)
+    
+    dump_path = tmp_path / 'cashlog.prof'
+    result = CliRunner().invoke(
+        main_cli, ['--profile-dump', str(dump_path), 'transaction', 'list'])
+    assert result.exit_code == 0, result.output
+    assert '性能分析：总耗时' in result.stderr
+    assert '数据库初始化' in result.stderr
+    assert '最慢的SQL语句' in result.stderr
+    assert dump_path.exists()
+    assert profiling.get_profiler() is None
+    database._db.engine.dispose()
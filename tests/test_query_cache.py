@@ -0,0 +1,88 @@
+import pytest
+import sys
+import os
+import sqlite3
+# 将项目根目录添加到Python路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from datetime import datetime
+from decimal import Decimal
+from cashlog.data.database import Database
+from cashlog.data.query_cache import QueryCache
+from cashlog.service.todo_service import TodoService
+from cashlog.service.transaction_service import TransactionService
+
+@pytest.fixture
+def cached_db(tmp_path):
+    """开启查询缓存的临时数据库"""
+    db = Database(str(tmp_path / 'cashlog.db'), cache_size=16)
+    yield db
+    db.close()
+
+def test_cache_hits_until_related_table_is_written(cached_db):
+    """测试重复查询命中缓存，只有依赖的表有写入后才重新查询"""
+    with cached_db.session_scope() as session:
+        TransactionService(session).add_transaction(-20, '餐饮', transaction_time=datetime(2024, 1, 5))
+    with cached_db.session_scope() as session:
+        service = TransactionService(session)
+        first = service.get_transactions(tags='b,a')
+        assert service.get_transactions(tags='a,b') == first
+        summary = service.get_monthly_summary(1, 2024)
+        assert service.get_monthly_summary(1, 2024) is summary
+    stats = cached_db.query_cache.stats()
+    assert stats['hits'] == 2 and stats['misses'] == 2
+
+    # 其他表的写入不影响缓存
+    with cached_db.session_scope() as session:
+        TodoService(session).add_todo('记账', '生活')
+    with cached_db.session_scope() as session:
+        assert TransactionService(session).get_monthly_summary(1, 2024) is summary
+    assert cached_db.query_cache.stats()['hits'] == 3
+
+    with cached_db.session_scope() as session:
+        TransactionService(session).add_transaction(-30, '交通', transaction_time=datetime(2024, 1, 6))
+    with cached_db.session_scope() as session:
+        service = TransactionService(session)
+        assert service.get_monthly_summary(1, 2024)['total_expense'] == Decimal('50.00')
+        transactions = service.get_transactions()
+    # 缓存的对象已移出会话，会话关闭后仍可读取
+    assert [t.category for t in transactions] == ['交通', '餐饮']
+
+def test_cache_keeps_objects_already_in_session(cached_db):
+    """测试查询结果包含调用方已持有的对象时，不将其移出会话，也不缓存"""
+    with cached_db.session_scope() as session:
+        service = TransactionService(session)
+        transaction = service.add_transaction(-20, '餐饮')
+        assert service.get_transactions() == [transaction]
+        assert transaction in session
+        transaction.category = '交通'
+    with cached_db.session_scope() as session:
+        assert [t.category for t in TransactionService(session).get_transactions()] == ['交通']
+    assert cached_db.query_cache.stats()['hits'] == 0
+
+def test_cache_sees_uncommitted_and_external_writes(cached_db, tmp_path):
+    """测试事务内未提交的写入绕过缓存，其他进程的写入使缓存失效"""
+    with cached_db.session_scope() as session:
+        service = TransactionService(session, autocommit=False)
+        assert service.get_transactions() == []
+        service.add_transaction(-20, '餐饮')
+        assert len(service.get_transactions()) == 1
+    assert cached_db.query_cache.stats()['bypasses'] == 1
+
+    with cached_db.session_scope() as session:
+        assert len(TransactionService(session).get_transactions()) == 1
+    with sqlite3.connect(tmp_path / 'cashlog.db') as conn:
+        conn.execute("UPDATE transactions SET category = '外卖'")
+    with cached_db.session_scope() as session:
+        assert [t.category for t in TransactionService(session).get_transactions()] == ['外卖']
+
+def test_cache_evicts_least_recently_used(cached_db):
+    """测试超过条目数上限时淘汰最久未使用的结果"""
+    cache = QueryCache(max_entries=2, watch_external=False)
+    with cached_db.session_scope() as session:
+        for key in ['a', 'b', 'a', 'c', 'a', 'b']:
+            cache.get_or_load(session, key, ('transactions',), lambda: key)
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses'], stats['evictions'], stats['entries']) == (2, 4, 2, 2)
+    with pytest.raises(ValueError):
+        QueryCache(max_entries=0)
@@ -0,0 +1,137 @@
+import http.client
+import json
+import pytest
+import sys
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+# 将项目根目录添加到Python路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from cashlog.api.server import ApiServer
+from cashlog.data.database import Database
+
+@pytest.fixture
+def server(tmp_path):
+    """在后台线程中启动使用临时数据库的API服务"""
+    db = Database(db_path=str(tmp_path / 'cashlog.db'), profile='fast', pool_size=4, max_overflow=0)
+    server = ApiServer(('127.0.0.1', 0), db, workers=4)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+    db.close()
+
+def request(server, method, path, body=None):
+    """发送请求，返回状态码和解析后的JSON"""
+    conn = http.client.HTTPConnection('127.0.0.1', server.server_port, timeout=10)
+    try:
+        payload = json.dumps(body) if body is not None else None
+        conn.request(method, path, body=payload, headers={'Content-Type': 'application/json'})
+        response = conn.getresponse()
+        return response.status, json.loads(response.read())
+    finally:
+        conn.close()
+
+def test_transaction_endpoints(server):
+    """测试通过API添加、查询和汇总收支记录"""
+    status, created = request(server, 'POST', '/transactions', {
+        'amount': '-12.5', 'category': '餐饮', 'tags': '午餐', 'transaction_time': '2024-01-15 12:00:00'})
+    assert status == 201
+    assert created['amount'] == '-12.50'
+    assert created['type'] == 'expense'
+    request(server, 'POST', '/transactions', {'amount': 100, 'category': '工资', 'transaction_time': '2024-01-20'})
+    
+    status, page = request(server, 'GET', '/transactions?month=1&year=2024&limit=1')
+    assert status == 200
+    assert len(page['items']) == 1
+    status, rest = request(server, 'GET', f'/transactions?month=1&year=2024&after={page["next_after"]}')
+    assert [t['category'] for t in page['items'] + rest['items']] == ['工资', '餐饮']
+    assert rest['next_after'] is None
+    
+    status, summary = request(server, 'GET', '/transactions/summary?month=1&year=2024')
+    assert status == 200
+    assert summary['total_income'] == '100.00'
+    assert summary['total_expense'] == '12.50'
+    
+    status, report = request(server, 'GET', '/transactions/report?from=2024-01-01&to=2024-03-01')
+    assert status == 200
+    assert [p['period'] for p in report['periods']] == ['2024-01', '2024-02']
+
+def test_todo_endpoints_and_errors(server):
+    """测试待办事项的增删改查和错误响应"""
+    status, todo = request(server, 'POST', '/todos', {'content': '写周报', 'category': '工作', 'deadline': '2024-02-01'})
+    assert status == 201
+    assert todo['status'] == 'todo'
+    
+    status, updated = request(server, 'PATCH', f'/todos/{todo["id"]}', {'status': 'done'})
+    assert status == 200
+    assert updated['status'] == 'done'
+    status, page = request(server, 'GET', '/todos?status=done')
+    assert [t['id'] for t in page['items']] == [todo['id']]
+    
+    assert request(server, 'DELETE', f'/todos/{todo["id"]}')[0] == 200
+    assert request(server, 'DELETE', f'/todos/{todo["id"]}')[0] == 404
+    assert request(server, 'GET', '/todos?status=unknown')[0] == 400
+    assert request(server, 'POST', '/todos', {'category': '工作'})[0] == 400
+    assert request(server, 'GET', '/transactions?limit=0')[0] == 400
+    assert request(server, 'PUT', '/todos/1')[0] == 405
+    assert request(server, 'GET', '/nothing')[0] == 404
+
+def test_oversized_body_closes_connection(server):
+    """测试请求体过大时不读取请求体，返回413并关闭连接"""
+    from cashlog.api.server import MAX_BODY_SIZE
+    conn = http.client.HTTPConnection('127.0.0.1', server.server_port, timeout=10)
+    try:
+        conn.putrequest('POST', '/transactions')
+        conn.putheader('Content-Length', str(MAX_BODY_SIZE + 1))
+        conn.endheaders()
+        conn.send(b'{"amount": -1, "category": "GET /todos HTTP/1.1"}')
+        response = conn.getresponse()
+        assert response.status == 413
+        assert response.getheader('Connection') == 'close'
+        response.read()
+        # 连接已关闭，下一个请求重新建立连接
+        conn.request('GET', '/todos')
+        assert conn.getresponse().status == 200
+    finally:
+        conn.close()
+
+def test_concurrent_reads_and_writes(server):
+    """测试并发读写：写请求串行执行，全部写入都可读到"""
+    def write(i):
+        return request(server, 'POST', '/transactions', {
+            'amount': -1, 'category': '餐饮', 'transaction_time': f'2024-03-{i % 28 + 1:02d}'})[0]
+    def read(_):
+        return request(server, 'GET', '/transactions/summary?month=3&year=2024')[0]
+    
+    with ThreadPoolExecutor(8) as pool:
+        statuses = list(pool.map(write, range(40))) + list(pool.map(read, range(40)))
+    assert set(statuses) == {200, 201}
+    status, summary = request(server, 'GET', '/transactions/summary?month=3&year=2024')
+    assert summary['total_expense'] == '40.00'
+
+def test_cli_reads_and_writes_while_server_runs(home):
+    """测试服务运行时，使用默认性能配置的命令行仍可读写同一个账本"""
+    from click.testing import CliRunner
+    from cashlog.cli.main import main_cli
+    from cashlog.config import get_cashlog_dir
+    get_cashlog_dir().mkdir(exist_ok=True)
+    db = Database(db_path=str(get_cashlog_dir() / 'cashlog.db'), profile='fast', pool_size=2, max_overflow=0)
+    server = ApiServer(('127.0.0.1', 0), db, workers=2)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        assert request(server, 'POST', '/transactions', {'amount': -12, 'category': '餐饮'})[0] == 201
+        runner = CliRunner()
+        result = runner.invoke(main_cli, ['transaction', 'add', '-a', '-30', '-c', '交通'])
+        assert result.exit_code == 0 and '失败' not in result.output
+        result = runner.invoke(main_cli, ['transaction', 'list'])
+        assert result.exit_code == 0 and '餐饮' in result.output and '交通' in result.output
+        status, page = request(server, 'GET', '/transactions')
+        assert sorted(t['category'] for t in page['items']) == ['交通', '餐饮']
+    finally:
+        server.shutdown()
+        server.server_close()
+        db.close()
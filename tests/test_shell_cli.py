@@ -0,0 +1,47 @@
+import pytest
+import sys
+import os
+# 将项目根目录添加到Python路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from click.testing import CliRunner
+from cashlog.cli.main import main_cli
+from cashlog.cli.shell_cli import ShellCompleter, load_categories
+
+def test_shell_runs_commands_on_one_database(home):
+    """测试交互模式在同一个数据库实例上连续执行命令"""
+    from cashlog.data import database
+    commands = '\n'.join([
+        'transaction add -a -12.5 -c 餐饮',
+        'todo add -c "写 周报" -ca 工作',
+        '# 注释行会被忽略',
+        'transaction list -m 13',
+        'shell',
+        'transaction summary',
+        'exit',
+        'todo list',
+    ])
+    result = CliRunner().invoke(main_cli, ['shell'], input=commands + '\n')
+    assert result.exit_code == 0, result.output
+    assert '收支记录新增成功！ID: 1' in result.output
+    assert '待办事项新增成功！ID: 1' in result.output
+    assert '月份需在1-12之间' in result.stderr
+    assert '已在交互模式中' in result.stderr
+    assert '餐饮: 100.0%' in result.output
+    # exit 之后的命令不再执行
+    assert '写 周报' not in result.output
+    assert database._db is not None
+    assert database._db.engine.pool.checkedout() == 0
+    assert load_categories() == ['工作', '餐饮']
+
+def test_completer_matches():
+    """测试命令、选项和分类补全"""
+    completer = ShellCompleter(main_cli, categories_loader=lambda: ['交通', '餐饮', '日常 开销'])
+    assert completer.matches('', 't') == ['todo', 'transaction']
+    assert completer.matches('', 'ex') == ['exit', 'export']
+    assert completer.matches('transaction ', 'r') == ['rebuild-rollups', 'report']
+    assert '--category' in completer.matches('transaction list ', '--c')
+    assert completer.matches('transaction add -a -5 -c ', '') == ["'日常 开销'", '交通', '餐饮']
+    assert completer.matches('todo list -ca ', '餐') == ['餐饮']
+    # todo add 的 -c 是内容而不是分类
+    assert completer.matches('todo add -c ', '') == []
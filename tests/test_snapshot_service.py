@@ -0,0 +1,78 @@
+import pytest
+import sys
+import os
+# 将项目根目录添加到Python路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+np = pytest.importorskip('numpy')
+
+from cashlog.service.snapshot_service import SnapshotService
+from cashlog.service.analytics_service import AnalyticsService
+from cashlog.service.transaction_service import TransactionService
+from cashlog.data.models import TransactionType
+from datetime import datetime
+from tests.test_database import temp_db
+
+@pytest.fixture
+def session(temp_db):
+    """写入乱序的测试数据"""
+    session = temp_db()
+    TransactionService(session).add_transactions_bulk([
+        {'amount': -40.0, 'category': '餐饮', 'transaction_time': datetime(2024, 3, 1, 12, 0, 0)},
+        {'amount': 5000.0, 'category': '工资', 'transaction_time': datetime(2024, 1, 1, 9, 0, 0)},
+        {'amount': -10.5, 'category': '餐饮', 'transaction_time': datetime(2024, 1, 1, 12, 0, 0)},
+        {'amount': -100.0, 'category': '交通', 'transaction_time': datetime(2024, 3, 2, 8, 0, 0)},
+        {'amount': -20.0, 'category': '餐饮', 'transaction_time': datetime(2024, 4, 3, 12, 0, 0)},
+    ])
+    yield session
+    session.close()
+
+def test_export_and_memory_mapped_load(session, tmp_path):
+    """测试导出快照并以内存映射方式加载"""
+    service = SnapshotService(session)
+    header = service.export(tmp_path / 'snapshot')
+    assert header['rows'] == 5
+    assert os.path.getsize(tmp_path / 'snapshot' / 'amount_cents.i64') == 5 * 8
+    assert os.path.getsize(tmp_path / 'snapshot' / 'category.i32') == 5 * 4
+    
+    frame = service.load(tmp_path / 'snapshot')
+    assert frame.source == 'snapshot'
+    # 数组直接映射快照文件，没有复制
+    assert isinstance(frame.amounts.base, np.memmap)
+    assert list(frame.timestamps) == sorted(frame.timestamps)
+    assert [frame.categories[c] for c in frame.category_codes] == ['工资', '餐饮', '餐饮', '交通', '餐饮']
+    assert list(frame.amounts) == [500000, -1050, -4000, -10000, -2000]
+    
+    # 重新导出覆盖旧快照
+    service.export(tmp_path / 'snapshot')
+    assert sorted(os.listdir(tmp_path)) == ['snapshot']
+
+def test_snapshot_freshness(session):
+    """测试快照在数据库写入后失效"""
+    service = SnapshotService(session)
+    assert service.load_if_fresh() is None
+    service.export()
+    assert service.default_path().suffix == '.columnar'
+    assert service.load_if_fresh() is not None
+    
+    TransactionService(session).add_transaction(-1, '餐饮', transaction_time=datetime(2024, 1, 5))
+    assert service.load_if_fresh() is None
+
+def test_snapshot_matches_database(session):
+    """测试使用快照与直接查询数据库的结果一致"""
+    SnapshotService(session).export()
+    analytics = AnalyticsService(session)
+    for filters in [{}, {'start': datetime(2024, 1, 1, 12), 'end': datetime(2024, 3, 2, 8)},
+                    {'category': '餐饮', 'transaction_type': TransactionType.EXPENSE},
+                    {'category': '不存在'}, {'transaction_type': TransactionType.INCOME}]:
+        from_snapshot = analytics.load_frame(use_snapshot=True, **filters)
+        from_database = analytics.load_frame(**filters)
+        assert from_snapshot.source == 'snapshot'
+        assert from_snapshot.category_stats() == from_database.category_stats()
+        assert from_snapshot.month_over_month() == from_database.month_over_month()
+    
+    transactions = TransactionService(session)
+    for granularity in ['month', 'quarter', 'year']:
+        start, end = datetime(2024, 1, 1), datetime(2024, 4, 1)
+        assert transactions.get_range_summary(start, end, granularity, use_snapshot=True) == \
+            transactions.get_range_summary(start, end, granularity)
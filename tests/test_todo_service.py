@@ -7,6 +7,7 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')
 from cashlog.service.todo_service import TodoService
 from cashlog.data.models import Todo, TodoStatus
 from datetime import datetime
+from sqlalchemy import text
 from tests.test_database import temp_db
 
 def test_add_todo(temp_db):
@@ -113,3 +114,102 @@ def test_delete_todo(temp_db):
     assert len(todos) == 0
     
     session.close()
+
+def test_get_todos_by_tags(temp_db):
+    """测试按标签查询待办事项"""
+    session = temp_db()
+    service = TodoService(session)
+    
+    service.add_todo('完成项目报告', '工作', tags='报告,工作')
+    service.add_todo('整理周报', '工作', tags='报告')
+    todo = service.add_todo('学习Python', '学习', tags='学习')
+    
+    assert len(service.get_todos(tags='报告')) == 2
+    assert len(service.get_todos(tags='报告,工作')) == 1
+    assert len(service.get_todos(tags='工作,学习', tag_match='any')) == 2
+    
+    # 删除待办事项时一并删除标签关联
+    service.delete_todo(todo.id)
+    assert service.get_todos(tags='学习') == []
+    
+    session.close()
+
+def test_iter_todos(temp_db):
+    """测试流式查询待办事项"""
+    session = temp_db()
+    service = TodoService(session)
+    
+    for i in range(5):
+        service.add_todo(f'待办{i}', '工作')
+    
+    streamed = [t.id for t in service.iter_todos(category='工作', batch_size=2)]
+    assert streamed == [t.id for t in service.get_todos(category='工作')]
+    assert len(streamed) == 5
+    
+    session.close()
+
+def test_get_todos_keyset_pagination(temp_db):
+    """测试按 (创建时间, ID) 键集分页查询待办事项"""
+    session = temp_db()
+    service = TodoService(session)
+    
+    for i in range(5):
+        service.add_todo(f'待办{i}', '工作')
+    expected = [t.id for t in service.get_todos()]
+    
+    first_page = service.get_todos(limit=2)
+    second_page = service.get_todos(limit=2, after=first_page[-1].id)
+    last_page = service.get_todos(limit=2, after=second_page[-1].id)
+    assert [t.id for t in first_page + second_page + last_page] == expected
+    assert len(last_page) == 1
+    
+    session.close()
+
+def test_search_todos(temp_db):
+    """测试按内容全文搜索待办事项，修改和删除后索引同步更新"""
+    session = temp_db()
+    service = TodoService(session)
+    
+    report = service.add_todo('Write weekly report', '工作')
+    service.add_todo('整理季度报销单', '财务')
+    service.add_todo('季度报告评审', '工作')
+    
+    assert [t.content for t in service.search_todos('WEEKLY')] == ['Write weekly report']
+    # 短关键词没有相关度，较新的排在前面
+    assert [t.content for t in service.search_todos('季度')] == ['季度报告评审', '整理季度报销单']
+    assert [t.content for t in service.search_todos('季度', category='工作')] == ['季度报告评审']
+    
+    service.update_todo_status(report.id, TodoStatus.DONE)
+    assert service.search_todos('report', status=TodoStatus.TODO) == []
+    report.content = 'Write monthly summary'
+    session.commit()
+    assert service.search_todos('weekly') == []
+    assert [t.id for t in service.search_todos('month')] == [report.id]
+    service.delete_todo(report.id)
+    assert service.search_todos('month') == []
+    
+    session.close()
+
+def test_get_due_todos(temp_db):
+    """测试按截止时间查询未完成待办事项，使用未完成待办的截止时间部分索引"""
+    session = temp_db()
+    service = TodoService(session)
+    service.add_todo('交房租', '生活', deadline=datetime(2024, 1, 5, 18, 0, 0))
+    service.add_todo('报税', '财务', deadline=datetime(2024, 1, 1, 9, 0, 0))
+    done = service.add_todo('体检', '健康', deadline=datetime(2024, 1, 2, 9, 0, 0))
+    service.update_todo_status(done.id, TodoStatus.DONE)
+    service.add_todo('读书', '学习')
+    service.add_todo('写周报', '工作', deadline=datetime(2024, 1, 8, 18, 0, 0))
+    
+    now = datetime(2024, 1, 3)
+    assert [t.content for t in service.get_due_todos(end=now)] == ['报税']
+    assert [t.content for t in service.get_due_todos(now, datetime(2024, 1, 6))] == ['交房租']
+    assert [t.content for t in service.get_due_todos(limit=2)] == ['报税', '交房租']
+    
+    plan = session.execute(text(
+        "EXPLAIN QUERY PLAN SELECT id FROM todos WHERE status != 'DONE' AND deadline IS NOT NULL "
+        "AND deadline >= :start ORDER BY deadline, id"
+    ), {'start': now}).fetchall()
+    assert 'ix_todos_open_deadline' in plan[0][-1]
+    
+    session.close()
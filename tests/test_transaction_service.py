@@ -5,8 +5,9 @@ import os
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from cashlog.service.transaction_service import TransactionService
-from cashlog.data.models import Transaction, TransactionType
-from datetime import datetime
+from cashlog.data.models import Transaction, TransactionType, MonthlyRollup
+from datetime import datetime, timedelta
+from decimal import Decimal
 from tests.test_database import temp_db
 
 def test_add_transaction(temp_db):
@@ -110,3 +111,303 @@ def test_get_monthly_summary(temp_db):
     assert summary2['transaction_count'] == 0
     
     session.close()
+
+def test_get_monthly_summary_category_aggregation(temp_db):
+    """测试月度汇总按分类聚合收入与支出"""
+    session = temp_db()
+    service = TransactionService(session)
+    
+    # 同一分类下同时存在收入和支出
+    service.add_transaction(-30.0, '餐饮', transaction_time=datetime(2024, 3, 1, 12, 0, 0))
+    service.add_transaction(-20.0, '餐饮', transaction_time=datetime(2024, 3, 2, 12, 0, 0))
+    service.add_transaction(10.0, '餐饮', remark='退款', transaction_time=datetime(2024, 3, 3, 12, 0, 0))
+    service.add_transaction(140.0, '工资', transaction_time=datetime(2024, 3, 31, 23, 59, 59))
+    service.add_transaction(-999.0, '餐饮', transaction_time=datetime(2024, 4, 1, 0, 0, 0))
+    
+    summary = service.get_monthly_summary(month=3, year=2024)
+    assert summary['total_income'] == 150.0
+    assert summary['total_expense'] == 50.0
+    assert summary['balance'] == 100.0
+    assert summary['transaction_count'] == 4
+    assert summary['category_stats'] == {'工资': 140.0, '餐饮': 60.0}
+    assert summary['category_percentage'] == {'工资': 70.0, '餐饮': 30.0}
+    
+    session.close()
+
+def test_get_transactions_by_tags(temp_db):
+    """测试按标签精确查询收支记录"""
+    session = temp_db()
+    service = TransactionService(session)
+    
+    service.add_transaction(-50.0, '餐饮', 'food, 午餐', transaction_time=datetime(2024, 1, 1, 12, 0, 0))
+    service.add_transaction(-80.0, '餐饮', 'seafood', transaction_time=datetime(2024, 1, 2, 12, 0, 0))
+    service.add_transaction(-20.0, '餐饮', 'food,晚餐,food', transaction_time=datetime(2024, 1, 3, 18, 0, 0))
+    
+    # 标签需完整匹配，food 不会匹配 seafood
+    food_transactions = service.get_transactions(tags='food')
+    assert len(food_transactions) == 2
+    assert food_transactions[0].tags == 'food,晚餐'
+    
+    # 同时包含多个标签
+    assert len(service.get_transactions(tags='food,午餐')) == 1
+    
+    # 包含任一标签
+    any_transactions = service.get_transactions(tags='午餐,seafood', tag_match='any')
+    assert [t.amount for t in any_transactions] == [-80.0, -50.0]
+    
+    assert service.get_transactions(tags='不存在') == []
+    
+    session.close()
+
+def test_add_transactions_bulk(temp_db):
+    """测试批量新增收支记录"""
+    session = temp_db()
+    service = TransactionService(session)
+    
+    records = (
+        {
+            'amount': -10.0 * (i + 1),
+            'category': '餐饮' if i % 2 else '交通',
+            'tags': 'food,午餐' if i % 2 else None,
+            'transaction_time': datetime(2024, 1, i + 1, 12, 0, 0),
+        }
+        for i in range(7)
+    )
+    count = service.add_transactions_bulk(records, batch_size=3)
+    assert count == 7
+    
+    assert len(service.get_transactions()) == 7
+    food_transactions = service.get_transactions(tags='food,午餐')
+    assert len(food_transactions) == 3
+    assert food_transactions[0].tags == 'food,午餐'
+    
+    summary = service.get_monthly_summary(month=1, year=2024)
+    assert summary['transaction_count'] == 7
+    assert summary['total_expense'] == 280.0
+    
+    session.close()
+
+def test_add_transactions_bulk_is_atomic(temp_db):
+    """测试批量新增中出现错误时全部回滚"""
+    session = temp_db()
+    service = TransactionService(session)
+    
+    records = [
+        {'amount': -10.0, 'category': '餐饮'},
+        {'amount': -20.0, 'category': '餐饮'},
+        {'amount': -30.0},
+    ]
+    with pytest.raises(ValueError):
+        service.add_transactions_bulk(records, batch_size=2)
+    assert service.get_transactions() == []
+    
+    session.close()
+
+def test_iter_transactions(temp_db):
+    """测试流式查询收支记录"""
+    session = temp_db()
+    service = TransactionService(session)
+    
+    service.add_transactions_bulk(
+        {'amount': -1.0 * i, 'category': '餐饮', 'transaction_time': datetime(2024, 1, 1, 0, i, 0)}
+        for i in range(1, 26)
+    )
+    
+    # 流式结果与一次性查询结果一致
+    streamed = [t.id for t in service.iter_transactions(category='餐饮', batch_size=4)]
+    assert streamed == [t.id for t in service.get_transactions(category='餐饮')]
+    assert len(streamed) == 25
+    
+    session.close()
+
+def test_get_transactions_keyset_pagination(temp_db):
+    """测试按 (交易时间, ID) 键集分页查询收支记录"""
+    session = temp_db()
+    service = TransactionService(session)
+    
+    # 包含交易时间相同的记录，分页需按ID区分先后
+    service.add_transactions_bulk(
+        {'amount': -1.0, 'category': '餐饮', 'transaction_time': datetime(2024, 1, 1 + i // 3, 12, 0, 0)}
+        for i in range(10)
+    )
+    expected = [t.id for t in service.get_transactions()]
+    
+    pages = []
+    after = None
+    while True:
+        page = service.get_transactions(limit=4, after=after)
+        if not page:
+            break
+        pages.append([t.id for t in page])
+        after = page[-1].id
+    assert [len(page) for page in pages] == [4, 4, 2]
+    assert sum(pages, []) == expected
+    
+    # 流式查询同样支持分页
+    assert [t.id for t in service.iter_transactions(limit=3, after=expected[2])] == expected[3:6]
+    
+    with pytest.raises(ValueError):
+        service.get_transactions(after=999)
+    
+    session.close()
+
+def test_amounts_are_exact(temp_db):
+    """测试金额以分为单位精确存储和汇总"""
+    session = temp_db()
+    service = TransactionService(session)
+    
+    # 0.1 累加 1000 次在浮点数下会产生误差
+    service.add_transactions_bulk(
+        {'amount': 0.1, 'category': '利息', 'transaction_time': datetime(2024, 5, 1, 0, 0, 0)}
+        for _ in range(1000)
+    )
+    transaction = service.add_transaction('-19.999', '餐饮', transaction_time=datetime(2024, 5, 2, 0, 0, 0))
+    assert transaction.amount_cents == -2000
+    assert transaction.amount == Decimal('-20.00')
+    
+    summary = service.get_monthly_summary(month=5, year=2024)
+    assert summary['total_income'] == Decimal('100.00')
+    assert summary['total_expense'] == Decimal('20.00')
+    assert summary['balance'] == Decimal('80.00')
+    assert summary['category_stats']['利息'] == Decimal('100.00')
+    
+    with pytest.raises(ValueError):
+        service.add_transaction('abc', '餐饮')
+    
+    session.close()
+
+def test_monthly_rollups_are_maintained(temp_db):
+    """测试月度汇总表随新增记录增量维护，并与重建结果一致"""
+    session = temp_db()
+    service = TransactionService(session)
+    
+    service.add_transaction(1000.0, '工资', transaction_time=datetime(2024, 1, 1, 10, 0, 0))
+    service.add_transaction(-500.0, '餐饮', transaction_time=datetime(2024, 1, 2, 12, 0, 0))
+    service.add_transactions_bulk([
+        {'amount': -20.0, 'category': '餐饮', 'transaction_time': datetime(2024, 1, 3, 12, 0, 0)},
+        {'amount': -30.0, 'category': '餐饮', 'transaction_time': datetime(2024, 2, 1, 12, 0, 0)},
+    ])
+    
+    def rollups():
+        return [
+            (r.year, r.month, r.category, r.income_cents, r.expense_cents, r.transaction_count)
+            for r in session.query(MonthlyRollup).order_by(MonthlyRollup.year, MonthlyRollup.month,
+                                                           MonthlyRollup.category)
+        ]
+    
+    maintained = rollups()
+    assert maintained == [
+        (2024, 1, '工资', 100000, 0, 1),
+        (2024, 1, '餐饮', 0, 52000, 2),
+        (2024, 2, '餐饮', 0, 3000, 1),
+    ]
+    assert service.rebuild_rollups() == 3
+    assert rollups() == maintained
+    
+    session.close()
+
+def test_get_range_summary(temp_db):
+    """测试按月/季度/年生成区间汇总"""
+    session = temp_db()
+    service = TransactionService(session)
+    
+    service.add_transaction(1000.0, '工资', transaction_time=datetime(2023, 12, 31, 23, 0, 0))
+    service.add_transaction(1000.0, '工资', transaction_time=datetime(2024, 1, 1, 10, 0, 0))
+    service.add_transaction(-500.0, '餐饮', transaction_time=datetime(2024, 1, 2, 12, 0, 0))
+    service.add_transaction(-200.0, '交通', transaction_time=datetime(2024, 4, 3, 8, 0, 0))
+    service.add_transaction(-0.1, '餐饮', transaction_time=datetime(2024, 12, 31, 23, 59, 59))
+    service.add_transaction(-999.0, '餐饮', transaction_time=datetime(2025, 1, 1, 0, 0, 0))
+    
+    monthly = service.get_range_summary(datetime(2024, 1, 1), datetime(2024, 5, 1))
+    assert [p['period'] for p in monthly['periods']] == ['2024-01', '2024-02', '2024-03', '2024-04']
+    assert monthly['periods'][0]['balance'] == Decimal('500.00')
+    assert monthly['periods'][0]['category_stats'] == {'工资': Decimal('1000.00'), '餐饮': Decimal('500.00')}
+    assert monthly['periods'][1]['transaction_count'] == 0
+    assert monthly['periods'][3]['total_expense'] == Decimal('200.00')
+    assert monthly['transaction_count'] == 3
+    
+    quarterly = service.get_range_summary(datetime(2024, 1, 1), datetime(2025, 1, 1), 'quarter')
+    assert [(p['period'], p['transaction_count']) for p in quarterly['periods']] == [
+        ('2024-Q1', 2), ('2024-Q2', 1), ('2024-Q3', 0), ('2024-Q4', 1)
+    ]
+    
+    yearly = service.get_range_summary(datetime(2023, 1, 1), datetime(2025, 1, 1), 'year')
+    assert [p['period'] for p in yearly['periods']] == ['2023', '2024']
+    assert yearly['total_income'] == Decimal('2000.00')
+    assert yearly['total_expense'] == Decimal('700.10')
+    assert yearly['category_stats']['餐饮'] == Decimal('500.10')
+    
+    # 与月度汇总结果一致
+    monthly_summary = service.get_monthly_summary(month=1, year=2024)
+    assert monthly['periods'][0]['total_income'] == monthly_summary['total_income']
+    assert monthly['periods'][0]['category_stats'] == monthly_summary['category_stats']
+    
+    with pytest.raises(ValueError):
+        service.get_range_summary(datetime(2024, 1, 1), datetime(2025, 1, 1), 'week')
+    
+    session.close()
+
+def test_get_range_summary_parallel(temp_db):
+    """测试并行分片汇总与串行汇总结果完全相同，跨越分片边界的周期被正确合并"""
+    session = temp_db()
+    service = TransactionService(session)
+    for day in range(0, 400, 3):
+        service.add_transaction(-(day % 17 + 0.35), f'分类{day % 4}',
+                                transaction_time=datetime(2023, 11, 1) + timedelta(days=day, hours=day % 24))
+    service.add_transaction(5000, '工资', transaction_time=datetime(2024, 6, 30, 23, 59, 59))
+    
+    start, end = datetime(2023, 11, 15), datetime(2024, 12, 1)
+    for granularity in ('month', 'quarter', 'year'):
+        serial = service.get_range_summary(start, end, granularity)
+        assert service.get_range_summary(start, end, granularity, parallel=3) == serial
+    
+    with pytest.raises(ValueError):
+        service.get_range_summary(start, end, parallel=0)
+    
+    session.close()
+
+def test_search_transactions(temp_db):
+    """测试按备注全文搜索收支记录"""
+    session = temp_db()
+    service = TransactionService(session)
+    
+    service.add_transaction(-30.0, '餐饮', None, '公司楼下 Lunch 套餐', datetime(2024, 1, 2, 12, 0, 0))
+    service.add_transaction(-45.0, '餐饮', None, '周末 lunchbox 外卖', datetime(2024, 2, 3, 12, 0, 0))
+    service.add_transaction(-12.0, '交通', None, '地铁通勤卡充值', datetime(2024, 2, 4, 8, 0, 0))
+    service.add_transactions_bulk([
+        {'amount': -18, 'category': '餐饮', 'remark': '通勤路上的早餐 100%', 'transaction_time': datetime(2024, 2, 5, 8)},
+    ])
+    
+    # 子串和前缀匹配，不区分大小写
+    assert sorted(t.remark for t in service.search_transactions('LUNCH')) == ['公司楼下 Lunch 套餐', '周末 lunchbox 外卖']
+    assert [t.remark for t in service.search_transactions('通勤卡')] == ['地铁通勤卡充值']
+    # 多个关键词需全部匹配；少于3个字符的关键词同样可用
+    assert [t.remark for t in service.search_transactions('lunch 外卖')] == ['周末 lunchbox 外卖']
+    assert [t.remark for t in service.search_transactions('通勤 早餐')] == ['通勤路上的早餐 100%']
+    assert [t.remark for t in service.search_transactions('0%')] == ['通勤路上的早餐 100%']
+    # 与分类、时间筛选组合
+    assert [t.remark for t in service.search_transactions('lunch', month=1, year=2024)] == ['公司楼下 Lunch 套餐']
+    assert service.search_transactions('通勤', category='餐饮')[0].amount == Decimal('-18.00')
+    assert service.search_transactions('"OR" lunch*') == []
+    with pytest.raises(ValueError):
+        service.search_transactions(' * ')
+    
+    session.close()
+
+def test_search_ranks_all_matches(temp_db):
+    """测试全部匹配记录按相关度排序，较早写入的最相关记录不会被更新的匹配记录挤掉"""
+    session = temp_db()
+    service = TransactionService(session)
+    exact = service.add_transaction(-5, '餐饮', None, 'coffee', datetime(2020, 1, 1))
+    service.add_transactions_bulk([
+        {'amount': -40, 'category': '餐饮', 'remark': f'bought some coffee beans at shop {i}',
+         'transaction_time': datetime(2024, 1, 1) + timedelta(hours=i)}
+        for i in range(600)
+    ])
+    
+    results = service.search_transactions('coffee', limit=None)
+    assert len(results) == 601
+    assert results[0].id == exact.id
+    assert service.search_transactions('coffee', limit=1)[0].id == exact.id
+    
+    session.close()